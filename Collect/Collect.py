@@ -10,13 +10,22 @@
 # Dependencies
 import logging
 import os
-from typing import Any, Optional, Dict
+from typing import Any, Optional, Dict, Iterable, Iterator, List, Union
 import requests
-from io import StringIO
 import pandas as pd
 from abc import ABC, abstractmethod
 from os.path import join, dirname, exists, isabs
 from database_conn.db_conn import DataBaseConnector
+from Collect.bulk_load import get_bulk_loader
+from Collect.manifest import LoadManifest, file_hash
+from Collect.frame_cache import FrameCache
+from Collect.fips import FIPS_COLUMN, with_fips
+from Collect.keys import KeySpec, create_keys, infer_keys, key_sql_types
+from Collect.http_fetch import HttpFetcher
+from Collect.label_formatter import label_formatter
+from Collect.census_schema import (SENTINELS, build_schema, chunked_sql_dtypes, convert_numeric, key_sql_dtypes,
+                                   log_sentinel_counts)
+from instrumentation.trace import argument, attribute_rows, traced
 from sqlalchemy.exc import SQLAlchemyError
 
 
@@ -26,10 +35,20 @@ pd.set_option('display.width', 1000)
 innodb_strict_mode = 0
 
 
+def data_path(filename: str) -> str:
+    """
+    Resolve a file name to its path in the data directory, leaving absolute paths as they are.
+    """
+    return filename if isabs(filename) else join(dirname(dirname(__file__)), f'data/{filename}')
+
+
 class PushDF(ABC):
 
     def __init__(self, engine):
         self.engine = engine
+        self.source_path = None
+        self.mapping_path = None
+        self.source_hash = None
 
     @abstractmethod
     def push_to_server(self, db_name: str):
@@ -39,6 +58,149 @@ class PushDF(ABC):
     def read_in_df(self, filename: str):
         pass
 
+    def fingerprint(self, transform_options: Optional[Dict[str, Any]] = None,
+                    sql_options: Optional[Dict[str, Any]] = None) -> Dict[str, Optional[str]]:
+        """
+        Build the load manifest hashes of this dataset's source, mapping file and options.
+        """
+        return LoadManifest.fingerprint(self.source_path, self.mapping_path, transform_options, sql_options,
+                                        source_hash=self.source_hash)
+
+    def sql_dtypes(self, df: pd.DataFrame, chunked: bool = False) -> Dict[str, Any]:
+        """
+        Column types to create the table with, on top of the ones to_sql infers. None by default.
+
+        Args:
+            df (pd.DataFrame): The rows to load, or the first chunk of them.
+            chunked (bool): Whether more chunks will be appended to the table after df.
+        """
+        return {}
+
+    def typed_sql_dtypes(self, df: pd.DataFrame, keys: KeySpec, chunked: bool = False) -> Dict[str, Any]:
+        """
+        The column types of sql_dtypes, with the key columns typed so they can be indexed.
+        """
+        return {**self.sql_dtypes(df, chunked=chunked), **key_sql_types(df, keys)}
+
+    def load_chunks(self, chunks: Iterable[pd.DataFrame], db_name: str, bulk_backend: Optional[str] = None,
+                    batch_size: int = 1000, manifest: Optional[LoadManifest] = None, force: bool = False,
+                    transform_options: Optional[Dict[str, Any]] = None, keys: Optional[KeySpec] = None,
+                    **sql_options) -> Dict[str, Any]:
+        """
+        Replace a table with the rows of a stream of DataFrames, holding only one chunk in memory at a time.
+
+        The first chunk replaces the table and the rest are appended to it. Every chunk gets the integer
+        FIPS key of with_fips. The keys are built once the last chunk is in. The manifest is checked before
+        the first chunk is taken, so a skipped load never reads the source.
+
+        Args:
+            chunks (Iterable[pd.DataFrame]): The rows to load, in chunks with the same columns.
+            db_name (str): Name of the table to replace.
+            bulk_backend (Optional[str]): 'load_data', 'multi_row' or 'generic'; chosen from the engine's dialect if None.
+            batch_size (int): Rows per INSERT statement for the batched backends.
+            manifest (Optional[LoadManifest]): Load manifest to check and record the load in.
+            force (bool): Upload even if the manifest says the table is current.
+            transform_options (Optional[Dict[str, Any]]): Options used to transform the data, part of the fingerprint.
+            keys (Optional[KeySpec]): Primary key and indexes built after the load; inferred if None, see infer_keys.
+            **sql_options: Additional SQL options for data pushing.
+
+        Returns:
+            Dict[str, Any]: The load statistics summed over the chunks, plus the number of chunks.
+        """
+        fingerprint = None
+        if manifest is not None:
+            fingerprint = self.fingerprint(transform_options, sql_options)
+            if not force and manifest.is_current(db_name, fingerprint):
+                logging.info(f"{db_name} is unchanged since its last load, skipping upload.")
+                return {'backend': None, 'table': db_name, 'rows': 0, 'seconds': 0.0, 'rows_per_sec': 0.0,
+                        'chunks': 0, 'skipped': True}
+
+        loader = get_bulk_loader(self.engine, bulk_backend, batch_size=batch_size)
+        stats = {'backend': loader.name, 'table': db_name, 'rows': 0, 'seconds': 0.0, 'chunks': 0}
+        columns, key, key_values = [], None, []
+
+        for chunk in chunks:
+            chunk, key = with_fips(chunk)
+            if key is not None:
+                key_values.append(chunk[key])
+            if_exists = 'append'
+            if stats['chunks'] == 0:
+                if_exists = 'replace'
+                columns = list(chunk.columns)
+                # typed from the columns alone, as whether the key is unique is only known after the last chunk
+                sql_dtypes = self.typed_sql_dtypes(chunk, keys or infer_keys(columns, key), chunked=True)
+                if sql_dtypes:
+                    sql_options['dtype'] = {**sql_dtypes, **sql_options.get('dtype', {})}
+
+            chunk_stats = loader.load(chunk, db_name, if_exists=if_exists, **sql_options)
+            stats['rows'] += chunk_stats['rows']
+            stats['seconds'] += chunk_stats['seconds']
+            stats['chunks'] += 1
+
+        stats['rows_per_sec'] = stats['rows'] / stats['seconds'] if stats['seconds'] else 0.0
+        stats['skipped'] = False
+        logging.info(f"Loaded {stats['rows']} rows into {db_name} in {stats['chunks']} chunks "
+                     f"({stats['rows_per_sec']:,.0f} rows/sec)")
+
+        if keys is None:
+            keys = infer_keys(columns, key, pd.concat(key_values, ignore_index=True) if key_values else None)
+        stats['keys'] = create_keys(self.engine, db_name, keys)
+
+        if manifest is not None:
+            manifest.record(db_name, fingerprint, stats['rows'])
+
+        return stats
+
+    def load_frame(self, df: pd.DataFrame, db_name: str, bulk_backend: Optional[str] = None,
+                   batch_size: int = 1000, manifest: Optional[LoadManifest] = None, force: bool = False,
+                   transform_options: Optional[Dict[str, Any]] = None, keys: Optional[KeySpec] = None,
+                   **sql_options) -> Dict[str, Any]:
+        """
+        Replace a table with the rows of a DataFrame through a bulk load backend.
+
+        When a load manifest is given, the upload is skipped if the table was last loaded from the same
+        source, mapping file and options, unless force is set. Rows with a county FIPS or census geography
+        id get an integer FIPS key, see with_fips. The primary key and indexes are built after the load.
+
+        Args:
+            df (pd.DataFrame): The rows to load.
+            db_name (str): Name of the table to replace.
+            bulk_backend (Optional[str]): 'load_data', 'multi_row' or 'generic'; chosen from the engine's dialect if None.
+            batch_size (int): Rows per INSERT statement for the batched backends.
+            manifest (Optional[LoadManifest]): Load manifest to check and record the load in.
+            force (bool): Upload even if the manifest says the table is current.
+            transform_options (Optional[Dict[str, Any]]): Options used to transform the data, part of the fingerprint.
+            keys (Optional[KeySpec]): Primary key and indexes built after the load; inferred if None, see infer_keys.
+            **sql_options: Additional SQL options for data pushing.
+
+        Returns:
+            Dict[str, Any]: The load statistics, including rows_per_sec and whether the load was skipped.
+        """
+        fingerprint = None
+        if manifest is not None:
+            fingerprint = self.fingerprint(transform_options, sql_options)
+            if not force and manifest.is_current(db_name, fingerprint):
+                logging.info(f"{db_name} is unchanged since its last load, skipping upload.")
+                return {'backend': None, 'table': db_name, 'rows': 0, 'seconds': 0.0, 'rows_per_sec': 0.0,
+                        'skipped': True}
+
+        df, key = with_fips(df)
+        if keys is None:
+            keys = infer_keys(df.columns, key, df[key] if key is not None else None)
+        sql_dtypes = self.typed_sql_dtypes(df, keys)
+        if sql_dtypes:
+            sql_options['dtype'] = {**sql_dtypes, **sql_options.get('dtype', {})}
+
+        loader = get_bulk_loader(self.engine, bulk_backend, batch_size=batch_size)
+        stats = loader.load(df, db_name, if_exists='replace', **sql_options)
+        stats['skipped'] = False
+        stats['keys'] = create_keys(self.engine, db_name, keys)
+
+        if manifest is not None:
+            manifest.record(db_name, fingerprint, stats['rows'])
+
+        return stats
+
 
 class CensusData(PushDF):
     """
@@ -47,24 +209,245 @@ class CensusData(PushDF):
     Attributes:
         censusDF (pd.DataFrame): DataFrame containing census data.
         _column_mappings (Optional[Dict[str, str]]): Dictionary for column name mappings.
+        _schema (Dict[str, str]): Column kinds built from the column mappings, see census_schema.
+        sentinel_counts (Dict[str, int]): Number of each missing value sentinel found by the numeric conversion.
         engine (Any): Database engine for pushing data.
     """
 
-    def __init__(self, census_df_filename: str, engine: Any):
+    COLUMN_NAME_REPLACEMENTS = [
+        ("!!", "_"),
+        (" ", "_"),
+        ("Total", "T"),
+        ("Estimate", "EST"),
+        ("Margin_of_Error_population", "MOE_POP"),
+        ("Estimate_Percent", "EPER"),
+        ("Estimate_population", "EPOP"),
+        ("Margin_of_Error_Percent_population", "MOE_PER"),
+        ("SUMMARY_INDICATORS", "SUM"),
+        ("Margin_of_Error", "MOE"),
+        ("years_and_over", "YO"),
+        ("SELECTED_AGE_CATEGORIES", "YO"),
+        ("population", "POP"),
+        ("American_Indian_and_Alaska_Native", "AI"),
+        ("Native_Hawaiian_and_Other_Pacific_Islander", "PI"),
+        ("Two_or_more_races", "TWO+"),
+        ("Black_or_African_American", "AA"),
+        ("Race_alone_or_in_combination_with_one_or_more_other_races", "RACE_ALONE_POS"),
+        ("Two_races_including_Some_other_race", "INC_OTH"),
+        ("Two_races_excluding_Some_other_race", "EXC_OTH"),
+        ("Hispanic_or_Latino", "HIS"),
+        ("HISPANIC_OR_LATINO", "HIS"),
+        ("and_Three_or_more_races", "3+"),
+        ("VOTING_AGE_POPULATION_Citizen", "VOTE"),
+        ("males_per_100_females", "MP100F"),
+        ("Civilian_employed", "CE"),
+        ("Management,_business,_science,_and_arts_occupations", "CAS"),
+        ("Service_occupations", "SERV"),
+        ("Sales_and_office_occupations", "SALES"),
+        ("Production,_transportation,_and_material_moving_occupations", "PRIV"),
+        ("Natural_resources,_construction,_and_maintenance_occupations", "CONST"),
+        ("Employee_of_private_company_workers", "PRIV"),
+        ("employed_in_own_incorporated_business_workers", "OWN"),
+        ("Private_not-for-profit_wage_and_salary_workers", "NON_PROF"),
+        ("Local,_state,_and_federal_government_workers", "GOV"),
+        ("Self-employed_in_own_not_incorporated_business_workers_and_unpaid_family_workers", "SELF_EMP"),
+        ("Married-couple_families", "MCF"),
+        ("Families", "FAM"),
+        ("Household_income", "HHI"),
+        ("Households", "HH"),
+        ("in_the_past_12_months", "WI12MO"),
+        ("Family_income", "FAMINC"),
+        ("Nonfamily_households", "NFAM")
+    ]
+
+    # identifying columns kept by every projection
+    KEY_COLUMNS = ['GEO_ID', 'NAME']
+
+    def __init__(self, census_df_filename: str, engine: Any, census_df: Optional[pd.DataFrame] = None,
+                 read_options: Optional[Dict[str, Any]] = None):
         """
         Initialize CensusData with filename and database engine.
 
         Args:
             census_df_filename (str): Filename of the census data file.
             engine (Any): Database engine for pushing data.
+            census_df (Optional[pd.DataFrame]): Already loaded census data; the file is not read when given.
+            read_options (Optional[Dict[str, Any]]): Additional options for reading the file, such as usecols.
 
         Raises:
             FileNotFoundError: If the specified file is not found.
         """
         super().__init__(engine)
         self._column_mappings = None
-        self.censusDF = self.read_in_df(census_df_filename)
+        self._schema = {}
+        self.sentinel_counts = {}
+        self.source_path = data_path(census_df_filename)
+        if census_df is not None:
+            self.censusDF = census_df
+        else:
+            self.censusDF = self.read_in_df(census_df_filename, **(read_options or {}))
+
+    @classmethod
+    @traced(target=argument(1, 'census_df_filename'))
+    def load(cls, census_df_filename: str, column_mappings_file: str, engine: Any, drop_duplicates: bool = True,
+             cache: Optional[FrameCache] = None, columns: Optional[Iterable[str]] = None) -> 'CensusData':
+        """
+        Read a census file and apply its column mappings and numeric conversion, using a frame cache if given.
+
+        The cache key covers the census file, the column mappings file, the column name replacement rules
+        and the processing options, so a hit is only served when all of them are unchanged. A hit skips
+        parsing the CSV entirely.
+
+        With columns given, only the raw census codes that map onto those labels (plus the geography
+        columns) are parsed, converted and kept.
+
+        Args:
+            census_df_filename (str): Filename of the census data file.
+            column_mappings_file (str): Filename of the column mappings file.
+            engine (Any): Database engine for pushing data.
+            drop_duplicates (bool): Drop repeated column labels, keeping the first.
+            cache (Optional[FrameCache]): Cache of processed frames.
+            columns (Optional[Iterable[str]]): Mapped column labels to keep; every column is kept if None.
+
+        Returns:
+            CensusData: The processed census data.
+        """
+        read_options = {}
+        if columns is not None:
+            columns = sorted(set(columns))
+            raw_columns = set(cls.projected_raw_columns(column_mappings_file, columns))
+            read_options['usecols'] = lambda column: column in raw_columns
+
+        key = None
+        if cache is not None:
+            key = cache.key(
+                file_hash(data_path(census_df_filename)),
+                file_hash(data_path(column_mappings_file)),
+                cls.COLUMN_NAME_REPLACEMENTS,
+                SENTINELS,
+                {'drop_duplicates': drop_duplicates, 'columns': columns},
+            )
+            cached = cache.get(key)
+            if cached is not None:
+                census_data = cls(census_df_filename, engine, census_df=cached)
+                census_data.mapping_path = data_path(column_mappings_file)
+                return census_data
+
+        census_data = cls(census_df_filename, engine, read_options=read_options)
+        census_data.get_column_mappings(column_mappings_file)
+        census_data.apply_column_mappings()
+        census_data.convert_to_type_numeric()
+        if drop_duplicates:
+            census_data.drop_duplicate_columns()
+
+        if cache is not None:
+            cache.put(key, census_data.censusDF)
+
+        return census_data
+
+    @classmethod
+    @traced(target=argument(4, 'db_name'))
+    def stream(cls, census_df_filename: str, column_mappings_file: str, engine: Any, db_name: str,
+               chunksize: int = 10000, drop_duplicates: bool = True, columns: Optional[Iterable[str]] = None,
+               **push_options) -> Dict[str, Any]:
+        """
+        Push a census file to the database chunk by chunk, so memory is bound by the chunk size and not the file.
+
+        Every chunk goes through the same column mapping, numeric conversion and duplicate column handling as
+        load, then is written to the table; the frame cache is not used.
+
+        Args:
+            census_df_filename (str): Filename of the census data file.
+            column_mappings_file (str): Filename of the column mappings file.
+            engine (Any): Database engine for pushing data.
+            db_name (str): Name of the table to replace.
+            chunksize (int): Rows read, converted and written at a time.
+            drop_duplicates (bool): Drop repeated column labels, keeping the first.
+            columns (Optional[Iterable[str]]): Mapped column labels to keep; every column is kept if None.
+            **push_options: Options passed on to load_chunks, such as bulk_backend, manifest and transform_options.
+
+        Returns:
+            Dict[str, Any]: The load statistics, including the number of chunks and the sentinel counts.
+
+        Raises:
+            ValueError: If chunksize is not positive.
+        """
+        if chunksize < 1:
+            logging.error(f"chunksize must be at least 1, got {chunksize}")
+            raise ValueError(f"chunksize must be at least 1, got {chunksize}")
+
+        read_options = {'chunksize': chunksize, 'dtype': str}
+        if columns is not None:
+            raw_columns = set(cls.projected_raw_columns(column_mappings_file, columns))
+            read_options['usecols'] = lambda column: column in raw_columns
+
+        census_data = cls(census_df_filename, engine, census_df=pd.DataFrame())
+        census_data.get_column_mappings(column_mappings_file)
+
+        reader = census_data.read_in_df(census_df_filename, **read_options)
+        with reader:
+            stats = census_data.load_chunks(census_data.process_chunks(reader, drop_duplicates), db_name,
+                                            **push_options)
+
+        stats['sentinel_counts'] = census_data.sentinel_counts
+        return stats
 
+    def process_chunks(self, reader: Iterable[pd.DataFrame], drop_duplicates: bool = True) -> Iterator[pd.DataFrame]:
+        """
+        Map and convert raw census chunks one at a time, summing their sentinel counts into sentinel_counts.
+
+        Args:
+            reader (Iterable[pd.DataFrame]): Raw chunks of the census file, e.g. from read_csv(chunksize=...).
+            drop_duplicates (bool): Drop repeated column labels, keeping the first.
+
+        Yields:
+            pd.DataFrame: The processed chunks.
+        """
+        totals: Dict[str, int] = {}
+
+        for position, chunk in enumerate(reader):
+            self.censusDF = chunk
+            self.apply_column_mappings(drop_header_row=position == 0)
+            self.convert_to_type_numeric()
+            if drop_duplicates:
+                self.drop_duplicate_columns()
+            else:
+                self.check_for_duplicate_columns()
+
+            for sentinel, count in self.sentinel_counts.items():
+                totals[sentinel] = totals.get(sentinel, 0) + count
+
+            chunk, self.censusDF = self.censusDF, None
+            yield chunk
+
+        self.sentinel_counts = totals
+
+    @classmethod
+    def projected_raw_columns(cls, column_mappings_file: str, columns: Iterable[str]) -> List[str]:
+        """
+        Work out which raw census codes have to be read to produce the given mapped column labels.
+
+        Args:
+            column_mappings_file (str): Filename of the column mappings file.
+            columns (Iterable[str]): Mapped column labels, e.g. from the Transform select lists.
+
+        Returns:
+            List[str]: The raw column codes, always including the geography columns.
+        """
+        df_column_mappings = pd.read_csv(data_path(column_mappings_file))
+        labels = cls.format_column_labels(df_column_mappings['Label'])
+        # the FIPS key is derived from the geography columns, which are always read
+        wanted = set(columns) - {FIPS_COLUMN}
+
+        raw_columns = df_column_mappings.loc[labels.isin(wanted), 'Column Name'].tolist()
+
+        missing = wanted - set(labels)
+        if missing:
+            logging.warning(f"Projected columns not found in {column_mappings_file}: {sorted(missing)}")
+
+        return list(dict.fromkeys(cls.KEY_COLUMNS + raw_columns))
+
+    @traced(target=argument(1, 'filename'))
     def read_in_df(self, filename: str, file_type: str = 'csv', **kwargs) -> pd.DataFrame:
         """
         Read data into a DataFrame from a file.
@@ -81,7 +464,7 @@ class CensusData(PushDF):
             ValueError: If the file type is not supported.
             Exception: For other unexpected errors.
         """
-        path = join(dirname(dirname(__file__)), f'data/{filename}')
+        path = data_path(filename)
 
         if not exists(path):
             logging.error(f"File not found: {path}")
@@ -101,21 +484,27 @@ class CensusData(PushDF):
             logging.error(f"Error reading file: {e}")
             raise
 
-    def get_column_mappings(self, column_mappings_file: str) -> None:
+    @traced(rows_out=lambda census_data, *args, **kwargs: len(census_data._column_mappings or ()))
+    def get_column_mappings(self, column_mappings_file: Union[str, pd.DataFrame]) -> None:
         """
         Retrieve column mappings from a file and set to the class attribute.
 
         Args:
-            column_mappings_file (str): Filename of the column mappings file.
+            column_mappings_file (Union[str, pd.DataFrame]): Filename of the column mappings file, or the
+                mappings themselves with 'Column Name' and 'Label' columns, e.g. built from API metadata.
 
         Raises:
             FileNotFoundError: If the specified file is not found.
         """
-        df_column_mappings = self.read_in_df(column_mappings_file)
+        if isinstance(column_mappings_file, pd.DataFrame):
+            df_column_mappings = column_mappings_file.copy()
+        else:
+            df_column_mappings = self.read_in_df(column_mappings_file)
+            self.mapping_path = data_path(column_mappings_file)
 
-        df_column_mappings['Label'] = df_column_mappings['Label'].apply(
-            func=self.format_column_names
-        )
+        labels = self.format_column_labels(df_column_mappings['Label'])
+        self._schema = build_schema(df_column_mappings, labels)
+        df_column_mappings['Label'] = labels
 
         self._column_mappings = df_column_mappings.set_index('Column Name')['Label'].to_dict()
 
@@ -130,67 +519,41 @@ class CensusData(PushDF):
         Returns:
             str: The formatted column label.
         """
-        replacements = [
-            ("!!", "_"),
-            (" ", "_"),
-            ("Total", "T"),
-            ("Estimate", "EST"),
-            ("Margin_of_Error_population", "MOE_POP"),
-            ("Estimate_Percent", "EPER"),
-            ("Estimate_population", "EPOP"),
-            ("Margin_of_Error_Percent_population", "MOE_PER"),
-            ("SUMMARY_INDICATORS", "SUM"),
-            ("Margin_of_Error", "MOE"),
-            ("years_and_over", "YO"),
-            ("SELECTED_AGE_CATEGORIES", "YO"),
-            ("population", "POP"),
-            ("American_Indian_and_Alaska_Native", "AI"),
-            ("Native_Hawaiian_and_Other_Pacific_Islander", "PI"),
-            ("Two_or_more_races", "TWO+"),
-            ("Black_or_African_American", "AA"),
-            ("Race_alone_or_in_combination_with_one_or_more_other_races", "RACE_ALONE_POS"),
-            ("Two_races_including_Some_other_race", "INC_OTH"),
-            ("Two_races_excluding_Some_other_race", "EXC_OTH"),
-            ("Hispanic_or_Latino", "HIS"),
-            ("HISPANIC_OR_LATINO", "HIS"),
-            ("and_Three_or_more_races", "3+"),
-            ("VOTING_AGE_POPULATION_Citizen", "VOTE"),
-            ("males_per_100_females", "MP100F"),
-            ("Civilian_employed", "CE"),
-            ("Management,_business,_science,_and_arts_occupations", "CAS"),
-            ("Service_occupations", "SERV"),
-            ("Sales_and_office_occupations", "SALES"),
-            ("Production,_transportation,_and_material_moving_occupations", "PRIV"),
-            ("Natural_resources,_construction,_and_maintenance_occupations", "CONST"),
-            ("Employee_of_private_company_workers", "PRIV"),
-            ("employed_in_own_incorporated_business_workers", "OWN"),
-            ("Private_not-for-profit_wage_and_salary_workers", "NON_PROF"),
-            ("Local,_state,_and_federal_government_workers", "GOV"),
-            ("Self-employed_in_own_not_incorporated_business_workers_and_unpaid_family_workers", "SELF_EMP"),
-            ("Married-couple_families", "MCF"),
-            ("Families", "FAM"),
-            ("Household_income", "HHI"),
-            ("Households", "HH"),
-            ("in_the_past_12_months", "WI12MO"),
-            ("Family_income", "FAMINC"),
-            ("Nonfamily_households", "NFAM")
-        ]
-
-        for old, new in replacements:
-            column_label = column_label.replace(old, new)
-
-        return column_label
-
-    def apply_column_mappings(self) -> None:
+        return label_formatter(tuple(CensusData.COLUMN_NAME_REPLACEMENTS)).format(column_label)
+
+    @classmethod
+    def format_column_labels(cls, labels: pd.Series) -> pd.Series:
+        """
+        Format a Series of column labels with the compiled replacement table.
+
+        Each replacement runs once over all the new labels joined together instead of once per label, rules
+        that can never match are skipped and formatted labels are memoized across calls. The output is the
+        same as applying every replacement to every label one after another.
+
+        Args:
+            labels (pd.Series): The original column labels.
+
+        Returns:
+            pd.Series: The formatted column labels.
+        """
+        return label_formatter(tuple(cls.COLUMN_NAME_REPLACEMENTS)).format_series(labels)
+
+    @traced(rows_in=attribute_rows('censusDF'), rows_out=attribute_rows('censusDF'))
+    def apply_column_mappings(self, drop_header_row: bool = True) -> None:
         """
         Apply the column mappings to the DataFrame.
+
+        Args:
+            drop_header_row (bool): Drop the descriptive label row under the header. Only the first chunk
+                of a streamed file has it.
         """
         if self._column_mappings:
             self.censusDF.rename(columns=self._column_mappings, inplace=True)
         else:
             logging.warning("Column mappings are not set.")
 
-        self.censusDF.drop(index=0, inplace=True)
+        if drop_header_row:
+            self.censusDF.drop(index=self.censusDF.index[:1], inplace=True)
 
     def check_for_duplicate_columns(self) -> None:
         """
@@ -207,6 +570,7 @@ class CensusData(PushDF):
 
         logging.info("No duplicate columns found.")
 
+    @traced(rows_in=attribute_rows('censusDF'), rows_out=attribute_rows('censusDF'))
     def drop_duplicate_columns(self) -> None:
         """
         Drops duplicate columns in the DataFrame, keeping the first occurrence.
@@ -223,33 +587,54 @@ class CensusData(PushDF):
         else:
             logging.info("No duplicate columns to drop.")
 
+    @traced(rows_in=attribute_rows('censusDF'), rows_out=attribute_rows('censusDF'))
     def convert_to_type_numeric(self) -> None:
+        """
+        Convert the data columns to compact numeric types in one vectorized pass.
+
+        Whole-number columns become int32 (nullable Int32 with missing values) and the rest float32, with
+        percents always float32, using the column kinds from the mappings file. ACS sentinels such as '(X)'
+        become missing values and are counted in sentinel_counts.
+        """
         try:
             exclude_columns = ['Geography', 'Geographic_Area_Name']
-            columns_to_convert = self.censusDF.select_dtypes(exclude=['number']).columns.difference(exclude_columns)
-
-            if not isinstance(columns_to_convert, list):
-                columns_to_convert = list(columns_to_convert)
-
-            for column in columns_to_convert:
-                if isinstance(self.censusDF[column], pd.Series):
-                    self.censusDF[column] = pd.to_numeric(self.censusDF[column], errors='coerce')
-                else:
-                    logging.warning(f"Column {column} is not a Series and was skipped.")
+            self.censusDF, self.sentinel_counts = convert_numeric(self.censusDF, self._schema, exclude_columns)
+            log_sentinel_counts(self.source_path, self.sentinel_counts)
 
             logging.info("Successfully converted columns to numeric types.")
         except Exception as e:
             logging.error(f"Error during conversion to numeric types: {e}")
             raise
 
-    def push_to_server(self, db_name: str, **sql_options) -> None:
+    def sql_dtypes(self, df: pd.DataFrame, chunked: bool = False) -> Dict[str, Any]:
+        """
+        Store the geography key as a fixed-width CHAR column, and pin the numeric column types when chunked.
+        """
+        if chunked:
+            return chunked_sql_dtypes(df, self._schema)
+        return key_sql_dtypes(df)
+
+    @traced(rows_in=attribute_rows('censusDF'), target=argument(1, 'db_name'))
+    def push_to_server(self, db_name: str, bulk_backend: Optional[str] = None, batch_size: int = 1000,
+                       manifest: Optional[LoadManifest] = None, force: bool = False,
+                       transform_options: Optional[Dict[str, Any]] = None, keys: Optional[KeySpec] = None,
+                       **sql_options) -> Dict[str, Any]:
         """
         Push the DataFrame to the specified database.
 
         Args:
             db_name (str): Name of the database to push data to.
+            bulk_backend (Optional[str]): Bulk load backend; chosen from the engine's dialect if None.
+            batch_size (int): Rows per INSERT statement for the batched backends.
+            manifest (Optional[LoadManifest]): Load manifest used to skip unchanged datasets.
+            force (bool): Upload even if the manifest says the table is current.
+            transform_options (Optional[Dict[str, Any]]): Options used to transform the data, part of the fingerprint.
+            keys (Optional[KeySpec]): Primary key and indexes built after the load; inferred if None, see infer_keys.
             **sql_options: Additional SQL options for data pushing.
 
+        Returns:
+            Dict[str, Any]: The load statistics, including rows_per_sec and whether the load was skipped.
+
         Raises:
             SQLAlchemyError: If a database related error occurs.
             Exception: For other unexpected errors.
@@ -257,8 +642,11 @@ class CensusData(PushDF):
         self.check_for_duplicate_columns()
 
         try:
-            self.censusDF.to_sql(db_name, con=self.engine, if_exists='replace', index=False, **sql_options)
-            logging.info(f"DataFrame successfully pushed to {db_name}.")
+            stats = self.load_frame(self.censusDF, db_name, bulk_backend, batch_size, manifest, force,
+                                    transform_options, keys, **sql_options)
+            if not stats['skipped']:
+                logging.info(f"DataFrame successfully pushed to {db_name}.")
+            return stats
         except SQLAlchemyError as e:
             logging.error(f"Database error occurred: {e}")
             raise
@@ -281,8 +669,10 @@ class CreateFromCSV(PushDF):
         Initializes the CreateFromCSV object with the CSV file and SQLAlchemy engine.
         """
         super().__init__(engine)
+        self.source_path = data_path(filename)
         self.df = self.read_in_df(filename)
 
+    @traced(target=argument(1, 'filename'))
     def read_in_df(self, filename: str, file_type: str = 'csv', **kwargs) -> pd.DataFrame:
         """
         Read data into a DataFrame from a file.
@@ -300,7 +690,7 @@ class CreateFromCSV(PushDF):
             Exception: For other unexpected errors.
         """
         # Flexible file path handling
-        path = filename if isabs(filename) else join(dirname(dirname(__file__)), f'data/{filename}')
+        path = data_path(filename)
 
         if not os.path.exists(path):
             logging.error(f"File not found: {path}")
@@ -320,22 +710,38 @@ class CreateFromCSV(PushDF):
             logging.error(f"Error reading file: {e}")
             raise
 
-    def push_to_server(self, db_name: str, **sql_options) -> None:
+    @traced(rows_in=attribute_rows('df'), target=argument(1, 'db_name'))
+    def push_to_server(self, db_name: str, bulk_backend: Optional[str] = None, batch_size: int = 1000,
+                       manifest: Optional[LoadManifest] = None, force: bool = False,
+                       transform_options: Optional[Dict[str, Any]] = None, keys: Optional[KeySpec] = None,
+                       **sql_options) -> Dict[str, Any]:
         """
         Push the DataFrame to the specified database.
 
         Args:
             db_name (str): Name of the database to push data to.
+            bulk_backend (Optional[str]): Bulk load backend; chosen from the engine's dialect if None.
+            batch_size (int): Rows per INSERT statement for the batched backends.
+            manifest (Optional[LoadManifest]): Load manifest used to skip unchanged datasets.
+            force (bool): Upload even if the manifest says the table is current.
+            transform_options (Optional[Dict[str, Any]]): Options used to transform the data, part of the fingerprint.
+            keys (Optional[KeySpec]): Primary key and indexes built after the load; inferred if None, see infer_keys.
             **sql_options: Additional SQL options for data pushing.
 
+        Returns:
+            Dict[str, Any]: The load statistics, including rows_per_sec and whether the load was skipped.
+
         Raises:
             SQLAlchemyError: If a database related error occurs.
             Exception: For other unexpected errors.
         """
 
         try:
-            self.df.to_sql(db_name, con=self.engine, if_exists='replace', index=False, **sql_options)
-            logging.info(f"DataFrame successfully pushed to {db_name}.")
+            stats = self.load_frame(self.df, db_name, bulk_backend, batch_size, manifest, force,
+                                    transform_options, keys, **sql_options)
+            if not stats['skipped']:
+                logging.info(f"DataFrame successfully pushed to {db_name}.")
+            return stats
         except SQLAlchemyError as e:
             logging.error(f"Database error occurred: {e}")
             raise
@@ -349,19 +755,23 @@ class CollectElectionAPI(PushDF, ABC):
     Class to extract data from a specified URL and load it into a database.
 
     Attributes:
-        data (StringIO): Buffer to hold downloaded data.
+        data (str): Path of the downloaded CSV in the HTTP cache, or any buffer read_csv accepts.
         url (str): URL to fetch data from.
+        fetcher (HttpFetcher): Fetch layer with the pooled session, retries and response cache.
         engine: SQLAlchemy engine for database operations.
     """
 
-    def __init__(self, engine, url: str = 'https://datawrapper.dwcdn.net/UI9i0/2/dataset.csv'):
+    def __init__(self, engine, url: str = 'https://datawrapper.dwcdn.net/UI9i0/2/dataset.csv',
+                 fetcher: Optional[HttpFetcher] = None):
         """
         Initializes ExtractData with a SQLAlchemy engine and a data URL.
         """
         super().__init__(engine)
         self.data = None
         self.url = url
+        self.fetcher = fetcher
 
+    @traced(target=argument(1, 'filename'))
     def read_in_df(self, filename: str, file_type: str = 'csv', **kwargs) -> pd.DataFrame:
         """
         Read data into a DataFrame from a file.
@@ -379,7 +789,7 @@ class CollectElectionAPI(PushDF, ABC):
             Exception: For other unexpected errors.
         """
         # Flexible file path handling
-        path = filename if isabs(filename) else join(dirname(dirname(__file__)), f'data/{filename}')
+        path = data_path(filename)
 
         if not os.path.exists(path):
             logging.error(f"File not found: {path}")
@@ -399,15 +809,29 @@ class CollectElectionAPI(PushDF, ABC):
             logging.error(f"Error reading file: {e}")
             raise
 
-    def extract(self) -> None:
+    @traced(target=lambda api, *args, **kwargs: api.url)
+    def extract(self, force: bool = False) -> Dict[str, Any]:
         """
-        Extracts data from the specified URL and stores it in 'data'.
+        Extracts data from the specified URL into the HTTP cache and points 'data' at it.
+
+        The download is streamed to disk and revalidated with a conditional GET on later runs, so an
+        unchanged dataset is not downloaded again.
+
+        Args:
+            force (bool): Download the data even if the cached copy is current.
+
+        Returns:
+            Dict[str, Any]: The fetch result, including whether the cached copy was reused.
         """
         try:
-            response = requests.get(self.url)
-            response.raise_for_status()  # Raise an HTTPError for bad responses
-            self.data = StringIO(response.text)
+            if self.fetcher is None:
+                self.fetcher = HttpFetcher()
+
+            result = self.fetcher.fetch(self.url, force=force)
+            self.data = result['path']
+            self.source_hash = result['sha256']
             logging.info("Data successfully extracted from URL.")
+            return result
         except requests.exceptions.HTTPError as e:
             logging.error(f"HTTP error occurred while extracting data: {e}")
             raise
@@ -418,6 +842,7 @@ class CollectElectionAPI(PushDF, ABC):
             logging.error(f"Unexpected error occurred while extracting data: {e}")
             raise
 
+    @traced()
     def get_df(self) -> pd.DataFrame:
         """
         Converts the extracted data into a Pandas DataFrame.
@@ -435,15 +860,35 @@ class CollectElectionAPI(PushDF, ABC):
             logging.error(f"Unexpected error occurred while converting data to DataFrame: {e}")
             raise
 
-    def push_to_server(self, db_name: str, **sql_options) -> None:
+    @traced(target=argument(1, 'db_name'))
+    def push_to_server(self, db_name: str, bulk_backend: Optional[str] = None, batch_size: int = 1000,
+                       manifest: Optional[LoadManifest] = None, force: bool = False,
+                       transform_options: Optional[Dict[str, Any]] = None, keys: Optional[KeySpec] = None,
+                       **sql_options) -> Dict[str, Any]:
         """
         Push the DataFrame to the specified database.
+
+        Args:
+            db_name (str): Name of the database to push data to.
+            bulk_backend (Optional[str]): Bulk load backend; chosen from the engine's dialect if None.
+            batch_size (int): Rows per INSERT statement for the batched backends.
+            manifest (Optional[LoadManifest]): Load manifest used to skip unchanged datasets.
+            force (bool): Upload even if the manifest says the table is current.
+            transform_options (Optional[Dict[str, Any]]): Options used to transform the data, part of the fingerprint.
+            keys (Optional[KeySpec]): Primary key and indexes built after the load; inferred if None, see infer_keys.
+            **sql_options: Additional SQL options for data pushing.
+
+        Returns:
+            Dict[str, Any]: The load statistics, including rows_per_sec and whether the load was skipped.
         """
         df = self.get_df()
 
         try:
-            df.to_sql(db_name, con=self.engine, if_exists='replace', index=False, **sql_options)
-            logging.info(f"DataFrame successfully pushed to {db_name}.")
+            stats = self.load_frame(df, db_name, bulk_backend, batch_size, manifest, force,
+                                    transform_options, keys, **sql_options)
+            if not stats['skipped']:
+                logging.info(f"DataFrame successfully pushed to {db_name}.")
+            return stats
         except SQLAlchemyError as e:
             logging.error(f"Database error occurred: {e}")
             raise
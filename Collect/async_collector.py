@@ -0,0 +1,241 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+########################################################################################################################
+# Created by Jack Hangen
+# Version 1
+# Concurrent collection of many remote sources
+########################################################################################################################
+
+# Dependencies
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+from Collect.Collect import CensusData, CreateFromCSV
+from Collect.http_fetch import HttpFetcher
+from instrumentation.trace import traced
+
+# takes the path of a downloaded file and returns the load statistics
+Handler = Callable[[str], Optional[Dict[str, Any]]]
+
+
+class Source:
+    """
+    A remote file to collect and the handler that processes it once downloaded.
+
+    Attributes:
+        name (str): Name used in the progress report and results, e.g. the target table.
+        url (str): URL to download.
+        handler (Handler): Called with the path of the downloaded file.
+    """
+
+    def __init__(self, name: str, url: str, handler: Handler):
+        self.name = name
+        self.url = url
+        self.handler = handler
+
+    @property
+    def host(self) -> str:
+        return urlsplit(self.url).netloc
+
+    def __repr__(self) -> str:
+        return f"Source({self.name!r}, {self.url!r})"
+
+
+def csv_handler(engine: Any, db_name: str, **push_options) -> Handler:
+    """
+    Returns a handler pushing a downloaded CSV to a table through CreateFromCSV.
+    """
+    def handle(path: str) -> Dict[str, Any]:
+        return CreateFromCSV(path, engine).push_to_server(db_name, **push_options)
+
+    return handle
+
+
+def census_handler(engine: Any, db_name: str, column_mappings_file: str, drop_duplicates: bool = True,
+                   columns: Optional[Iterable[str]] = None, **push_options) -> Handler:
+    """
+    Returns a handler mapping, converting and pushing a downloaded census extract through CensusData.
+    """
+    columns = sorted(columns) if columns is not None else None
+    transform_options = {'drop_duplicates': drop_duplicates, 'columns': columns}
+
+    def handle(path: str) -> Dict[str, Any]:
+        census_data = CensusData.load(path, column_mappings_file, engine, drop_duplicates=drop_duplicates,
+                                      columns=columns)
+        return census_data.push_to_server(db_name, transform_options=transform_options, **push_options)
+
+    return handle
+
+
+class RateLimiter:
+    """
+    Spaces out the starts of requests so no more than rate of them begin per second, across all hosts.
+    """
+
+    def __init__(self, rate: float):
+        if rate <= 0:
+            logging.error(f"rate must be positive, got {rate}")
+            raise ValueError(f"rate must be positive, got {rate}")
+        self.interval = 1.0 / rate
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class Progress:
+    """
+    Counts sources through the download and processing stages and logs a line as each one finishes.
+
+    Attributes:
+        total (int): Number of sources.
+        fetched (int): Sources downloaded or revalidated.
+        processed (int): Sources whose handler finished.
+        failed (int): Sources that failed at either stage.
+        bytes (int): Bytes downloaded.
+    """
+
+    def __init__(self, total: int):
+        self.total = total
+        self.fetched = 0
+        self.processed = 0
+        self.failed = 0
+        self.bytes = 0
+        self.start = time.perf_counter()
+
+    @property
+    def done(self) -> int:
+        return self.processed + self.failed
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Returns the counts so far and the elapsed seconds.
+        """
+        return {'total': self.total, 'fetched': self.fetched, 'processed': self.processed, 'failed': self.failed,
+                'bytes': self.bytes, 'seconds': time.perf_counter() - self.start}
+
+    def log(self, name: str, status: str) -> None:
+        logging.info(f"[{self.done}/{self.total}] {name} {status} "
+                     f"({self.fetched} fetched, {self.failed} failed, {self.bytes:,} bytes, "
+                     f"{time.perf_counter() - self.start:.1f}s)")
+
+
+class AsyncCollector:
+    """
+    Downloads many sources at the same time and processes each one as soon as its download finishes.
+
+    Downloads go through an HttpFetcher, so they share its pooled session, retries and response cache.
+    The blocking download and processing steps run in a thread pool driven by an asyncio event loop.
+    Concurrency is bounded per host, the start of requests is rate limited across all hosts, and the
+    number of handlers running at once is capped to bound memory.
+
+    Attributes:
+        fetcher (HttpFetcher): Fetch layer the downloads go through.
+        per_host (int): Downloads in flight per host, unless overridden in host_limits.
+        host_limits (Dict[str, int]): Downloads in flight for specific hosts, e.g. {'api.census.gov': 1}.
+        rate (Optional[float]): Requests started per second across all hosts; unlimited if None.
+        max_workers (int): Threads running downloads and handlers.
+        max_processing (int): Handlers running at once.
+        progress (Optional[Progress]): Progress of the current or last run.
+    """
+
+    def __init__(self, fetcher: Optional[HttpFetcher] = None, per_host: int = 2,
+                 host_limits: Optional[Dict[str, int]] = None, rate: Optional[float] = None,
+                 max_workers: int = 8, max_processing: int = 2):
+        for name, value in (('per_host', per_host), ('max_workers', max_workers),
+                            ('max_processing', max_processing)):
+            if value < 1:
+                logging.error(f"{name} must be at least 1, got {value}")
+                raise ValueError(f"{name} must be at least 1, got {value}")
+
+        self.fetcher = fetcher
+        self.per_host = per_host
+        self.host_limits = host_limits or {}
+        self.rate = rate
+        self.max_workers = max_workers
+        self.max_processing = max_processing
+        self.progress: Optional[Progress] = None
+
+    @traced()
+    def collect(self, sources: Iterable[Source]) -> List[Dict[str, Any]]:
+        """
+        Collects the sources, blocking until all of them are processed or failed.
+
+        Returns:
+            List[Dict[str, Any]]: One result per source, in the order given, see collect_async.
+        """
+        return asyncio.run(self.collect_async(sources))
+
+    async def collect_async(self, sources: Iterable[Source]) -> List[Dict[str, Any]]:
+        """
+        Collects the sources from a running event loop.
+
+        A source that fails is reported in its result and does not stop the others.
+
+        Returns:
+            List[Dict[str, Any]]: One result per source, in the order given: name, url, status ('ok' or
+            'failed'), the fetch result, the handler's statistics, the error if any, and the fetch,
+            processing and total seconds.
+        """
+        sources = list(sources)
+        if self.fetcher is None:
+            self.fetcher = HttpFetcher()
+
+        self.progress = Progress(len(sources))
+        host_semaphores = {host: asyncio.Semaphore(self.host_limits.get(host, self.per_host))
+                           for host in {source.host for source in sources}}
+        processing = asyncio.Semaphore(self.max_processing)
+        limiter = RateLimiter(self.rate) if self.rate else None
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            tasks = [self._collect_one(source, executor, host_semaphores[source.host], processing, limiter)
+                     for source in sources]
+            results = await asyncio.gather(*tasks)
+
+        report = self.progress.report()
+        logging.info(f"Collected {report['processed']} of {report['total']} sources ({report['failed']} failed) "
+                     f"in {report['seconds']:.1f}s")
+        return list(results)
+
+    async def _collect_one(self, source: Source, executor: ThreadPoolExecutor, host_semaphore: asyncio.Semaphore,
+                           processing: asyncio.Semaphore, limiter: Optional[RateLimiter]) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        result = {'name': source.name, 'url': source.url, 'status': 'failed', 'fetch': None, 'stats': None,
+                  'error': None, 'fetch_seconds': 0.0, 'process_seconds': 0.0}
+
+        try:
+            async with host_semaphore:
+                if limiter is not None:
+                    await limiter.wait()
+                result['fetch'] = await loop.run_in_executor(executor, self.fetcher.fetch, source.url)
+            result['fetch_seconds'] = time.perf_counter() - start
+            self.progress.fetched += 1
+            if not result['fetch']['from_cache']:
+                self.progress.bytes += result['fetch']['bytes']
+
+            async with processing:
+                process_start = time.perf_counter()
+                result['stats'] = await loop.run_in_executor(executor, source.handler, result['fetch']['path'])
+                result['process_seconds'] = time.perf_counter() - process_start
+
+            result['status'] = 'ok'
+            self.progress.processed += 1
+        except Exception as e:
+            logging.error(f"Collecting {source.name} from {source.url} failed: {e}")
+            result['error'] = repr(e)
+            self.progress.failed += 1
+
+        result['seconds'] = time.perf_counter() - start
+        self.progress.log(source.name, result['status'])
+        return result
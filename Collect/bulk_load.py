@@ -0,0 +1,206 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+########################################################################################################################
+# Created by Jack Hangen
+# Version 1
+# Bulk load data frames into the database
+########################################################################################################################
+
+# Dependencies
+import csv
+import logging
+import os
+import tempfile
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+
+class BulkLoader(ABC):
+    """
+    Base class for the bulk load backends used by push_to_server.
+
+    Attributes:
+        engine (Any): SQLAlchemy engine to load into.
+        batch_size (int): Rows per INSERT statement for the batched backends.
+    """
+
+    name = 'generic'
+
+    def __init__(self, engine: Any, batch_size: int = 1000):
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be at least 1, got {batch_size}")
+
+        self.engine = engine
+        self.batch_size = batch_size
+
+    def load(self, df: pd.DataFrame, table: str, if_exists: str = 'replace', **sql_options) -> Dict[str, Any]:
+        """
+        Loads a DataFrame into a table and reports the throughput.
+
+        Args:
+            df (pd.DataFrame): The rows to load.
+            table (str): Name of the target table.
+            if_exists (str): What to do when the table exists, as for DataFrame.to_sql.
+            **sql_options: Additional options for DataFrame.to_sql.
+
+        Returns:
+            Dict[str, Any]: The backend, table, rows, seconds and rows_per_sec of the load.
+        """
+        start = time.perf_counter()
+        self._load(df, table, if_exists, **sql_options)
+        seconds = time.perf_counter() - start
+
+        stats = {
+            'backend': self.name,
+            'table': table,
+            'rows': len(df),
+            'seconds': seconds,
+            'rows_per_sec': len(df) / seconds if seconds > 0 else float('inf'),
+        }
+        logging.info(f"{self.name} loaded {stats['rows']} rows into {table} in {seconds:.2f}s "
+                     f"({stats['rows_per_sec']:.0f} rows/sec)")
+
+        return stats
+
+    @abstractmethod
+    def _load(self, df: pd.DataFrame, table: str, if_exists: str, **sql_options) -> None:
+        pass
+
+
+class PandasLoader(BulkLoader):
+    """
+    Generic fallback that leaves batching to DataFrame.to_sql and the driver.
+    """
+
+    name = 'generic'
+
+    def _load(self, df: pd.DataFrame, table: str, if_exists: str, **sql_options) -> None:
+        df.to_sql(table, con=self.engine, if_exists=if_exists, index=False, **sql_options)
+
+
+class MultiRowInsertLoader(BulkLoader):
+    """
+    Loads with multi-row INSERT statements of batch_size rows each.
+    """
+
+    name = 'multi_row'
+
+    # SQLite refuses statements with more bound parameters than this
+    SQLITE_MAX_VARIABLES = 32766
+
+    def rows_per_statement(self, df: pd.DataFrame) -> int:
+        """
+        Returns the batch size, capped so a statement stays under the SQLite bound parameter limit.
+        """
+        if self.engine.dialect.name == 'sqlite' and len(df.columns):
+            return max(1, min(self.batch_size, self.SQLITE_MAX_VARIABLES // len(df.columns)))
+        return self.batch_size
+
+    def _load(self, df: pd.DataFrame, table: str, if_exists: str, **sql_options) -> None:
+        df.to_sql(table, con=self.engine, if_exists=if_exists, index=False, method='multi',
+                  chunksize=self.rows_per_statement(df), **sql_options)
+
+
+class LoadDataInfileLoader(BulkLoader):
+    """
+    Loads into MySQL with LOAD DATA LOCAL INFILE from a temporary CSV file.
+
+    The table is created from the DataFrame's columns first, so the column types match the other backends.
+    If the server refuses LOCAL INFILE the rows are loaded with multi-row INSERTs instead.
+    """
+
+    name = 'load_data'
+
+    def _load(self, df: pd.DataFrame, table: str, if_exists: str, **sql_options) -> None:
+        df.head(0).to_sql(table, con=self.engine, if_exists=if_exists, index=False, **sql_options)
+
+        path = self.write_infile(df)
+        try:
+            # MySQL reads the path as a string literal, so keep it free of backslashes
+            infile_path = path.replace('\\', '/')
+            preparer = self.engine.dialect.identifier_preparer
+            columns = ", ".join(preparer.quote_identifier(column) for column in df.columns)
+            statement = (
+                f"LOAD DATA LOCAL INFILE '{infile_path}' INTO TABLE {preparer.quote_identifier(table)} "
+                f"CHARACTER SET utf8mb4 "
+                f"FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' ESCAPED BY '\\\\' "
+                f"LINES TERMINATED BY '\\n' ({columns})"
+            )
+
+            with self.engine.begin() as conn:
+                conn.execute(text(statement))
+        except SQLAlchemyError as e:
+            logging.warning(f"LOAD DATA LOCAL INFILE failed for {table}, falling back to multi-row INSERT: {e}")
+            MultiRowInsertLoader(self.engine, self.batch_size)._load(df, table, 'append', **sql_options)
+        finally:
+            os.remove(path)
+
+    @staticmethod
+    def write_infile(df: pd.DataFrame) -> str:
+        """
+        Writes the rows to a temporary CSV file in the format the LOAD DATA statement expects.
+
+        Backslashes are doubled because the statement uses backslash as its escape character,
+        and missing values are written as the unquoted NULL marker.
+
+        Returns:
+            str: Path of the temporary file; the caller removes it.
+        """
+        frame = df.copy(deep=False)
+        for column in frame.columns:
+            series = frame[column]
+            if pd.api.types.is_bool_dtype(series):
+                frame[column] = series.astype('Int8')
+            elif pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series):
+                frame[column] = series.str.replace('\\', '\\\\', regex=False)
+
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', encoding='utf-8', newline='', delete=False) as infile:
+            frame.to_csv(infile, index=False, header=False, na_rep='\\N', quoting=csv.QUOTE_MINIMAL,
+                         lineterminator='\n')
+
+        return infile.name
+
+
+LOADERS = {
+    LoadDataInfileLoader.name: LoadDataInfileLoader,
+    MultiRowInsertLoader.name: MultiRowInsertLoader,
+    PandasLoader.name: PandasLoader,
+}
+
+# default backend per SQLAlchemy dialect; anything else gets the generic fallback
+DIALECT_LOADERS = {
+    'mysql': LoadDataInfileLoader.name,
+    'sqlite': MultiRowInsertLoader.name,
+    'duckdb': MultiRowInsertLoader.name,
+    'postgresql': MultiRowInsertLoader.name,
+}
+
+
+def get_bulk_loader(engine: Any, backend: Optional[str] = None, batch_size: int = 1000) -> BulkLoader:
+    """
+    Returns the bulk load backend for an engine.
+
+    Args:
+        engine (Any): SQLAlchemy engine to load into.
+        backend (Optional[str]): 'load_data', 'multi_row' or 'generic'; chosen from the engine's dialect if None.
+        batch_size (int): Rows per INSERT statement for the batched backends.
+
+    Returns:
+        BulkLoader: The loader.
+
+    Raises:
+        ValueError: If the backend is not known.
+    """
+    if backend is None:
+        backend = DIALECT_LOADERS.get(engine.dialect.name, PandasLoader.name)
+
+    if backend not in LOADERS:
+        logging.error(f"Unsupported bulk load backend: {backend}")
+        raise ValueError(f"Unsupported bulk load backend: {backend}")
+
+    return LOADERS[backend](engine, batch_size=batch_size)
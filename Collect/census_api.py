@@ -0,0 +1,211 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+########################################################################################################################
+# Created by Jack Hangen
+# Version 1
+# Census Data API collector
+########################################################################################################################
+
+# Dependencies
+import json
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlencode
+import pandas as pd
+from Collect.async_collector import AsyncCollector, Source
+from Collect.Collect import CensusData
+from Collect.http_fetch import HttpFetcher
+from Collect.manifest import bytes_hash
+from instrumentation.trace import argument, traced
+
+CENSUS_API_URL = 'https://api.census.gov/data'
+# the API rejects requests for more than 50 variables
+MAX_VARIABLES = 50
+GEOGRAPHY_LABELS = {'GEO_ID': 'Geography', 'NAME': 'Geographic Area Name'}
+
+# the states, DC and Puerto Rico, as in the exported county tables
+STATE_FIPS = [
+    '01', '02', '04', '05', '06', '08', '09', '10', '11', '12', '13', '15', '16', '17', '18', '19', '20', '21',
+    '22', '23', '24', '25', '26', '27', '28', '29', '30', '31', '32', '33', '34', '35', '36', '37', '38', '39',
+    '40', '41', '42', '44', '45', '46', '47', '48', '49', '50', '51', '53', '54', '55', '56', '72',
+]
+
+# the API returns these numbers where the exported tables show an annotation
+JAM_VALUES = {
+    '-999999999': 'N',
+    '-888888888': '(X)',
+    '-666666666': '-',
+    '-555555555': '*****',
+    '-333333333': '***',
+    '-222222222': '**',
+}
+
+
+def read_response(path: str) -> pd.DataFrame:
+    """
+    Reads a Census Data API response, a JSON array of rows whose first row is the header, into a DataFrame.
+    """
+    with open(path) as file:
+        rows = json.load(file)
+
+    if not rows:
+        raise ValueError(f"Empty Census API response in {path}")
+    return pd.DataFrame(rows[1:], columns=rows[0], dtype=object)
+
+
+class CensusAPICollector:
+    """
+    Pulls ACS tables from the Census Data API into the layout of the exported CSVs.
+
+    The variables of a table are requested in batches the API accepts, for every state in parallel
+    through an AsyncCollector, and the batches are joined back on GEO_ID into one wide frame. The
+    column mappings are generated from the table's variables metadata, so no mappings file is needed.
+
+    Attributes:
+        year (int): ACS vintage, e.g. 2019.
+        dataset (str): API dataset path, e.g. 'acs/acs5/subject'.
+        api_key (Optional[str]): Census API key; the API allows a small number of requests without one.
+        base_url (str): Root of the API.
+        batch_size (int): Variables per request, GEO_ID included.
+        fetcher (HttpFetcher): Fetch layer the metadata and data requests go through.
+        collector (AsyncCollector): Runs the data requests.
+    """
+
+    def __init__(self, year: int = 2019, dataset: str = 'acs/acs5/subject', api_key: Optional[str] = None,
+                 base_url: str = CENSUS_API_URL, batch_size: int = MAX_VARIABLES,
+                 fetcher: Optional[HttpFetcher] = None, collector: Optional[AsyncCollector] = None):
+        if not 2 <= batch_size <= MAX_VARIABLES:
+            logging.error(f"batch_size must be between 2 and {MAX_VARIABLES}, got {batch_size}")
+            raise ValueError(f"batch_size must be between 2 and {MAX_VARIABLES}, got {batch_size}")
+
+        self.year = year
+        self.dataset = dataset
+        self.api_key = api_key
+        self.base_url = base_url.rstrip('/')
+        self.batch_size = batch_size
+        self.fetcher = fetcher or (collector.fetcher if collector is not None else None) or HttpFetcher()
+        self.collector = collector or AsyncCollector(self.fetcher, per_host=4, max_workers=8, max_processing=8)
+        if self.collector.fetcher is None:
+            self.collector.fetcher = self.fetcher
+
+    @property
+    def dataset_url(self) -> str:
+        return f"{self.base_url}/{self.year}/{self.dataset}"
+
+    def query_url(self, variables: List[str], state: str, geography: str = 'county') -> str:
+        """
+        Builds the URL requesting some variables for every geography of a kind in a state.
+        """
+        params = {'get': ','.join(variables), 'for': f'{geography}:*', 'in': f'state:{state}'}
+        if self.api_key:
+            params['key'] = self.api_key
+        return f"{self.dataset_url}?{urlencode(params)}"
+
+    def column_mappings(self, group: str) -> pd.DataFrame:
+        """
+        Builds the column mappings of a table from its variables metadata.
+
+        Args:
+            group (str): The table, e.g. 'S1901'.
+
+        Returns:
+            pd.DataFrame: 'Column Name' and 'Label' of GEO_ID, NAME and every estimate and margin of error
+            variable, in variable order like the mappings files.
+
+        Raises:
+            ValueError: If the table has no estimate or margin of error variables.
+        """
+        with open(self.fetcher.fetch(f"{self.dataset_url}/groups/{group}.json")['path']) as file:
+            variables = json.load(file)['variables']
+
+        names = sorted(name for name in variables if name.startswith(f"{group}_") and name[-1] in 'EM')
+        if not names:
+            logging.error(f"No estimate or margin of error variables found for {group}")
+            raise ValueError(f"No estimate or margin of error variables found for {group}")
+
+        rows = list(GEOGRAPHY_LABELS.items()) + [(name, variables[name]['label']) for name in names]
+        return pd.DataFrame(rows, columns=['Column Name', 'Label'])
+
+    def batches(self, variables: Iterable[str]) -> List[List[str]]:
+        """
+        Splits variables into requests of at most batch_size variables, each starting with GEO_ID to join on.
+        """
+        variables = [variable for variable in variables if variable != 'GEO_ID']
+        size = self.batch_size - 1
+        return [['GEO_ID'] + variables[start:start + size] for start in range(0, len(variables), size)]
+
+    @traced(target=argument(1, 'group'))
+    def fetch_table(self, group: str, states: Optional[Iterable[str]] = None,
+                    geography: str = 'county') -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Downloads a table for every geography of a kind in the given states.
+
+        Args:
+            group (str): The table, e.g. 'S1901'.
+            states (Optional[Iterable[str]]): State FIPS codes; every state, DC and Puerto Rico if None.
+            geography (str): Geography level, e.g. 'county'.
+
+        Returns:
+            Tuple[pd.DataFrame, pd.DataFrame]: The table in the exported CSV layout, descriptive label row
+            included and sorted by GEO_ID, and its column mappings.
+
+        Raises:
+            RuntimeError: If any request failed.
+        """
+        mappings = self.column_mappings(group)
+        batches = self.batches(mappings['Column Name'])
+        states = list(states) if states is not None else STATE_FIPS
+
+        sources = [Source(f"{group} state {state} batch {index}", self.query_url(batch, state, geography),
+                          read_response)
+                   for state in states for index, batch in enumerate(batches)]
+        results = self.collector.collect(sources)
+
+        failed = [result['name'] for result in results if result['status'] != 'ok']
+        if failed:
+            logging.error(f"Census API requests failed: {failed}")
+            raise RuntimeError(f"Census API requests failed: {failed}")
+
+        frames = []
+        for start in range(0, len(results), len(batches)):
+            parts = [result['stats'].drop(columns=['state', geography], errors='ignore')
+                     for result in results[start:start + len(batches)]]
+            state_frame = parts[0]
+            for part in parts[1:]:
+                state_frame = state_frame.merge(part, on='GEO_ID', how='outer', validate='one_to_one')
+            frames.append(state_frame)
+
+        columns = mappings['Column Name'].tolist()
+        df = pd.concat(frames, ignore_index=True)[columns].replace(JAM_VALUES)
+        df = df.sort_values('GEO_ID', ignore_index=True)
+
+        label_row = pd.DataFrame([mappings['Label'].tolist()], columns=columns, dtype=object)
+        return pd.concat([label_row, df], ignore_index=True), mappings
+
+    @traced(target=argument(1, 'group'))
+    def census_data(self, group: str, engine: Any, states: Optional[Iterable[str]] = None,
+                    drop_duplicates: bool = True) -> CensusData:
+        """
+        Downloads a table and runs it through the same processing as an exported CSV.
+
+        Args:
+            group (str): The table, e.g. 'S1901'.
+            engine (Any): Database engine for pushing data.
+            states (Optional[Iterable[str]]): State FIPS codes; every state, DC and Puerto Rico if None.
+            drop_duplicates (bool): Drop repeated column labels, keeping the first.
+
+        Returns:
+            CensusData: The processed table, ready for push_to_server.
+        """
+        df, mappings = self.fetch_table(group, states)
+
+        census_data = CensusData(f"{group}.csv", engine, census_df=df)
+        census_data.source_hash = bytes_hash(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+        census_data.get_column_mappings(mappings)
+        census_data.apply_column_mappings()
+        census_data.convert_to_type_numeric()
+        if drop_duplicates:
+            census_data.drop_duplicate_columns()
+
+        return census_data
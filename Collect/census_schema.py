@@ -0,0 +1,187 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+########################################################################################################################
+# Created by Jack Hangen
+# Version 1
+# Census column schema and numeric conversion
+########################################################################################################################
+
+# Dependencies
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from sqlalchemy.types import CHAR, Float
+
+# annotation values the ACS tables put in place of a number
+SENTINELS = ('(X)', '-', 'N', '*****', '***', '**')
+
+# geography identifiers stored as fixed-width keys, e.g. 0500000US01001
+KEY_COLUMNS = ('Geography', 'GEO_ID')
+
+INT32_MAX = np.iinfo(np.int32).max
+# largest magnitude float32 still holds to the nearest integer
+FLOAT32_EXACT = 2 ** 24
+
+
+def column_kind(label: str) -> str:
+    """
+    Classifies a raw column mapping label as 'key', 'name', 'percent', 'margin' or 'estimate'.
+
+    Args:
+        label (str): The label as it appears in a column mappings file, e.g. 'Percent!!SEX AND AGE'.
+
+    Returns:
+        str: The kind of the column.
+    """
+    if label == 'Geography':
+        return 'key'
+    if label == 'Geographic Area Name':
+        return 'name'
+    if label.startswith('Percent'):
+        return 'percent'
+    if 'Margin of Error' in label:
+        return 'margin'
+    return 'estimate'
+
+
+def build_schema(df_column_mappings: pd.DataFrame, labels: Optional[pd.Series] = None) -> Dict[str, str]:
+    """
+    Builds the column kinds of a census table from its column mappings.
+
+    Args:
+        df_column_mappings (pd.DataFrame): The mappings file, with 'Column Name' and the raw 'Label'.
+        labels (Optional[pd.Series]): The formatted labels the columns are renamed to; the raw codes are used if None.
+
+    Returns:
+        Dict[str, str]: Column kind by column name, keeping the first kind of a repeated name.
+    """
+    names = df_column_mappings['Column Name'] if labels is None else labels
+    kinds = df_column_mappings['Label'].map(column_kind)
+
+    schema = {}
+    for name, kind in zip(names, kinds):
+        schema.setdefault(name, kind)
+    return schema
+
+
+def numeric_dtype(kind: Optional[str], integral: bool, has_na: bool, magnitude: float) -> str:
+    """
+    Picks the most compact dtype that holds a converted column without changing its values.
+
+    Percents are always float32. Other columns become int32, or nullable Int32 when they have missing
+    values, if every value is a whole number, and float32 otherwise. Columns too large for those fall
+    back to the 64-bit types.
+    """
+    if kind == 'percent' or not integral:
+        return 'float32' if magnitude < FLOAT32_EXACT else 'float64'
+
+    dtype = 'int32' if magnitude <= INT32_MAX else 'int64'
+    return dtype.capitalize() if has_na else dtype
+
+
+def convert_numeric(df: pd.DataFrame, schema: Optional[Dict[str, str]] = None,
+                    exclude: Iterable[str] = ()) -> Tuple[pd.DataFrame, Dict[str, int]]:
+    """
+    Converts every non-numeric column of a census DataFrame to a compact numeric dtype in one pass.
+
+    All the columns are parsed together as a single block instead of one to_numeric call per column.
+    Values that are not numbers become missing, as before, but are counted first: each ACS sentinel
+    gets its own count and anything else is counted under 'other'.
+
+    Args:
+        df (pd.DataFrame): The census data; repeated column names are allowed.
+        schema (Optional[Dict[str, str]]): Column kinds from build_schema.
+        exclude (Iterable[str]): Columns left as they are, e.g. the geography columns.
+
+    Returns:
+        Tuple[pd.DataFrame, Dict[str, int]]: The converted DataFrame and the counts of unparsed values.
+    """
+    schema = schema or {}
+    exclude = set(exclude)
+    positions = [position for position, (name, dtype) in enumerate(zip(df.columns, df.dtypes))
+                 if name not in exclude and not pd.api.types.is_numeric_dtype(dtype)]
+    if not positions:
+        return df, {}
+
+    raw = df.iloc[:, positions].to_numpy(dtype=object)
+    # column-major so every column stays contiguous in the flat array
+    flat = pd.Series(raw.ravel(order='F'))
+    sentinel = flat.isin(SENTINELS).to_numpy()
+    parse = ~(sentinel | flat.isna().to_numpy())
+
+    values = np.full(len(flat), np.nan)
+    try:
+        values[parse] = flat.to_numpy()[parse].astype('float64')
+    except ValueError:
+        # other text, e.g. '250,000+', goes through the slower coercing parser
+        values[parse] = pd.to_numeric(flat[parse], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+    missing = np.isnan(values)
+    values = values.reshape(raw.shape, order='F')
+
+    found = flat[sentinel].value_counts()
+    counts = {value: int(found.get(value, 0)) for value in SENTINELS}
+    counts['other'] = int((missing & parse).sum())
+    missing = missing.reshape(raw.shape, order='F')
+
+    filled = np.where(missing, 0.0, values)
+    integral = (filled == np.trunc(filled)).all(axis=0)
+    has_na = missing.any(axis=0)
+    magnitude = np.abs(filled).max(axis=0) if len(df) else np.zeros(len(positions))
+
+    groups: Dict[str, List[int]] = {}
+    for index, position in enumerate(positions):
+        dtype = numeric_dtype(schema.get(df.columns[position]), integral[index], has_na[index], magnitude[index])
+        groups.setdefault(dtype, []).append(index)
+
+    converted = set(positions)
+    order = [position for position in range(df.shape[1]) if position not in converted]
+    parts = [df.iloc[:, order]]
+    for dtype, indexes in groups.items():
+        block = pd.DataFrame(values[:, indexes], index=df.index, columns=df.columns[[positions[i] for i in indexes]])
+        parts.append(block.astype(dtype))
+        order += [positions[i] for i in indexes]
+
+    result = pd.concat(parts, axis=1).iloc[:, np.argsort(order)]
+    return result, counts
+
+
+def key_sql_dtypes(df: pd.DataFrame) -> Dict[str, CHAR]:
+    """
+    Returns fixed-width CHAR column types for the geography key columns of a DataFrame, for to_sql.
+    """
+    dtypes = {}
+    for column in KEY_COLUMNS:
+        if list(df.columns).count(column) == 1:
+            width = df[column].astype('string').str.len().max()
+            if pd.notna(width) and width > 0:
+                dtypes[column] = CHAR(int(width))
+    return dtypes
+
+
+def chunked_sql_dtypes(df: pd.DataFrame, schema: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """
+    Returns column types for a table written chunk by chunk, from its first chunk.
+
+    The dtypes convert_numeric picks for one chunk may not hold the values of the next, e.g. a column of
+    whole numbers that later has a fraction, so the numeric columns are created as single precision
+    for percents and double precision otherwise, which every later chunk fits.
+    """
+    schema = schema or {}
+    dtypes: Dict[str, Any] = {}
+    for column, dtype in zip(df.columns, df.dtypes):
+        if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype):
+            dtypes[column] = Float(precision=23) if schema.get(column) == 'percent' else Float(precision=53)
+
+    dtypes.update(key_sql_dtypes(df))
+    return dtypes
+
+
+def log_sentinel_counts(table: str, counts: Dict[str, int]) -> None:
+    """
+    Logs how many values of each sentinel were turned into missing values.
+    """
+    found = {sentinel: count for sentinel, count in counts.items() if count}
+    if found:
+        logging.info(f"Missing value sentinels in {table}: {found}")
@@ -0,0 +1,114 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+########################################################################################################################
+# Created by Jack Hangen
+# Version 1
+# Registry of the census datasets and process pool parsing
+########################################################################################################################
+
+# Dependencies
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional
+from Collect.Collect import CensusData
+from Collect.frame_cache import FrameCache
+
+
+class Dataset:
+    """
+    One census table: where it comes from and how it is processed.
+
+    Attributes:
+        table (str): Table the dataset is pushed to.
+        source (str): Census export in the data directory.
+        column_mappings (str): Its column mappings file in the data directory.
+        drop_duplicates (bool): Drop repeated column labels before pushing.
+        api_group (Optional[str]): ACS table pulled instead of the export with --census-api, e.g. 'S1901'.
+        api_dataset (Optional[str]): Census Data API dataset the ACS table is in, e.g. 'acs/acs5/subject'.
+    """
+
+    def __init__(self, table: str, source: str, column_mappings: str, drop_duplicates: bool = True,
+                 api_group: Optional[str] = None, api_dataset: Optional[str] = None):
+        self.table = table
+        self.source = source
+        self.column_mappings = column_mappings
+        self.drop_duplicates = drop_duplicates
+        self.api_group = api_group
+        self.api_dataset = api_dataset
+
+    def __repr__(self) -> str:
+        return f"Dataset({self.table!r}, source={self.source!r}, column_mappings={self.column_mappings!r})"
+
+
+# every census table the pipeline loads; adding an ACS table only takes an entry here
+CENSUS_DATASETS = {dataset.table: dataset for dataset in [
+    Dataset('AgeSexData', 'AgeSexData.csv', 'AgeSexData_columnMappings.csv', drop_duplicates=False,
+            api_group='S0101', api_dataset='acs/acs5/subject'),
+    Dataset('demographic_and_housing', 'demographic_and_housing.csv', 'demographic_and_housing_columnMappings.csv',
+            api_group='DP05', api_dataset='acs/acs5/profile'),
+    Dataset('occ', 'occ.csv', 'occ_columnMappings.csv',
+            api_group='S2406', api_dataset='acs/acs5/subject'),
+    Dataset('income', 'income.csv', 'income_columnMappings.csv',
+            api_group='S1901', api_dataset='acs/acs5/subject'),
+]}
+
+
+def parse_census(dataset: Dataset, columns: Optional[List[str]] = None,
+                 cache: Optional[FrameCache] = None) -> CensusData:
+    """
+    Reads a census export and applies its column mappings and numeric conversion, without an engine.
+
+    Runs in the worker processes of census_pool; the engine is attached by the caller before pushing.
+
+    Args:
+        dataset (Dataset): The dataset to parse.
+        columns (Optional[List[str]]): Mapped column labels to keep; every column is kept if None.
+        cache (Optional[FrameCache]): Cache of processed frames.
+
+    Returns:
+        CensusData: The processed census data, with engine None.
+    """
+    return CensusData.load(dataset.source, dataset.column_mappings, None, drop_duplicates=dataset.drop_duplicates,
+                           cache=cache, columns=columns)
+
+
+def census_pool(max_workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """
+    Creates the process pool census files are parsed in, one worker per core by default.
+
+    The workers are started from a fork server, or spawned where there is none, rather than forked from the
+    pipeline process, which may have loader threads running at the time.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+    if 'forkserver' in methods:
+        # import pandas and the parsers once in the fork server instead of in every worker
+        context.set_forkserver_preload([__name__])
+    max_workers = max_workers or os.cpu_count() or 1
+    logging.info(f"Parsing census files in {max_workers} worker processes")
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=context)
+
+
+def parse_all(datasets: Iterable[Dataset], max_workers: Optional[int] = None,
+              columns: Optional[Dict[str, List[str]]] = None,
+              cache: Optional[FrameCache] = None) -> Dict[str, CensusData]:
+    """
+    Parses several census datasets at once, each in its own worker process.
+
+    Args:
+        datasets (Iterable[Dataset]): The datasets to parse.
+        max_workers (Optional[int]): Worker processes; one per core if None.
+        columns (Optional[Dict[str, List[str]]]): Mapped column labels to keep per table; every column if None.
+        cache (Optional[FrameCache]): Cache of processed frames, shared by the workers through its directory.
+
+    Returns:
+        Dict[str, CensusData]: The processed census data by table, with engine None.
+    """
+    columns = columns or {}
+    with census_pool(max_workers) as pool:
+        futures = {dataset.table: pool.submit(parse_census, dataset, columns.get(dataset.table), cache)
+                   for dataset in datasets}
+        return {table: future.result() for table, future in futures.items()}
@@ -0,0 +1,216 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+########################################################################################################################
+# Created by Jack Hangen
+# Version 1
+# Election night polling with row-level delta upserts
+########################################################################################################################
+
+# Dependencies
+import logging
+import time
+from collections import deque
+from threading import Event
+from typing import Any, Dict, List, Optional, Tuple
+import pandas as pd
+import requests
+from sqlalchemy import MetaData, Table
+from sqlalchemy.exc import SQLAlchemyError
+from Collect.Collect import CollectElectionAPI
+from Collect.http_fetch import HttpFetcher
+from Collect.manifest import LoadManifest
+from instrumentation.trace import traced
+
+
+def diff_frames(previous: pd.DataFrame, current: pd.DataFrame, key: str) -> Tuple[pd.DataFrame, List[Any], int]:
+    """
+    Compares two snapshots of a table row by row on a key column.
+
+    Args:
+        previous (pd.DataFrame): The last snapshot.
+        current (pd.DataFrame): The new snapshot, with the same columns.
+        key (str): Column identifying a row, e.g. 'FIPS'.
+
+    Returns:
+        Tuple[pd.DataFrame, List[Any], int]: The rows of current that are new or changed, the keys that
+        are gone from current and how many of the returned rows are new.
+
+    Raises:
+        ValueError: If the key is missing or repeated in either snapshot.
+    """
+    for name, frame in (('previous', previous), ('current', current)):
+        if key not in frame.columns:
+            raise ValueError(f"Key column {key} is missing from the {name} snapshot")
+        if frame[key].duplicated().any():
+            duplicates = frame.loc[frame[key].duplicated(), key].tolist()
+            raise ValueError(f"Key column {key} is not unique in the {name} snapshot: {duplicates[:10]}")
+
+    before = previous.set_index(key)
+    after = current.set_index(key)
+
+    common = after.index.intersection(before.index)
+    old = before.loc[common, after.columns]
+    new = after.loc[common]
+    differs = (old != new) & ~(old.isna() & new.isna())
+    changed = common[differs.any(axis=1).to_numpy()]
+
+    added = after.index.difference(before.index)
+    deleted = before.index.difference(after.index).tolist()
+    upserts = current[current[key].isin(changed.append(added))]
+
+    return upserts, deleted, len(added)
+
+
+class ElectionPoller:
+    """
+    Polls the election results feed and writes only the rows that changed since the last poll.
+
+    The first poll replaces the table and keeps the frame as the snapshot. Every later poll revalidates
+    the feed with a conditional GET, diffs the new frame against the snapshot on the key column and, in
+    one transaction, deletes and re-inserts the changed rows and deletes the rows that disappeared.
+
+    Attributes:
+        api (CollectElectionAPI): Fetches and parses the feed.
+        table (str): Table kept up to date.
+        key (str): Column identifying a row.
+        interval (float): Seconds between the starts of two polls.
+        snapshot (Optional[pd.DataFrame]): The frame as of the last poll.
+        metrics (deque): Metrics of the most recent polls, see poll.
+    """
+
+    def __init__(self, engine: Any, url: str = 'https://datawrapper.dwcdn.net/UI9i0/2/dataset.csv',
+                 table: str = 'elections', key: str = 'FIPS', interval: float = 30.0,
+                 fetcher: Optional[HttpFetcher] = None, manifest: Optional[LoadManifest] = None,
+                 batch_size: int = 1000, history: int = 1000):
+        """
+        Args:
+            engine (Any): SQLAlchemy engine for database operations.
+            url (str): URL of the results feed.
+            table (str): Table kept up to date.
+            key (str): Column identifying a row.
+            interval (float): Seconds between the starts of two polls.
+            fetcher (Optional[HttpFetcher]): Fetch layer; the shared default if None.
+            manifest (Optional[LoadManifest]): Load manifest updated after every write.
+            batch_size (int): Rows per INSERT statement and keys per DELETE statement.
+            history (int): Number of polls whose metrics are kept.
+
+        Raises:
+            ValueError: If interval or batch_size is not positive.
+        """
+        if interval <= 0:
+            logging.error(f"interval must be positive, got {interval}")
+            raise ValueError(f"interval must be positive, got {interval}")
+        if batch_size < 1:
+            logging.error(f"batch_size must be at least 1, got {batch_size}")
+            raise ValueError(f"batch_size must be at least 1, got {batch_size}")
+
+        self.engine = engine
+        self.api = CollectElectionAPI(engine, url, fetcher=fetcher)
+        self.table = table
+        self.key = key
+        self.interval = interval
+        self.manifest = manifest
+        self.batch_size = batch_size
+        self.snapshot: Optional[pd.DataFrame] = None
+        self.polls = 0
+        self.metrics = deque(maxlen=history)
+
+    @traced(target=lambda poller: poller.table)
+    def poll(self) -> Dict[str, Any]:
+        """
+        Runs one poll: fetch, diff against the snapshot and write the changed rows.
+
+        Returns:
+            Dict[str, Any]: The poll metrics: poll number, mode ('full', 'delta' or 'not_modified'), rows in
+            the feed, inserted, updated and deleted row counts, and the fetch, diff, write and total seconds.
+        """
+        start = time.perf_counter()
+        self.polls += 1
+        metrics = {'poll': self.polls, 'mode': 'not_modified', 'rows': 0, 'inserted': 0, 'updated': 0,
+                   'deleted': 0, 'fetch_seconds': 0.0, 'diff_seconds': 0.0, 'write_seconds': 0.0}
+
+        result = self.api.extract()
+        not_modified = result['from_cache'] and self.snapshot is not None
+        df = None if not_modified else self.api.get_df()
+        metrics['fetch_seconds'] = time.perf_counter() - start
+
+        if df is not None:
+            metrics['rows'] = len(df)
+            if self.snapshot is None or list(df.columns) != list(self.snapshot.columns):
+                self._replace(df, metrics)
+            else:
+                self._delta(df, metrics)
+
+            self.snapshot = df
+            if self.manifest is not None:
+                self.manifest.record(self.table, self.api.fingerprint(), len(df))
+        else:
+            metrics['rows'] = len(self.snapshot)
+
+        metrics['seconds'] = time.perf_counter() - start
+        self.metrics.append(metrics)
+        logging.info(f"Poll {metrics['poll']} of {self.table} ({metrics['mode']}): {metrics['inserted']} inserted, "
+                     f"{metrics['updated']} updated, {metrics['deleted']} deleted in {metrics['seconds']:.2f}s")
+        return metrics
+
+    def _replace(self, df: pd.DataFrame, metrics: Dict[str, Any]) -> None:
+        write_start = time.perf_counter()
+        self.api.load_frame(df, self.table, batch_size=self.batch_size)
+        metrics.update(mode='full', inserted=len(df), write_seconds=time.perf_counter() - write_start)
+
+    def _delta(self, df: pd.DataFrame, metrics: Dict[str, Any]) -> None:
+        diff_start = time.perf_counter()
+        upserts, deleted, added = diff_frames(self.snapshot, df, self.key)
+        metrics.update(mode='delta', inserted=added, updated=len(upserts) - added, deleted=len(deleted),
+                       diff_seconds=time.perf_counter() - diff_start)
+
+        if len(upserts) or deleted:
+            write_start = time.perf_counter()
+            self.upsert(upserts, deleted)
+            metrics['write_seconds'] = time.perf_counter() - write_start
+
+    def upsert(self, rows: pd.DataFrame, deleted: List[Any]) -> None:
+        """
+        Replaces rows by key and deletes rows by key, in one transaction.
+
+        Args:
+            rows (pd.DataFrame): Rows to write; existing rows with the same keys are replaced.
+            deleted (List[Any]): Keys of rows to delete.
+        """
+        keys = rows[self.key].tolist() + list(deleted)
+
+        with self.engine.begin() as connection:
+            table = Table(self.table, MetaData(), autoload_with=connection)
+            for start in range(0, len(keys), self.batch_size):
+                batch = keys[start:start + self.batch_size]
+                connection.execute(table.delete().where(table.c[self.key].in_(batch)))
+
+            if len(rows):
+                rows.to_sql(self.table, connection, if_exists='append', index=False, method='multi',
+                            chunksize=self.batch_size)
+
+    def run(self, max_polls: Optional[int] = None, stop: Optional[Event] = None) -> None:
+        """
+        Polls every interval seconds until stopped.
+
+        A failed poll is logged and retried on the next interval, so a flaky feed or database does not end
+        the run.
+
+        Args:
+            max_polls (Optional[int]): Stop after this many polls; run until stopped if None.
+            stop (Optional[Event]): Set from another thread to stop after the current poll.
+        """
+        stop = stop or Event()
+        polls = 0
+        while not stop.is_set():
+            start = time.monotonic()
+            try:
+                self.poll()
+            except (requests.exceptions.RequestException, SQLAlchemyError, ValueError) as e:
+                logging.error(f"Poll of {self.table} failed: {e}")
+
+            polls += 1
+            if max_polls is not None and polls >= max_polls:
+                break
+            stop.wait(max(0.0, self.interval - (time.monotonic() - start)))
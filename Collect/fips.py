@@ -0,0 +1,79 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+########################################################################################################################
+# Created by Jack Hangen
+# Version 1
+# Integer county FIPS key materialized at load time
+########################################################################################################################
+
+# Dependencies
+from typing import Optional, Tuple
+import pandas as pd
+from Collect.census_schema import KEY_COLUMNS
+
+FIPS_COLUMN = 'FIPS'
+
+# the five digit county code, alone or at the end of a census geography id, e.g. 0500000US01001
+FIPS_PATTERN = r'(?:^|US)(\d{1,5})(?:\.0)?$'
+
+
+def parse_fips(values: pd.Series) -> pd.Series:
+    """
+    Parses county FIPS codes into nullable integers.
+
+    Accepts integers, zero padded strings such as '01001' and census geography ids such as
+    '0500000US01001'. Anything else, e.g. the national or state level ids, becomes missing.
+
+    Args:
+        values (pd.Series): The codes.
+
+    Returns:
+        pd.Series: The codes as Int64.
+    """
+    if pd.api.types.is_integer_dtype(values.dtype):
+        return values.astype('Int64')
+
+    digits = values.astype('string').str.strip().str.extract(FIPS_PATTERN, expand=False)
+    return pd.to_numeric(digits, errors='coerce').astype('Int64')
+
+
+def fips_column(df: pd.DataFrame) -> Optional[str]:
+    """
+    Returns the name of a DataFrame's FIPS column, matched case-insensitively, e.g. 'fips' in FIPS.csv.
+    """
+    return next((column for column in df.columns if str(column).lower() == FIPS_COLUMN.lower()), None)
+
+
+def with_fips(df: pd.DataFrame) -> Tuple[pd.DataFrame, Optional[str]]:
+    """
+    Gives a DataFrame an integer county FIPS column, so the tables can be joined on indexed integers.
+
+    An existing FIPS column is converted to integers in place. Otherwise one named FIPS is derived from the
+    census geography id and put first. The frame passed in is not changed.
+
+    Args:
+        df (pd.DataFrame): The rows to load.
+
+    Returns:
+        Tuple[pd.DataFrame, Optional[str]]: The rows with the FIPS column, and its name, or the rows unchanged
+        and None when there is nothing to derive it from or the FIPS column is repeated.
+    """
+    key = fips_column(df)
+    if key is not None:
+        if list(df.columns).count(key) > 1:
+            return df, None
+        if pd.api.types.is_integer_dtype(df[key].dtype):
+            return df, key
+        df = df.copy(deep=False)
+        df[key] = parse_fips(df[key])
+        return df, key
+
+    source = next((column for column in KEY_COLUMNS if list(df.columns).count(column) == 1), None)
+    if source is None:
+        return df, None
+
+    df = df.copy(deep=False)
+    df.insert(0, FIPS_COLUMN, parse_fips(df[source]))
+    return df, FIPS_COLUMN
+
@@ -0,0 +1,171 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+########################################################################################################################
+# Created by Jack Hangen
+# Version 1
+# On-disk cache of processed data frames
+########################################################################################################################
+
+# Dependencies
+import json
+import logging
+import os
+from os.path import join, dirname
+from threading import Lock
+from typing import Any, Optional
+import pandas as pd
+from Collect.manifest import bytes_hash
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+DEFAULT_CACHE_DIR = join(dirname(dirname(__file__)), 'cache', 'frames')
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+class FrameCache:
+    """
+    A size-bounded, least-recently-used cache of DataFrames stored as Parquet files.
+
+    Entries are addressed by a key built from whatever identifies their content, e.g. the hashes of
+    the source and mapping files. Reading an entry refreshes its modification time, which is what
+    eviction orders by. The cache is disabled, with a warning, when pyarrow is not installed.
+
+    Attributes:
+        directory (str): Directory holding the cached files.
+        max_bytes (int): Total size the cache is trimmed back to after every write.
+        hits (int): Number of lookups served from the cache.
+        misses (int): Number of lookups that were not.
+    """
+
+    SUFFIX = '.parquet'
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.enabled = HAS_PYARROW
+        self._lock = Lock()
+
+        if not self.enabled:
+            logging.warning("pyarrow is not installed, the frame cache is disabled.")
+        else:
+            os.makedirs(self.directory, exist_ok=True)
+
+    def __getstate__(self) -> dict:
+        # the lock cannot be pickled; worker processes share the cache through its directory
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = Lock()
+
+    @staticmethod
+    def key(*parts: Any) -> str:
+        """
+        Builds a cache key from JSON-serializable parts.
+        """
+        return bytes_hash(json.dumps(parts, sort_keys=True, default=str).encode('utf-8'))
+
+    def path(self, key: str) -> str:
+        return join(self.directory, f"{key}{self.SUFFIX}")
+
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        """
+        Returns the cached DataFrame for a key, or None on a miss.
+        """
+        path = self.path(key)
+        if not self.enabled or not os.path.exists(path):
+            self.misses += 1
+            return None
+
+        try:
+            df = pd.read_parquet(path)
+            os.utime(path)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Could not read cached frame {path}, ignoring it: {e}")
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        logging.info(f"Frame cache hit for {key}")
+        return df
+
+    def put(self, key: str, df: pd.DataFrame) -> bool:
+        """
+        Stores a DataFrame under a key and evicts the least recently used entries beyond max_bytes.
+
+        Returns:
+            bool: Whether the frame was cached.
+        """
+        if not self.enabled:
+            return False
+        if df.columns.duplicated().any():
+            logging.warning("Frames with duplicate column names cannot be cached.")
+            return False
+
+        path = self.path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            df.to_parquet(tmp_path, index=True)
+            os.replace(tmp_path, path)
+        except (OSError, ValueError, TypeError) as e:
+            logging.warning(f"Could not cache frame {key}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+
+        self.evict()
+        return True
+
+    def size(self) -> int:
+        """
+        Returns the total size of the cached files in bytes.
+        """
+        return sum(size for _, _, size in self._entries())
+
+    def evict(self) -> None:
+        """
+        Removes the least recently used entries until the cache fits in max_bytes.
+        """
+        with self._lock:
+            entries = sorted(self._entries(), key=lambda entry: entry[1])
+            total = sum(size for _, _, size in entries)
+
+            while entries and total > self.max_bytes:
+                path, _, size = entries.pop(0)
+                try:
+                    os.remove(path)
+                    total -= size
+                    logging.info(f"Evicted {path} from the frame cache")
+                except FileNotFoundError:
+                    total -= size
+
+    def clear(self) -> None:
+        """
+        Removes every cached entry.
+        """
+        for path, _, _ in self._entries():
+            os.remove(path)
+
+    def _entries(self):
+        if not os.path.isdir(self.directory):
+            return []
+
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(self.SUFFIX):
+                path = join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((path, stat.st_mtime_ns, stat.st_size))
+        return entries
@@ -0,0 +1,192 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+########################################################################################################################
+# Created by Jack Hangen
+# Version 1
+# HTTP fetching with pooled sessions, retries and an on-disk response cache
+########################################################################################################################
+
+# Dependencies
+import hashlib
+import json
+import logging
+import os
+import time
+from os.path import join, dirname, exists
+from threading import Lock
+from typing import Any, Dict, Optional, Tuple
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from Collect.manifest import bytes_hash
+from instrumentation.trace import argument, traced
+
+DEFAULT_HTTP_CACHE_DIR = join(dirname(dirname(__file__)), 'cache', 'http')
+DEFAULT_TIMEOUT = (5, 60)
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_sessions: Dict[Tuple, requests.Session] = {}
+_session_lock = Lock()
+
+
+def build_session(retries: int = 3, backoff_factor: float = 0.5, pool_maxsize: int = 10) -> requests.Session:
+    """
+    Creates a Session whose connections are pooled per host and whose GETs are retried with exponential backoff.
+
+    Connection errors and the statuses in RETRY_STATUSES are retried, waiting backoff_factor * 2 ** n seconds
+    between attempts, or as long as a Retry-After header asks.
+
+    Args:
+        retries (int): Retries after the first attempt.
+        backoff_factor (float): Base of the exponential backoff, in seconds.
+        pool_maxsize (int): Connections kept open per host.
+
+    Returns:
+        requests.Session: The configured session.
+    """
+    retry = Retry(total=retries, connect=retries, read=retries, status=retries, backoff_factor=backoff_factor,
+                  status_forcelist=RETRY_STATUSES, allowed_methods=frozenset({'GET', 'HEAD'}),
+                  respect_retry_after_header=True, raise_on_status=False)
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=pool_maxsize, pool_maxsize=pool_maxsize)
+
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def get_session(**options) -> requests.Session:
+    """
+    Returns the process-wide Session for a set of build_session options, creating it on first use.
+    """
+    key = tuple(sorted(options.items()))
+    with _session_lock:
+        if key not in _sessions:
+            _sessions[key] = build_session(**options)
+        return _sessions[key]
+
+
+def close_sessions() -> None:
+    """
+    Closes every shared Session and its pooled connections.
+    """
+    with _session_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+
+class HttpFetcher:
+    """
+    Downloads URLs into an on-disk cache, revalidating cached copies with conditional GETs.
+
+    A cached response is sent back with If-None-Match and If-Modified-Since headers built from its ETag and
+    Last-Modified, so an unchanged resource costs a 304 and no body. New bodies are streamed to disk in
+    chunks and hashed on the way, never held in memory whole.
+
+    Attributes:
+        session (requests.Session): Session the requests go through.
+        cache_dir (str): Directory holding the cached bodies and their metadata.
+        timeout (Tuple[float, float]): Connect and read timeouts in seconds.
+        chunk_size (int): Bytes written to disk at a time.
+    """
+
+    def __init__(self, session: Optional[requests.Session] = None, cache_dir: str = DEFAULT_HTTP_CACHE_DIR,
+                 timeout: Tuple[float, float] = DEFAULT_TIMEOUT, chunk_size: int = 64 * 1024):
+        self.session = session if session is not None else get_session()
+        self.cache_dir = cache_dir
+        self.timeout = timeout
+        self.chunk_size = chunk_size
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def paths(self, url: str) -> Tuple[str, str]:
+        """
+        Returns the body and metadata file paths of a URL in the cache.
+        """
+        key = bytes_hash(url.encode('utf-8'))
+        return join(self.cache_dir, f"{key}.body"), join(self.cache_dir, f"{key}.json")
+
+    def cached(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns the cached metadata of a URL, or None if it has no usable cached copy.
+        """
+        body_path, meta_path = self.paths(url)
+        if not exists(body_path) or not exists(meta_path):
+            return None
+
+        try:
+            with open(meta_path) as file:
+                return json.load(file)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable HTTP cache entry for {url}: {e}")
+            return None
+
+    @traced(target=argument(1, 'url'))
+    def fetch(self, url: str, force: bool = False) -> Dict[str, Any]:
+        """
+        Fetches a URL into the cache, revalidating the cached copy if there is one.
+
+        Args:
+            url (str): URL to fetch.
+            force (bool): Download the body even if a cached copy exists.
+
+        Returns:
+            Dict[str, Any]: The cache entry: path, sha256, etag, last_modified, bytes, plus the response
+            status and whether the cached body was reused.
+
+        Raises:
+            requests.exceptions.HTTPError: If the server answers with an error status after the retries.
+            requests.exceptions.RequestException: If the request fails, e.g. after repeated connection errors.
+        """
+        body_path, meta_path = self.paths(url)
+        cached = None if force else self.cached(url)
+
+        headers = {}
+        if cached is not None:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        start = time.perf_counter()
+        with self.session.get(url, headers=headers, timeout=self.timeout, stream=True) as response:
+            if response.status_code == 304 and cached is not None:
+                logging.info(f"{url} not modified, using the cached copy.")
+                return {**cached, 'path': body_path, 'status': 304, 'from_cache': True}
+
+            response.raise_for_status()
+            sha256, size = self._download(response, body_path)
+
+        entry = {
+            'url': url,
+            'path': body_path,
+            'sha256': sha256,
+            'bytes': size,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+        }
+        with open(meta_path, 'w') as file:
+            json.dump(entry, file)
+
+        seconds = time.perf_counter() - start
+        logging.info(f"Downloaded {size:,} bytes from {url} in {seconds:.2f}s")
+        return {**entry, 'status': response.status_code, 'from_cache': False}
+
+    def _download(self, response: requests.Response, body_path: str) -> Tuple[str, int]:
+        digest = hashlib.sha256()
+        size = 0
+        tmp_path = f"{body_path}.{os.getpid()}.tmp"
+
+        try:
+            with open(tmp_path, 'wb') as file:
+                for chunk in response.iter_content(chunk_size=self.chunk_size):
+                    file.write(chunk)
+                    digest.update(chunk)
+                    size += len(chunk)
+            os.replace(tmp_path, body_path)
+        finally:
+            if exists(tmp_path):
+                os.remove(tmp_path)
+
+        return digest.hexdigest(), size
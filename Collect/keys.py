@@ -0,0 +1,146 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+########################################################################################################################
+# Created by Jack Hangen
+# Version 1
+# Primary keys and indexes built after a bulk load
+########################################################################################################################
+
+# Dependencies
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+import pandas as pd
+from sqlalchemy import Column, Index, Integer, MetaData, String, Table, text
+from Collect.fips import FIPS_COLUMN
+
+# columns indexed whenever a table has them, for the lookups made on POL_FINAL
+SECONDARY_INDEXES = ['state_abbr']
+
+# MySQL rejects longer identifiers
+MAX_NAME_LENGTH = 64
+
+
+class KeySpec:
+    """
+    The primary key and secondary indexes of a table.
+
+    Attributes:
+        primary_key (Optional[List[str]]): Columns of the primary key, if there is one.
+        indexes (List[List[str]]): Columns of each secondary index.
+    """
+
+    def __init__(self, primary_key: Optional[Sequence[str]] = None, indexes: Iterable[Sequence[str]] = ()):
+        self.primary_key = list(primary_key) if primary_key else None
+        self.indexes = [list(columns) for columns in indexes]
+
+    def columns(self) -> List[str]:
+        """
+        Returns every column of the key and the indexes, without repeats.
+        """
+        columns = list(self.primary_key or [])
+        for index in self.indexes:
+            columns += index
+        return list(dict.fromkeys(columns))
+
+    def __eq__(self, other: Any) -> bool:
+        return (isinstance(other, KeySpec) and self.primary_key == other.primary_key
+                and self.indexes == other.indexes)
+
+    def __repr__(self) -> str:
+        return f"KeySpec(primary_key={self.primary_key!r}, indexes={self.indexes!r})"
+
+
+def infer_keys(columns: Iterable[str], key: Optional[str] = FIPS_COLUMN,
+               key_values: Optional[pd.Series] = None) -> KeySpec:
+    """
+    Works out the keys of a table from its columns.
+
+    The FIPS key becomes the primary key when its values are known to be unique and never missing, and a
+    plain index otherwise, e.g. for FIPS.csv, which lists 11001 twice. Columns in SECONDARY_INDEXES get an
+    index of their own.
+
+    Args:
+        columns (Iterable[str]): The table's columns.
+        key (Optional[str]): Name of its FIPS column, see with_fips; no key if None or not a column.
+        key_values (Optional[pd.Series]): Every value of the key column; without them the key is only indexed.
+
+    Returns:
+        KeySpec: The keys to build.
+    """
+    columns = list(columns)
+    primary_key = None
+    indexes = []
+
+    if key is not None and key in columns:
+        if key_values is not None and key_values.notna().all() and key_values.is_unique:
+            primary_key = [key]
+        else:
+            indexes.append([key])
+
+    indexes += [[column] for column in SECONDARY_INDEXES if column in columns and column != key]
+    return KeySpec(primary_key, indexes)
+
+
+def key_sql_types(df: pd.DataFrame, spec: KeySpec) -> Dict[str, Any]:
+    """
+    Returns column types for the key columns that every database can index: integers for whole numbers and
+    VARCHARs as wide as the longest value for text, which MySQL cannot index as TEXT.
+    """
+    types = {}
+    for column in spec.columns():
+        if list(df.columns).count(column) != 1:
+            continue
+        if pd.api.types.is_integer_dtype(df[column].dtype):
+            types[column] = Integer()
+        elif not pd.api.types.is_numeric_dtype(df[column].dtype):
+            width = df[column].astype('string').str.len().max()
+            types[column] = String(int(width) if pd.notna(width) and width > 0 else 1)
+    return types
+
+
+def _name(prefix: str, table: str, columns: Sequence[str]) -> str:
+    return f"{prefix}_{table}_{'_'.join(columns)}"[:MAX_NAME_LENGTH]
+
+
+def create_keys(engine: Any, table: str, spec: KeySpec) -> List[str]:
+    """
+    Builds the keys of a loaded table, in one pass over the table per key rather than row by row during the load.
+
+    SQLite and DuckDB cannot add a primary key to an existing table, so there it is a unique index.
+
+    Args:
+        engine (Any): SQLAlchemy engine the table is in.
+        table (str): The table.
+        spec (KeySpec): The keys to build.
+
+    Returns:
+        List[str]: Names of the keys built.
+    """
+    columns = spec.columns()
+    if not columns:
+        return []
+
+    # only the key columns are needed to emit the DDL, so the table is not reflected
+    target = Table(table, MetaData(), *[Column(column, Integer) for column in columns])
+    built = []
+
+    with engine.begin() as conn:
+        if spec.primary_key:
+            if engine.dialect.name in ('sqlite', 'duckdb'):
+                name = _name('pk', table, spec.primary_key)
+                Index(name, *[target.c[column] for column in spec.primary_key], unique=True).create(conn)
+            else:
+                name = 'PRIMARY'
+                quoted = ', '.join(engine.dialect.identifier_preparer.quote(column) for column in spec.primary_key)
+                conn.execute(text(f"ALTER TABLE {engine.dialect.identifier_preparer.quote(table)} "
+                                  f"ADD PRIMARY KEY ({quoted})"))
+            built.append(name)
+
+        for index in spec.indexes:
+            name = _name('ix', table, index)
+            Index(name, *[target.c[column] for column in index]).create(conn)
+            built.append(name)
+
+    logging.info(f"Built keys of {table}: {built}")
+    return built
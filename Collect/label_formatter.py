@@ -0,0 +1,161 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+########################################################################################################################
+# Created by Jack Hangen
+# Version 1
+# Compiled census column label formatter
+########################################################################################################################
+
+# Dependencies
+from collections import OrderedDict
+from functools import lru_cache
+from threading import Lock
+from typing import List, Sequence, Tuple
+import pandas as pd
+
+Replacement = Tuple[str, str]
+
+# joins labels into one buffer; picked so no rule can match across two labels
+SEPARATOR_CANDIDATES = ['\x00', '\x1f', '\x1e', '\n']
+
+
+def _overlaps(first: str, second: str) -> bool:
+    """
+    Checks whether occurrences of two strings can overlap in some text.
+    """
+    if first in second or second in first:
+        return True
+
+    shortest = min(len(first), len(second))
+    return any(first.endswith(second[:size]) or second.endswith(first[:size]) for size in range(1, shortest))
+
+
+def _removes_all(old: str, new: str) -> bool:
+    """
+    Checks whether str.replace(old, new) is guaranteed to leave no occurrence of old behind.
+    """
+    return bool(new) and not _overlaps(new, old)
+
+
+def compile_replacements(replacements: Sequence[Replacement]) -> List[Replacement]:
+    """
+    Compiles an ordered list of str.replace rules, dropping the rules that can never match.
+
+    A rule is dead when an earlier rule removes every occurrence of a substring of its pattern and
+    no rule in between can write that substring back. Applying the remaining rules in order gives
+    exactly the same result as applying all of them.
+
+    Args:
+        replacements (Sequence[Replacement]): (old, new) pairs applied in order.
+
+    Returns:
+        List[Replacement]: The rules that can still fire, in order.
+    """
+    compiled = []
+
+    for position, (old, new) in enumerate(replacements):
+        if not old:
+            raise ValueError("Replacement patterns must not be empty")
+
+        dead = False
+        for earlier_position, (earlier_old, earlier_new) in enumerate(replacements[:position]):
+            if earlier_old not in old or not _removes_all(earlier_old, earlier_new):
+                continue
+            between = replacements[earlier_position + 1:position]
+            if all(between_new and not _overlaps(between_new, earlier_old) for _, between_new in between):
+                dead = True
+                break
+
+        if not dead:
+            compiled.append((old, new))
+
+    return compiled
+
+
+class LabelFormatter:
+    """
+    Applies a compiled replacement table to labels, memoizing the results in a bounded cache.
+
+    A Series of labels is formatted by joining the labels not yet in the memo into one buffer and
+    running each rule over the buffer once, instead of running every rule over every label.
+
+    Attributes:
+        rules (List[Replacement]): The compiled rules.
+        maxsize (int): Number of formatted labels kept in the memo.
+    """
+
+    def __init__(self, replacements: Sequence[Replacement], maxsize: int = 8192):
+        self.rules = compile_replacements(replacements)
+        self.maxsize = maxsize
+        self.separator = next((candidate for candidate in SEPARATOR_CANDIDATES
+                               if not any(candidate in old or candidate in new for old, new in self.rules)), None)
+        self._memo: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = Lock()
+
+    def _remember(self, label: str, formatted: str) -> None:
+        with self._lock:
+            self._memo[label] = formatted
+            self._memo.move_to_end(label)
+            while len(self._memo) > self.maxsize:
+                self._memo.popitem(last=False)
+
+    def _recall(self, label: str):
+        with self._lock:
+            formatted = self._memo.get(label)
+            if formatted is not None:
+                self._memo.move_to_end(label)
+            return formatted
+
+    def _apply(self, label: str) -> str:
+        for old, new in self.rules:
+            label = label.replace(old, new)
+        return label
+
+    def format(self, label: str) -> str:
+        """
+        Formats a single label.
+        """
+        formatted = self._recall(label)
+        if formatted is None:
+            formatted = self._apply(label)
+            self._remember(label, formatted)
+        return formatted
+
+    def format_labels(self, labels: Sequence[str]) -> List[str]:
+        """
+        Formats many labels at once through one joined buffer.
+        """
+        separator = self.separator
+        if separator is None or any(separator in label for label in labels):
+            return [self._apply(label) for label in labels]
+
+        return self._apply(separator.join(labels)).split(separator)
+
+    def format_series(self, labels: pd.Series) -> pd.Series:
+        """
+        Formats a Series of labels, formatting only the labels not in the memo.
+        """
+        formatted = {}
+        missing = []
+        for label in pd.unique(labels):
+            cached = self._recall(label)
+            if cached is None:
+                missing.append(label)
+            else:
+                formatted[label] = cached
+
+        if missing:
+            for label, result in zip(missing, self.format_labels(missing)):
+                formatted[label] = result
+                self._remember(label, result)
+
+        return labels.map(formatted)
+
+
+@lru_cache(maxsize=8)
+def label_formatter(replacements: Tuple[Replacement, ...]) -> LabelFormatter:
+    """
+    Returns the shared formatter for a replacement table, compiling it on first use.
+    """
+    return LabelFormatter(replacements)
@@ -0,0 +1,163 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+########################################################################################################################
+# Created by Jack Hangen
+# Version 1
+# Track what has been loaded into each table
+########################################################################################################################
+
+# Dependencies
+import hashlib
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect, select, delete, insert
+
+HASH_CHUNK_SIZE = 1 << 20
+# bumped when loads change the shape of the tables they write, so tables loaded before are reloaded;
+# 2 added the integer FIPS key, 3 the primary keys and indexes
+LOAD_FORMAT = 3
+
+
+def file_hash(path: str) -> str:
+    """
+    Returns the SHA-256 hex digest of a file's contents, read in chunks.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def bytes_hash(data: bytes) -> str:
+    """
+    Returns the SHA-256 hex digest of a bytes object.
+    """
+    return hashlib.sha256(data).hexdigest()
+
+
+def options_hash(options: Dict[str, Any]) -> str:
+    """
+    Returns a stable SHA-256 hex digest of an options dictionary.
+    """
+    return bytes_hash(json.dumps(options, sort_keys=True, default=str).encode('utf-8'))
+
+
+class LoadManifest:
+    """
+    A table recording the content hashes behind each loaded table, so unchanged datasets can be skipped.
+
+    Attributes:
+        engine (Any): SQLAlchemy engine the manifest lives in.
+        table (Table): The manifest table definition.
+    """
+
+    TABLE_NAME = 'load_manifest'
+
+    def __init__(self, engine: Any, table_name: str = TABLE_NAME):
+        self.engine = engine
+        self.table = Table(
+            table_name,
+            MetaData(),
+            Column('table_name', String(128), primary_key=True),
+            Column('source_hash', String(64), nullable=False),
+            Column('mapping_hash', String(64)),
+            Column('options_hash', String(64), nullable=False),
+            Column('row_count', Integer),
+            Column('loaded_at', DateTime),
+        )
+        self._created = False
+
+    @staticmethod
+    def fingerprint(source_path: Optional[str] = None,
+                    mapping_path: Optional[str] = None,
+                    transform_options: Optional[Dict[str, Any]] = None,
+                    sql_options: Optional[Dict[str, Any]] = None,
+                    source_hash: Optional[str] = None) -> Dict[str, Optional[str]]:
+        """
+        Builds the hashes identifying one load of a table.
+
+        Args:
+            source_path (Optional[str]): Path of the source file, hashed unless source_hash is given.
+            mapping_path (Optional[str]): Path of the column mapping file, if any.
+            transform_options (Optional[Dict[str, Any]]): Options that change how the source is transformed.
+            sql_options (Optional[Dict[str, Any]]): Options passed on to the SQL write.
+            source_hash (Optional[str]): Hash of source content that did not come from a file.
+
+        Returns:
+            Dict[str, Optional[str]]: The source_hash, mapping_hash and options_hash.
+        """
+        if source_hash is None:
+            if source_path is None:
+                raise ValueError("Either source_path or source_hash is required")
+            source_hash = file_hash(source_path)
+
+        return {
+            'source_hash': source_hash,
+            'mapping_hash': file_hash(mapping_path) if mapping_path is not None else None,
+            'options_hash': options_hash({'transform': transform_options or {}, 'sql': sql_options or {},
+                                          'format': LOAD_FORMAT}),
+        }
+
+    def ensure_table(self) -> None:
+        """
+        Creates the manifest table if it does not exist yet.
+        """
+        if not self._created:
+            self.table.create(self.engine, checkfirst=True)
+            self._created = True
+
+    def get(self, table_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns the manifest entry of a table, or None if it has not been recorded.
+        """
+        self.ensure_table()
+        with self.engine.connect() as conn:
+            row = conn.execute(select(self.table).where(self.table.c.table_name == table_name)).mappings().first()
+        return dict(row) if row is not None else None
+
+    def entries(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns the manifest entry of every recorded table, by table name, in one query.
+        """
+        self.ensure_table()
+        with self.engine.connect() as conn:
+            rows = conn.execute(select(self.table)).mappings().all()
+        return {row['table_name']: dict(row) for row in rows}
+
+    def is_current(self, table_name: str, fingerprint: Dict[str, Optional[str]]) -> bool:
+        """
+        Checks whether a table was last loaded from the same source, mapping and options and still exists.
+
+        Args:
+            table_name (str): The target table.
+            fingerprint (Dict[str, Optional[str]]): Hashes built by fingerprint.
+
+        Returns:
+            bool: True if the load can be skipped.
+        """
+        entry = self.get(table_name)
+        if entry is None:
+            return False
+        if any(entry[key] != value for key, value in fingerprint.items()):
+            return False
+
+        return inspect(self.engine).has_table(table_name)
+
+    def record(self, table_name: str, fingerprint: Dict[str, Optional[str]], row_count: int) -> None:
+        """
+        Records a completed load of a table, replacing any previous entry.
+        """
+        self.ensure_table()
+        with self.engine.begin() as conn:
+            conn.execute(delete(self.table).where(self.table.c.table_name == table_name))
+            conn.execute(insert(self.table).values(
+                table_name=table_name,
+                row_count=row_count,
+                loaded_at=datetime.now(timezone.utc).replace(tzinfo=None),
+                **fingerprint,
+            ))
+        logging.info(f"Recorded load of {table_name} in {self.table.name}")
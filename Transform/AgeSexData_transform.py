@@ -10,35 +10,41 @@
 # Dependencies
 import pandas as pd
 import logging
+from typing import Any
 from database_conn.db_conn import DataBaseConnector
-
-
-def sex_age_data_transform() -> pd.DataFrame:
-    db_conn = DataBaseConnector()
-
-    query = """
-        SELECT 
-            RIGHT(Geography, 5) AS FIPS,
-            EST_Percent_T_POP_AGE_20_to_24_years,
-            EST_Percent_T_POP_AGE_25_to_29_years,
-            EST_Percent_T_POP_AGE_30_to_34_years
-            EST_Percent_T_POP_AGE_35_to_39_years,
-            EST_Percent_T_POP_AGE_40_to_44_years,
-            EST_Percent_T_POP_AGE_45_to_49_years,
-            EST_Percent_T_POP_AGE_50_to_54_years,
-            EST_Percent_T_POP_AGE_55_to_59_years,
-            EST_Percent_T_POP_AGE_60_to_64_years,
-            EST_Percent_T_POP_AGE_65_to_69_years,
-            EST_Percent_T_POP_AGE_70_to_74_years,
-            EST_Percent_T_POP_AGE_75_to_79_years,
-            EST_Percent_T_POP_AGE_80_to_84_years,
-            EST_Percent_T_POP_AGE_85_YO,
-            `EST_Percent_Female_T_POP_SUM_Sex_ratio_(MP100F)`
-        
-        FROM AgeSexData;
-    """
-
-    df = pd.read_sql(query, db_conn.get_engine())
+from Transform.query_builder import build_select
+from Transform.query_cache import read_query
+from instrumentation.trace import traced
+
+TABLE = "AgeSexData"
+COLUMNS = [
+    "FIPS",
+    "EST_Percent_T_POP_AGE_20_to_24_years",
+    "EST_Percent_T_POP_AGE_25_to_29_years",
+    "EST_Percent_T_POP_AGE_30_to_34_years",
+    "EST_Percent_T_POP_AGE_35_to_39_years",
+    "EST_Percent_T_POP_AGE_40_to_44_years",
+    "EST_Percent_T_POP_AGE_45_to_49_years",
+    "EST_Percent_T_POP_AGE_50_to_54_years",
+    "EST_Percent_T_POP_AGE_55_to_59_years",
+    "EST_Percent_T_POP_AGE_60_to_64_years",
+    "EST_Percent_T_POP_AGE_65_to_69_years",
+    "EST_Percent_T_POP_AGE_70_to_74_years",
+    "EST_Percent_T_POP_AGE_75_to_79_years",
+    "EST_Percent_T_POP_AGE_80_to_84_years",
+    "EST_Percent_T_POP_AGE_85_YO",
+    "EST_Percent_Female_T_POP_SUM_Sex_ratio_(MP100F)",
+]
+
+
+@traced(target=lambda *args, **kwargs: TABLE)
+def sex_age_data_transform(engine: Any = None) -> pd.DataFrame:
+    if engine is None:
+        engine = DataBaseConnector().get_engine()
+
+    query = build_select(engine, TABLE, COLUMNS)
+
+    df = read_query(query, engine, [TABLE])
     logging.info("was able to read in sex and age data")
 
     return df
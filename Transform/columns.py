@@ -0,0 +1,54 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+########################################################################################################################
+# Created by Jack Hangen
+# Version 1
+# Source columns read by the transforms
+########################################################################################################################
+
+# Dependencies
+from typing import List
+from Transform import (election_transform, fip_transform, econ_transform, dem_housing_transform,
+                       AgeSexData_transform, income_transform, ooc)
+from Transform.query_builder import column_aliases
+
+TRANSFORM_MODULES = [
+    election_transform,
+    fip_transform,
+    econ_transform,
+    dem_housing_transform,
+    AgeSexData_transform,
+    income_transform,
+    ooc,
+]
+
+
+def source_columns(table: str) -> List[str]:
+    """
+    Returns every column of a source table that the transform selects read.
+
+    Args:
+        table (str): Name of the source table, e.g. 'income'.
+
+    Returns:
+        List[str]: The column names, in select order and without repeats.
+
+    Raises:
+        ValueError: If no transform reads from the table.
+    """
+    columns = []
+
+    for module in TRANSFORM_MODULES:
+        if module.TABLE != table:
+            continue
+
+        columns += [source for source, _ in column_aliases(module.COLUMNS)]
+
+        for numerators, denominator, _ in getattr(module, 'PERCENTAGES', ()):
+            columns += list(numerators) + [denominator]
+
+    if not columns:
+        raise ValueError(f"No transform reads from {table}")
+
+    return list(dict.fromkeys(columns))
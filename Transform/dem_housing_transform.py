@@ -10,28 +10,34 @@
 # Dependencies
 import pandas as pd
 import logging
+from typing import Any
 from database_conn.db_conn import DataBaseConnector
-
-
-def dem_house_data_transform() -> pd.DataFrame:
-    db_conn = DataBaseConnector()
-
-    query = """
-    SELECT 
-        RIGHT(Geography, 5) AS FIPS,
-        EST_RACE_T_POP_One_race_White,
-        EST_RACE_T_POP_One_race_AA,
-        EST_RACE_T_POP_One_race_AI,
-        EST_RACE_T_POP_One_race_Asian,
-        Percent_T_housing_units,
-        `Percent_CITIZEN,_VOTE,_18_and_over_POP`,
-        `Percent_CITIZEN,_VOTE,_18_and_over_POP_Male`,
-        `Percent_CITIZEN,_VOTE,_18_and_over_POP_Female`
-    
-    FROM demographic_and_housing;
-    """
-
-    df = pd.read_sql(query, db_conn.get_engine())
+from Transform.query_builder import build_select
+from Transform.query_cache import read_query
+from instrumentation.trace import traced
+
+TABLE = "demographic_and_housing"
+COLUMNS = [
+    "FIPS",
+    "EST_RACE_T_POP_One_race_White",
+    "EST_RACE_T_POP_One_race_AA",
+    "EST_RACE_T_POP_One_race_AI",
+    "EST_RACE_T_POP_One_race_Asian",
+    "Percent_T_housing_units",
+    "Percent_CITIZEN,_VOTE,_18_and_over_POP",
+    "Percent_CITIZEN,_VOTE,_18_and_over_POP_Male",
+    "Percent_CITIZEN,_VOTE,_18_and_over_POP_Female",
+]
+
+
+@traced(target=lambda *args, **kwargs: TABLE)
+def dem_house_data_transform(engine: Any = None) -> pd.DataFrame:
+    if engine is None:
+        engine = DataBaseConnector().get_engine()
+
+    query = build_select(engine, TABLE, COLUMNS)
+
+    df = read_query(query, engine, [TABLE])
     logging.info("was able to read in dem and house data")
 
     return df
@@ -10,23 +10,32 @@
 # Dependencies
 import pandas as pd
 import logging
+from typing import Any
 from database_conn.db_conn import DataBaseConnector
-
-
-def econ_data_transform() -> pd.DataFrame:
-    db_conn = DataBaseConnector()
-
-    query = """
-    SELECT
-    fips,
-    (Pop_25_HS/Pop_25_EDUATT)*100 AS per_hs,
-    ((Pop_25_SC + Pop_25_AD + Pop_25_COLL)/Pop_25_EDUATT)*100 AS per_coll,
-    (Pop_25_GRAD/Pop_25_EDUATT)*100 AS per_grad
-    
-    FROM edu_att_test;
-    """
-
-    df = pd.read_sql(query, db_conn.get_engine())
+from Transform.query_builder import build_select
+from Transform.query_cache import read_query
+from instrumentation.trace import traced
+
+TABLE = "edu_att_test"
+COLUMNS = [
+    "fips",
+]
+# (numerator columns, denominator column, alias) of each attainment percentage
+PERCENTAGES = [
+    (["Pop_25_HS"], "Pop_25_EDUATT", "per_hs"),
+    (["Pop_25_SC", "Pop_25_AD", "Pop_25_COLL"], "Pop_25_EDUATT", "per_coll"),
+    (["Pop_25_GRAD"], "Pop_25_EDUATT", "per_grad"),
+]
+
+
+@traced(target=lambda *args, **kwargs: TABLE)
+def econ_data_transform(engine: Any = None) -> pd.DataFrame:
+    if engine is None:
+        engine = DataBaseConnector().get_engine()
+
+    query = build_select(engine, TABLE, COLUMNS, percentages=PERCENTAGES)
+
+    df = read_query(query, engine, [TABLE])
     logging.info("was able to read in econ data")
 
     return df
@@ -10,33 +10,41 @@
 # Dependencies
 import pandas as pd
 import logging
+from typing import Any
 from database_conn.db_conn import DataBaseConnector
+from Transform.query_builder import build_select
+from Transform.query_cache import read_query
+from instrumentation.trace import traced
+
+TABLE = "elections"
+COLUMNS = [
+    "FIPS",
+    "Code",
+    "Population",
+    ("2020W", "2020_winner"),
+    ("2020D", "DEM_per"),
+    ("2020R", "REP_per"),
+    ("2020O", "OTH_per"),
+    ("2016W", "2016_winner"),
+]
+# the 2016 feed names the candidate, the 2020 columns name the party
+VALUE_LABELS = {
+    "2016_winner": {
+        "Trump": "REP",
+        "Clinton": "DEM",
+    },
+}
 
 
-def election_data_transform() -> pd.DataFrame:
-    db_conn = DataBaseConnector()
-
-    query = """
-    SELECT
-    FIPS,
-    Code,
-    Population,
-    2020W AS 2020_winner,
-    2020D AS DEM_per,
-    2020R AS REP_per,
-    2020O AS OTH_per,
-    2016W as 2016_winner
-    
-    FROM elections;
-    """
-
-    df = pd.read_sql(query, db_conn.get_engine())
-    logging.info("was able to read in election data")
+@traced(target=lambda *args, **kwargs: TABLE)
+def election_data_transform(engine: Any = None) -> pd.DataFrame:
+    if engine is None:
+        engine = DataBaseConnector().get_engine()
 
-    df.replace({"2016_winner": {
-        "Trump": "REP",
-        "Clinton": "DEM"
-    }}, inplace=True)
+    query = build_select(engine, TABLE, COLUMNS, value_labels=VALUE_LABELS)
+
+    df = read_query(query, engine, [TABLE])
+    logging.info("was able to read in election data")
 
     return df
 
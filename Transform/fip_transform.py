@@ -10,22 +10,29 @@
 # Dependencies
 import pandas as pd
 import logging
+from typing import Any
 from database_conn.db_conn import DataBaseConnector
+from Transform.query_builder import build_select
+from Transform.query_cache import read_query
+from instrumentation.trace import traced
 
+TABLE = "FIPS"
+COLUMNS = [
+    "fips",
+    "county",
+    "state_abbr",
+    "state",
+]
 
-def fips_data_transform() -> pd.DataFrame:
-    db_conn = DataBaseConnector()
 
-    query = """
-    SELECT 
-    fips,
-    county,
-    state_abbr,
-    state
-    FROM FIPS;
-    """
+@traced(target=lambda *args, **kwargs: TABLE)
+def fips_data_transform(engine: Any = None) -> pd.DataFrame:
+    if engine is None:
+        engine = DataBaseConnector().get_engine()
 
-    df = pd.read_sql(query, db_conn.get_engine())
+    query = build_select(engine, TABLE, COLUMNS)
+
+    df = read_query(query, engine, [TABLE])
     logging.info("was able to read in fips data")
 
     return df
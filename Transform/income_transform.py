@@ -10,25 +10,30 @@
 # Dependencies
 import pandas as pd
 import logging
+from typing import Any
 from database_conn.db_conn import DataBaseConnector
+from Transform.query_builder import build_select
+from Transform.query_cache import read_query
+from instrumentation.trace import traced
 
+TABLE = "income"
+COLUMNS = [
+    "FIPS",
+    "EST_HH_Median_income_(dollars)",
+    "MOE_HH_Median_income_(dollars)",
+    "EST_HH_Mean_income_(dollars)",
+    "MOE_HH_Mean_income_(dollars)",
+]
 
-def income_data_transform() -> pd.DataFrame:
-    db_conn = DataBaseConnector()
 
-    query = """
-        SELECT
-            RIGHT(Geography, 5) AS FIPS,
-            `EST_HH_Median_income_(dollars)`,
-            `MOE_HH_Median_income_(dollars)`,
-            `EST_HH_Mean_income_(dollars)`,
-            `MOE_HH_Mean_income_(dollars)`
-        
-        FROM income
-        ;
-    """
+@traced(target=lambda *args, **kwargs: TABLE)
+def income_data_transform(engine: Any = None) -> pd.DataFrame:
+    if engine is None:
+        engine = DataBaseConnector().get_engine()
 
-    df = pd.read_sql(query, db_conn.get_engine())
+    query = build_select(engine, TABLE, COLUMNS)
+
+    df = read_query(query, engine, [TABLE])
     logging.info("was able to read in income data")
 
     return df
@@ -10,6 +10,11 @@
 # Dependencies
 import pandas as pd
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict
+from database_conn.db_conn import DataBaseConnector
+from instrumentation.trace import traced
 from Transform.election_transform import election_data_transform
 from Transform.fip_transform import fips_data_transform
 from Transform.econ_transform import econ_data_transform
@@ -17,57 +22,158 @@ from Transform.dem_housing_transform import dem_house_data_transform
 from Transform.AgeSexData_transform import sex_age_data_transform
 from Transform.income_transform import income_data_transform
 from Transform.ooc import ooc_data_transform
+from Transform.pushdown import ELECTION_KEY, merged_names
+from Transform.output_writer import write_outputs
+
+
+TRANSFORMS = {
+    'election': election_data_transform,
+    'fips': fips_data_transform,
+    'econ': econ_data_transform,
+    'dem_house': dem_house_data_transform,
+    'age_sex': sex_age_data_transform,
+    'income': income_data_transform,
+    'ooc': ooc_data_transform,
+}
+# (transform name, join key in its frame) in the order the frames are joined onto the election data
+JOIN_PLAN = [
+    ('fips', 'fips'),
+    ('econ', 'fips'),
+    ('dem_house', 'FIPS'),
+    ('age_sex', 'FIPS'),
+    ('income', 'FIPS'),
+    ('ooc', 'FIPS'),
+]
+
+
+@traced()
+def extract_frames(engine: Any, concurrent: bool = False, max_workers: int = 4) -> Dict[str, pd.DataFrame]:
+    """
+    Runs every transform query and returns the resulting frames keyed by transform name.
+
+    Args:
+        engine (Any): SQLAlchemy engine shared by the transform reads.
+        concurrent (bool): Issue the reads at once through a bounded thread pool instead of one after another.
+        max_workers (int): Upper bound on the number of reads in flight when running concurrently.
+
+    Returns:
+        Dict[str, pd.DataFrame]: The transform frames, in the order of TRANSFORMS.
+    """
+    if not concurrent:
+        return {name: transform(engine) for name, transform in TRANSFORMS.items()}
+
+    if max_workers < 1:
+        raise ValueError(f"max_workers must be at least 1, got {max_workers}")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='transform') as executor:
+        futures = {name: executor.submit(transform, engine) for name, transform in TRANSFORMS.items()}
+        frames = {name: future.result() for name, future in futures.items()}
+
+    logging.info(f"read {len(frames)} transforms concurrently with {max_workers} workers "
+                 f"in {time.perf_counter() - start:.2f}s")
+
+    return frames
+
+
+@traced(rows_in=lambda frames: len(frames['election']))
+def merge_frames(frames: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """
+    Joins the transform frames onto the election frame in a single pass.
+
+    Every other frame is checked to have one row per key, then reindexed onto the election frame's keys,
+    and the aligned frames are put side by side in one concat. The result matches chained left merges in
+    JOIN_PLAN order, including pandas' naming of repeated columns, without copying the growing frame at
+    every step.
+
+    Args:
+        frames (Dict[str, pd.DataFrame]): The frames returned by extract_frames.
+
+    Returns:
+        pd.DataFrame: The joined frame, with one row per election row.
+
+    Raises:
+        ValueError: If a frame has different rows for the same key, see unique_on_key.
+    """
+    election_df = frames['election'].reset_index(drop=True)
+    keys = election_df[ELECTION_KEY]
+    names = list(election_df.columns)
+    parts = [election_df]
 
+    logging.info(f"shape of election data before {election_df.shape}")
 
-def join_data() -> pd.DataFrame:
-    election_df = election_data_transform()
-    fips_df = fips_data_transform()
+    for name, right_key in JOIN_PLAN:
+        right = unique_on_key(frames[name], right_key, name)
 
-    logging.info(f"shape of election data before {election_df.shape}")
-    logging.info(f"shape of fips data before {fips_df.shape}")
+        aligned = right.set_index(right_key, drop=False).reindex(keys.values)
+        if right_key == ELECTION_KEY:
+            # a merge on same-named keys keeps only the left one
+            aligned = aligned.drop(columns=right_key)
+        parts.append(aligned.reset_index(drop=True))
+
+        names, kept = merged_names(names, list(right.columns), ELECTION_KEY, right_key)
+        names += kept
+
+        logging.info(f"{name}: {len(right)} rows aligned onto {len(keys)} election rows")
 
-    df_fips_election = election_df.merge(fips_df, how='left', left_on='FIPS', right_on='fips')
+    df = pd.concat(parts, axis=1)
+    df.columns = names
 
-    # econ
-    econ_df = econ_data_transform()
+    logging.info(f"joined shape {df.shape}")
 
-    df_fips_election_econ = df_fips_election.merge(econ_df, how='left', left_on='FIPS', right_on='fips')
+    return df
 
-    logging.info(f"ECON: {df_fips_election.shape}")
 
-    #dem and housing
-    dem_house_df = dem_house_data_transform()
-    dem_house_df['FIPS'] = dem_house_df['FIPS'].astype(int)
+def unique_on_key(df: pd.DataFrame, key: str, name: str) -> pd.DataFrame:
+    """
+    Makes sure a frame has at most one row per key, so joining it cannot add rows.
 
-    df_fips_election_econ_house = df_fips_election_econ.merge(dem_house_df, how='left', left_on='FIPS', right_on='FIPS')
+    Rows repeated in full are dropped, e.g. the two District of Columbia rows of FIPS.csv, which only differ
+    in columns the transform does not select.
 
-    logging.info(f"DEM AND HOUSING {df_fips_election_econ_house.shape}")
+    Args:
+        df (pd.DataFrame): The frame to join.
+        key (str): Its join key.
+        name (str): The frame's name, for the log.
 
-    # age sex
-    age_sex_df = sex_age_data_transform()
-    age_sex_df['FIPS'] = age_sex_df['FIPS'].astype(int)
+    Returns:
+        pd.DataFrame: The frame with repeated rows dropped.
 
-    df_fips_election_econ_house_age = df_fips_election_econ_house.merge(age_sex_df, how='left', left_on='FIPS', right_on='FIPS')
+    Raises:
+        ValueError: If a key is repeated with different values, as the join would then be ambiguous.
+    """
+    if df[key].is_unique:
+        return df
 
-    logging.info(f"AGE SEX {df_fips_election_econ_house_age.shape}")
+    deduplicated = df.drop_duplicates()
+    conflicting = deduplicated.loc[deduplicated[key].duplicated(), key]
+    if len(conflicting):
+        logging.error(f"{name} has different rows for the same {key}: {sorted(set(conflicting))[:10]}")
+        raise ValueError(f"{name} has different rows for the same {key}: {sorted(set(conflicting))[:10]}")
 
-    # income
-    inc_df = income_data_transform()
-    inc_df['FIPS'] = inc_df['FIPS'].astype(int)
+    logging.warning(f"{name}: dropped {len(df) - len(deduplicated)} repeated rows")
+    return deduplicated
 
-    df_fips_election_econ_house_age_inc = df_fips_election_econ_house_age.merge(inc_df, how='left', left_on='FIPS', right_on='FIPS')
 
-    logging.info(f"INCOME {df_fips_election_econ_house_age_inc.shape}")
+@traced()
+def join_data(engine: Any = None, concurrent: bool = False, max_workers: int = 4) -> pd.DataFrame:
+    """
+    Reads every transform and joins them into the final frame.
 
-    #OOO
-    ooc_df = ooc_data_transform()
-    ooc_df['FIPS'] = ooc_df['FIPS'].astype(int)
+    Args:
+        engine (Any): SQLAlchemy engine to read with (defaults to the shared engine).
+        concurrent (bool): Run the transform reads concurrently instead of sequentially.
+        max_workers (int): Number of reads in flight when running concurrently.
 
-    df_fips_election_econ_house_age_inc_ooc = df_fips_election_econ_house_age_inc.merge(ooc_df, how='left', left_on='FIPS', right_on='FIPS')
+    Returns:
+        pd.DataFrame: The joined frame, identical for the sequential and concurrent paths.
+    """
+    if engine is None:
+        engine = DataBaseConnector().get_engine()
 
-    logging.info(f"OOO {df_fips_election_econ_house_age_inc_ooc.shape}")
+    frames = extract_frames(engine, concurrent=concurrent, max_workers=max_workers)
 
-    return df_fips_election_econ_house_age_inc_ooc
+    return merge_frames(frames)
 
 
 def main():
@@ -75,7 +181,7 @@ def main():
 
     print(df.head())
 
-    df.to_csv(r'C:\Users\jthan\PycharmProjects\Election_pipline\output\final.csv')
+    write_outputs(df)
 
 
 if __name__ == "__main__":
@@ -10,23 +10,28 @@
 # Dependencies
 import pandas as pd
 import logging
+from typing import Any
 from database_conn.db_conn import DataBaseConnector
+from Transform.query_builder import build_select
+from Transform.query_cache import read_query
+from instrumentation.trace import traced
 
+TABLE = "occ"
+COLUMNS = [
+    "FIPS",
+    "EST_T_CE_POP_16_YO",
+    "EST_T_PERCENT_ALLOCATED_Occupation",
+]
 
-def ooc_data_transform() -> pd.DataFrame:
-    db_conn = DataBaseConnector()
 
-    query = """
-        SELECT
-            RIGHT(Geography, 5) AS FIPS,
-            EST_T_CE_POP_16_YO,
-            EST_T_PERCENT_ALLOCATED_Occupation
-        
-        FROM occ;
-        ;
-    """
+@traced(target=lambda *args, **kwargs: TABLE)
+def ooc_data_transform(engine: Any = None) -> pd.DataFrame:
+    if engine is None:
+        engine = DataBaseConnector().get_engine()
 
-    df = pd.read_sql(query, db_conn.get_engine())
+    query = build_select(engine, TABLE, COLUMNS)
+
+    df = read_query(query, engine, [TABLE])
     logging.info("was able to read in ooc data")
 
     return df
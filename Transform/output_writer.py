@@ -0,0 +1,245 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+########################################################################################################################
+# Created by Jack Hangen
+# Version 1
+# Write POL_FINAL as partitioned Parquet, Arrow IPC and compressed CSV files
+########################################################################################################################
+
+# Dependencies
+import logging
+import os
+import shutil
+import time
+from abc import ABC, abstractmethod
+from os.path import join, dirname
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import quote
+import pandas as pd
+from instrumentation.trace import stage
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+DEFAULT_OUTPUT_DIR = join(dirname(dirname(__file__)), 'output', 'POL_FINAL')
+PARTITION_COLUMN = 'state_abbr'
+
+# directory name of the partition holding rows without a partition value, as Hive and pyarrow name it
+NULL_PARTITION = '__HIVE_DEFAULT_PARTITION__'
+
+
+class OutputWriter(ABC):
+    """
+    Base class for the file formats the final frame is written in.
+
+    Writers receive the frame already converted to Arrow and split into partitions, so the conversion is done
+    once however many formats are written.
+
+    Attributes:
+        compression (str): Codec the files are compressed with.
+    """
+
+    name = None
+    suffix = None
+    compression = None
+
+    def __init__(self, compression: Optional[str] = None):
+        if compression is not None:
+            self.compression = compression
+
+    def write(self, partitions: List[Tuple[Optional[str], 'pa.Table']], directory: str) -> Dict[str, Any]:
+        """
+        Writes every partition to its own file under directory, replacing any earlier output of this format.
+
+        Args:
+            partitions (List[Tuple[Optional[str], pa.Table]]): Partition directory names and their rows, see
+                split_partitions; a None name writes the rows straight into directory.
+            directory (str): Directory the files of this format are written to.
+
+        Returns:
+            Dict[str, Any]: The format, directory, files, rows, bytes and seconds of the write.
+        """
+        start = time.perf_counter()
+        if os.path.isdir(directory):
+            shutil.rmtree(directory)
+
+        paths = []
+        for partition, table in partitions:
+            partition_dir = directory if partition is None else join(directory, partition)
+            os.makedirs(partition_dir, exist_ok=True)
+            path = join(partition_dir, f"part-0{self.suffix}")
+            self._write(table, path)
+            paths.append(path)
+
+        stats = {
+            'format': self.name,
+            'directory': directory,
+            'files': len(paths),
+            'rows': sum(table.num_rows for _, table in partitions),
+            'bytes': sum(os.path.getsize(path) for path in paths),
+            'seconds': time.perf_counter() - start,
+        }
+        logging.info(f"Wrote {stats['rows']} rows as {self.name} to {stats['files']} files in {directory} "
+                     f"({stats['bytes']} bytes, {stats['seconds']:.2f}s)")
+
+        return stats
+
+    @abstractmethod
+    def _write(self, table: 'pa.Table', path: str) -> None:
+        pass
+
+
+class ParquetWriter(OutputWriter):
+    """
+    Compressed Parquet files, with min, max and null count statistics for every column and row group.
+    """
+
+    name = 'parquet'
+    suffix = '.parquet'
+    compression = 'zstd'
+
+    def _write(self, table: 'pa.Table', path: str) -> None:
+        pq.write_table(table, path, compression=self.compression, write_statistics=True)
+
+
+class ArrowIpcWriter(OutputWriter):
+    """
+    Compressed Arrow IPC (Feather version 2) files, which read back without any parsing.
+    """
+
+    name = 'arrow'
+    suffix = '.arrow'
+    compression = 'zstd'
+
+    def _write(self, table: 'pa.Table', path: str) -> None:
+        options = pa.ipc.IpcWriteOptions(compression=self.compression)
+        with pa.OSFile(path, 'wb') as sink, pa.ipc.new_file(sink, table.schema, options=options) as writer:
+            writer.write_table(table)
+
+
+class CsvWriter(OutputWriter):
+    """
+    CSV files streamed batch by batch through a compressor, so the text is never held in memory whole.
+    """
+
+    name = 'csv'
+    suffix = '.csv.gz'
+    compression = 'gzip'
+
+    def _write(self, table: 'pa.Table', path: str) -> None:
+        with pa.CompressedOutputStream(path, self.compression) as sink:
+            pa_csv.write_csv(table, sink)
+
+
+WRITERS = {
+    ParquetWriter.name: ParquetWriter,
+    ArrowIpcWriter.name: ArrowIpcWriter,
+    CsvWriter.name: CsvWriter,
+}
+
+
+def partition_name(column: str, value: Any) -> str:
+    """
+    Returns the Hive style directory name of a partition, e.g. state_abbr=AL.
+    """
+    if value is None:
+        return f"{column}={NULL_PARTITION}"
+    return f"{column}={quote(str(value), safe='')}"
+
+
+def split_partitions(table: 'pa.Table', column: Optional[str]) -> List[Tuple[Optional[str], 'pa.Table']]:
+    """
+    Splits a table into one partition per value of a column.
+
+    The table is sorted on the column once and every partition is a zero-copy slice of the sorted table. As
+    in Hive partitioning, the column itself is left out of the partitions, since its value is in their
+    directory name.
+
+    Args:
+        table (pa.Table): The rows to split.
+        column (Optional[str]): The partition column; the table is one unnamed partition if None or missing.
+
+    Returns:
+        List[Tuple[Optional[str], pa.Table]]: Each partition's directory name and rows.
+    """
+    if column is None or column not in table.column_names:
+        return [(None, table)]
+
+    table = table.sort_by([(column, 'ascending')])
+    values = table.column(column).to_pylist()
+    rows = table.drop_columns([column])
+
+    partitions = []
+    start = 0
+    for position in range(1, len(values) + 1):
+        if position == len(values) or values[position] != values[start]:
+            partitions.append((partition_name(column, values[start]), rows.slice(start, position - start)))
+            start = position
+
+    return partitions
+
+
+def get_writer(name: str) -> OutputWriter:
+    """
+    Returns the writer of an output format.
+
+    Raises:
+        ValueError: If the format is not known.
+    """
+    if name not in WRITERS:
+        logging.error(f"Unknown output format {name!r}")
+        raise ValueError(f"Unknown output format {name!r}, expected one of {sorted(WRITERS)}")
+    return WRITERS[name]()
+
+
+def write_outputs(df: pd.DataFrame, directory: str = DEFAULT_OUTPUT_DIR, formats: Iterable[str] = tuple(WRITERS),
+                  partition_by: Optional[str] = PARTITION_COLUMN) -> List[Dict[str, Any]]:
+    """
+    Writes the final frame in every requested format, each in its own subdirectory of directory.
+
+    The frame is converted to Arrow and partitioned once, and every format is written from those same
+    partitions, e.g. output/POL_FINAL/parquet/state_abbr=AL/part-0.parquet. The partitions read back with the
+    partition column restored through pyarrow.dataset or pandas.read_parquet.
+
+    Args:
+        df (pd.DataFrame): The final frame.
+        directory (str): Directory the formats are written under.
+        formats (Iterable[str]): Names of the formats to write, see WRITERS.
+        partition_by (Optional[str]): Column to partition the files by; unpartitioned if None or missing.
+
+    Returns:
+        List[Dict[str, Any]]: The stats of every format written, see OutputWriter.write.
+
+    Raises:
+        ImportError: If pyarrow is not installed.
+        ValueError: If a format is not known.
+    """
+    writers = [get_writer(name) for name in formats]
+    if not writers:
+        return []
+
+    if not HAS_PYARROW:
+        logging.error("pyarrow is required to write the output files")
+        raise ImportError("pyarrow is required to write the output files")
+
+    with stage('write_outputs.partition', target=partition_by) as record:
+        record.rows_in = len(df)
+        partitions = split_partitions(pa.Table.from_pandas(df, preserve_index=False), partition_by)
+        record.rows_out = len(partitions)
+
+    results = []
+    for writer in writers:
+        with stage('write_outputs.write', target=writer.name) as record:
+            record.rows_in = len(df)
+            stats = writer.write(partitions, join(directory, writer.name))
+            record.rows_out = stats['rows']
+            record.bytes = stats['bytes']
+        results.append(stats)
+
+    return results
@@ -0,0 +1,159 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+########################################################################################################################
+# Created by Jack Hangen
+# Version 1
+# Build POL_FINAL inside the database
+########################################################################################################################
+
+# Dependencies
+import logging
+import time
+import pandas as pd
+from typing import Any, List, Tuple
+from sqlalchemy import text
+from database_conn.db_conn import DataBaseConnector
+from Transform import (election_transform, fip_transform, econ_transform, dem_housing_transform,
+                       AgeSexData_transform, income_transform, ooc)
+from Transform.query_builder import quote, select_list
+from Collect.keys import create_keys, infer_keys
+from instrumentation.trace import argument, traced
+
+# (transform module, join key in its select) in the order join_data merges them onto the election data
+JOIN_PLAN = [
+    (fip_transform, 'fips'),
+    (econ_transform, 'fips'),
+    (dem_housing_transform, 'FIPS'),
+    (AgeSexData_transform, 'FIPS'),
+    (income_transform, 'FIPS'),
+    (ooc, 'FIPS'),
+]
+ELECTION_KEY = 'FIPS'
+
+
+def transform_select(engine: Any, module: Any) -> List[Tuple[str, str]]:
+    """
+    Builds the select list of a transform module.
+    """
+    return select_list(engine,
+                       module.COLUMNS,
+                       percentages=getattr(module, 'PERCENTAGES', ()),
+                       value_labels=getattr(module, 'VALUE_LABELS', None))
+
+
+def merged_names(left: List[str], right: List[str], left_on: str, right_on: str) -> Tuple[List[str], List[str]]:
+    """
+    Names the columns of a left merge the way pandas does.
+
+    The right key is dropped when both keys share a name, and any other name present on both sides
+    gets an '_x' suffix on the left and a '_y' suffix on the right.
+
+    Returns:
+        Tuple[List[str], List[str]]: The renamed left columns and the kept, renamed right columns.
+    """
+    kept = [name for name in right if not (name == right_on and left_on == right_on)]
+    overlap = set(left) & set(kept)
+
+    return ([f"{name}_x" if name in overlap else name for name in left],
+            [f"{name}_y" if name in overlap else name for name in kept])
+
+
+def build_pol_final_select(engine: Any) -> str:
+    """
+    Builds one SELECT joining every transform onto the election data with the same columns as join_data.
+
+    Args:
+        engine (Any): SQLAlchemy engine the SQL is built for.
+
+    Returns:
+        str: The SELECT statement.
+    """
+    election_select = transform_select(engine, election_transform)
+    # (subquery alias, column in the subquery) for every output column, in output order
+    sources = [('t0', alias) for _, alias in election_select]
+    names = [alias for _, alias in election_select]
+
+    subqueries = [f"({_subquery(engine, election_transform.TABLE, election_select)}) AS t0"]
+
+    for position, (module, right_key) in enumerate(JOIN_PLAN, start=1):
+        table_alias = f"t{position}"
+        select = transform_select(engine, module)
+        right_names = [alias for _, alias in select]
+
+        names, kept = merged_names(names, right_names, ELECTION_KEY, right_key)
+        kept_sources = [name for name in right_names if not (name == right_key and right_key == ELECTION_KEY)]
+        sources += [(table_alias, name) for name in kept_sources]
+        names += kept
+
+        subqueries.append(
+            f"LEFT JOIN ({_subquery(engine, module.TABLE, select, distinct=True)}) AS {table_alias}\n"
+            f"    ON t0.{quote(engine, ELECTION_KEY)} = {table_alias}.{quote(engine, right_key)}"
+        )
+
+    lowered = [name.lower() for name in names]
+    duplicates = sorted({name for name in names if lowered.count(name.lower()) > 1})
+    if duplicates:
+        raise ValueError(f"Push-down join would create duplicate column names: {duplicates}")
+
+    select = ",\n    ".join(f"{table_alias}.{quote(engine, source)} AS {quote(engine, name)}"
+                            for (table_alias, source), name in zip(sources, names))
+
+    return f"SELECT\n    {select}\nFROM " + "\n".join(subqueries)
+
+
+def _subquery(engine: Any, table: str, select: List[Tuple[str, str]], distinct: bool = False) -> str:
+    # DISTINCT drops rows repeated in full, as join_data does, so they cannot add rows to the join
+    columns = ", ".join(f"{expression} AS {quote(engine, alias)}" for expression, alias in select)
+    return f"SELECT {'DISTINCT ' if distinct else ''}{columns} FROM {quote(engine, table)}"
+
+
+@traced(target=argument(1, 'table', 'POL_FINAL'))
+def push_down_join(engine: Any = None, table: str = 'POL_FINAL', mode: str = 'create') -> int:
+    """
+    Builds the final table inside the database so no rows travel to the client.
+
+    Args:
+        engine (Any): SQLAlchemy engine to run against (defaults to the shared engine).
+        table (str): Name of the table to build.
+        mode (str): 'create' drops the table and recreates it with CREATE TABLE ... AS SELECT,
+            'insert' empties the existing table and refills it with INSERT ... SELECT, keeping its keys and indexes.
+            A created table gets the keys infer_keys picks for it.
+
+    Returns:
+        int: The number of rows in the built table.
+
+    Raises:
+        ValueError: If the mode is not supported.
+    """
+    if engine is None:
+        engine = DataBaseConnector().get_engine()
+
+    if mode not in ('create', 'insert'):
+        raise ValueError(f"Unsupported push-down mode: {mode}")
+
+    select = build_pol_final_select(engine)
+    quoted_table = quote(engine, table)
+    start = time.perf_counter()
+
+    with engine.begin() as conn:
+        if mode == 'create':
+            conn.execute(text(f"DROP TABLE IF EXISTS {quoted_table}"))
+            conn.execute(text(f"CREATE TABLE {quoted_table} AS\n{select}"))
+        else:
+            conn.execute(text(f"DELETE FROM {quoted_table}"))
+            conn.execute(text(f"INSERT INTO {quoted_table}\n{select}"))
+
+        rows = conn.execute(text(f"SELECT COUNT(*) FROM {quoted_table}")).scalar()
+
+        if mode == 'create':
+            keys = conn.execute(text(f"SELECT {quote(engine, ELECTION_KEY)} FROM {quoted_table}"))
+            key_values = pd.Series([row[0] for row in keys], dtype='Int64')
+            columns = list(conn.execute(text(f"SELECT * FROM {quoted_table} WHERE 1 = 0")).keys())
+
+    if mode == 'create':
+        create_keys(engine, table, infer_keys(columns, ELECTION_KEY, key_values))
+
+    logging.info(f"built {table} in the database with {rows} rows in {time.perf_counter() - start:.2f}s")
+
+    return rows
@@ -0,0 +1,118 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+########################################################################################################################
+# Created by Jack Hangen
+# Version 1
+# Build transform SQL from column lists
+########################################################################################################################
+
+# Dependencies
+from typing import Any, Dict, Iterable, List, Sequence, Tuple, Union
+
+Column = Union[str, Tuple[str, str]]
+Percentage = Tuple[Sequence[str], str, str]
+
+
+def dialect_name(engine: Any) -> str:
+    """
+    Returns the SQLAlchemy dialect name of an engine, e.g. 'mysql' or 'sqlite'.
+    """
+    return engine.dialect.name
+
+
+def quote(engine: Any, name: str) -> str:
+    """
+    Quotes an identifier for the engine's dialect.
+
+    Census labels contain commas and parentheses and the election columns start with digits,
+    so every identifier is quoted rather than only the ones MySQL would reject.
+    """
+    return engine.dialect.identifier_preparer.quote_identifier(name)
+
+
+def literal(value: str) -> str:
+    """
+    Returns a string as a SQL string literal.
+    """
+    return "'" + value.replace("'", "''") + "'"
+
+
+def percentage_expression(engine: Any, numerators: Sequence[str], denominator: str) -> str:
+    """
+    Returns the expression for the sum of the numerator columns as a percentage of the denominator column.
+    """
+    numerator = " + ".join(quote(engine, column) for column in numerators)
+    if len(numerators) > 1:
+        numerator = f"({numerator})"
+
+    # MySQL and DuckDB divide integers exactly, SQLite truncates
+    if dialect_name(engine) in ('mysql', 'duckdb'):
+        return f"({numerator}/{quote(engine, denominator)})*100"
+    return f"(CAST({numerator} AS REAL)/{quote(engine, denominator)})*100"
+
+
+def relabel_expression(engine: Any, column: str, labels: Dict[str, str]) -> str:
+    """
+    Returns a CASE expression replacing the given values of a column and passing the rest through.
+    """
+    quoted = quote(engine, column)
+    cases = " ".join(f"WHEN {literal(old)} THEN {literal(new)}" for old, new in labels.items())
+    return f"CASE {quoted} {cases} ELSE {quoted} END"
+
+
+def column_aliases(columns: Iterable[Column]) -> List[Tuple[str, str]]:
+    """
+    Normalizes a column list into (source, alias) pairs; a bare name is selected under its own name.
+    """
+    return [(column, column) if isinstance(column, str) else tuple(column) for column in columns]
+
+
+def select_list(engine: Any,
+                columns: Iterable[Column],
+                percentages: Iterable[Percentage] = (),
+                value_labels: Dict[str, Dict[str, str]] = None) -> List[Tuple[str, str]]:
+    """
+    Builds the (expression, alias) pairs of a transform select.
+
+    Args:
+        engine (Any): SQLAlchemy engine the SQL is built for.
+        columns (Iterable[Column]): Source columns, either a name or a (source, alias) pair.
+        percentages (Iterable[Percentage]): (numerator columns, denominator column, alias) triples.
+        value_labels (Dict[str, Dict[str, str]]): Value replacements keyed by output alias.
+
+    Returns:
+        List[Tuple[str, str]]: The select expressions with their output aliases.
+    """
+    value_labels = value_labels or {}
+    expressions = []
+
+    for source, alias in column_aliases(columns):
+        if alias in value_labels:
+            expressions.append((relabel_expression(engine, source, value_labels[alias]), alias))
+        else:
+            expressions.append((quote(engine, source), alias))
+
+    for numerators, denominator, alias in percentages:
+        expressions.append((percentage_expression(engine, numerators, denominator), alias))
+
+    return expressions
+
+
+def build_select(engine: Any, table: str, columns: Iterable[Column], **options) -> str:
+    """
+    Builds a transform SELECT statement for the engine's dialect.
+
+    Args:
+        engine (Any): SQLAlchemy engine the SQL is built for.
+        table (str): Table to select from.
+        columns (Iterable[Column]): Source columns, either a name or a (source, alias) pair.
+        **options: Passed through to select_list.
+
+    Returns:
+        str: The SELECT statement.
+    """
+    expressions = select_list(engine, columns, **options)
+    select = ",\n    ".join(f"{expression} AS {quote(engine, alias)}" for expression, alias in expressions)
+
+    return f"SELECT\n    {select}\nFROM {quote(engine, table)}"
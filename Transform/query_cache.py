@@ -0,0 +1,156 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+########################################################################################################################
+# Created by Jack Hangen
+# Version 1
+# Cache of transform query results, versioned by the load manifest
+########################################################################################################################
+
+# Dependencies
+import logging
+import re
+from contextlib import contextmanager
+from os.path import join, dirname
+from threading import Lock
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+import pandas as pd
+from Collect.frame_cache import FrameCache
+from Collect.manifest import LoadManifest
+
+DEFAULT_QUERY_CACHE_DIR = join(dirname(dirname(__file__)), 'cache', 'queries')
+DEFAULT_QUERY_CACHE_BYTES = 256 * 1024 * 1024
+
+# quoted literals and identifiers, which are kept as they are when a query is normalized
+QUOTED = re.compile(r"('(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|`[^`]*`)")
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalizes the whitespace of a query outside its quoted names and literals, and drops a trailing semicolon.
+    """
+    parts = QUOTED.split(query)
+    for position in range(0, len(parts), 2):
+        parts[position] = re.sub(r'\s+', ' ', parts[position])
+    return ''.join(parts).strip().rstrip(';').rstrip()
+
+
+class QueryCache:
+    """
+    Caches the results of transform queries until a table they read is loaded again.
+
+    A result is keyed on the normalized query, the database and the load manifest entry of every table the
+    query reads, so a reload of any of them makes it a miss. The manifest is read once, when the first query
+    is looked up, so the cache is meant to last for one join; a repeat run over unchanged tables then only
+    reads the manifest. Queries reading a table the manifest has no entry for, e.g. one loaded by hand, always
+    go to the database. The results are stored in a FrameCache, which bounds their total size.
+
+    Attributes:
+        cache (FrameCache): Where the results are stored.
+        manifest (LoadManifest): Load manifest the table versions are read from.
+        hits (int): Queries answered from the cache.
+        misses (int): Queries read from the database and cached.
+        bypassed (int): Queries read from the database because a table they read has no version.
+    """
+
+    def __init__(self, cache: FrameCache, manifest: LoadManifest):
+        self.cache = cache
+        self.manifest = manifest
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self._versions = None
+        self._lock = Lock()
+
+    def versions(self) -> Dict[str, List[Any]]:
+        """
+        Returns the version of every table in the load manifest, read from the database the first time only.
+        """
+        with self._lock:
+            if self._versions is None:
+                self._versions = {table: [entry['source_hash'], entry['mapping_hash'], entry['options_hash'],
+                                          entry['row_count'], entry['loaded_at']]
+                                  for table, entry in self.manifest.entries().items()}
+            return self._versions
+
+    def key(self, query: str, engine: Any, tables: Iterable[str]) -> Optional[str]:
+        """
+        Builds the cache key of a query, or returns None when a table it reads has no version.
+        """
+        versions = self.versions()
+        tables = sorted(tables)
+        if any(table not in versions for table in tables):
+            return None
+
+        return FrameCache.key('query', normalize_query(query), engine.url.render_as_string(hide_password=True),
+                              [[table] + versions[table] for table in tables])
+
+    def read_sql(self, query: str, engine: Any, tables: Iterable[str]) -> pd.DataFrame:
+        """
+        Returns the result of a query, from the cache when none of the tables it reads changed since it was
+        cached.
+
+        Args:
+            query (str): The SELECT statement.
+            engine (Any): SQLAlchemy engine to run it with on a miss.
+            tables (Iterable[str]): Every table the query reads.
+
+        Returns:
+            pd.DataFrame: The result, as pd.read_sql returns it.
+        """
+        key = self.key(query, engine, tables)
+        if key is None:
+            self._count('bypassed')
+            return pd.read_sql(query, engine)
+
+        df = self.cache.get(key)
+        if df is not None:
+            self._count('hits')
+            return df
+
+        self._count('misses')
+        df = pd.read_sql(query, engine)
+        self.cache.put(key, df)
+        return df
+
+    def summary(self) -> str:
+        return f"query cache: {self.hits} hits, {self.misses} misses, {self.bypassed} bypassed"
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+
+_query_cache = None
+
+
+@contextmanager
+def use_query_cache(cache: Optional[QueryCache]) -> Iterator[Optional[QueryCache]]:
+    """
+    Makes the transform reads inside the block go through a query cache, or straight to the database if None.
+    """
+    global _query_cache
+    previous, _query_cache = _query_cache, cache
+    try:
+        yield cache
+    finally:
+        _query_cache = previous
+        if cache is not None:
+            logging.info(cache.summary())
+
+
+def read_query(query: str, engine: Any, tables: Iterable[str]) -> pd.DataFrame:
+    """
+    Runs a transform query, through the query cache in use if there is one.
+
+    Args:
+        query (str): The SELECT statement.
+        engine (Any): SQLAlchemy engine to run it with.
+        tables (Iterable[str]): Every table the query reads.
+
+    Returns:
+        pd.DataFrame: The result.
+    """
+    if _query_cache is None:
+        return pd.read_sql(query, engine)
+    return _query_cache.read_sql(query, engine, tables)
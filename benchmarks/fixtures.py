@@ -0,0 +1,244 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+########################################################################################################################
+# Created by Jack Hangen
+# Version 1
+# Local stand-ins for the benchmark suite
+########################################################################################################################
+
+# Dependencies
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+from Collect.Collect import data_path
+
+GEOGRAPHY_PREFIX = '0500000US'
+
+# census extracts read from data/ as they are
+CENSUS_FILES = {
+    'income': ('income.csv', 'income_columnMappings.csv'),
+    'occ': ('occ.csv', 'occ_columnMappings.csv'),
+}
+# census extracts only their mappings are bundled for, generated with the same columns and label row
+SYNTHETIC_CENSUS_FILES = {
+    'AgeSexData': ('AgeSexData.csv', 'AgeSexData_columnMappings.csv'),
+    'demographic_and_housing': ('demographic_and_housing.csv', 'demographic_and_housing_columnMappings.csv'),
+}
+ELECTION_FILE = 'elections.csv'
+
+# share of generated census values replaced by the '(X)' annotation
+ANNOTATED_SHARE = 0.02
+
+
+def county_codes(sample: Optional[int] = None) -> List[int]:
+    """
+    Returns the county FIPS codes of the bundled income extract, the first sample of them if given.
+    """
+    geography = pd.read_csv(data_path('income.csv'), usecols=['GEO_ID'], dtype=str)['GEO_ID'].iloc[1:]
+    codes = sorted(int(geo_id[-5:]) for geo_id in geography)
+    return codes[:sample] if sample is not None else codes
+
+
+def scaled_codes(codes: List[int], scale: int) -> List[Dict[int, int]]:
+    """
+    Maps every county code onto a distinct unused five digit code for each extra copy of the data.
+
+    Args:
+        codes (List[int]): County FIPS codes in the data.
+        scale (int): Number of copies, the original included.
+
+    Returns:
+        List[Dict[int, int]]: One mapping from original to new code per copy; the first is the identity.
+
+    Raises:
+        ValueError: If scale is below 1 or there are not enough unused five digit codes.
+    """
+    if scale < 1:
+        raise ValueError(f"scale must be at least 1, got {scale}")
+
+    used = set(codes)
+    unused = (code for code in range(1, 100000) if code not in used)
+    copies = [{code: code for code in codes}]
+    try:
+        for _ in range(scale - 1):
+            copies.append({code: next(unused) for code in codes})
+    except StopIteration:
+        raise ValueError(f"Not enough five digit codes to scale {len(codes)} counties {scale} times")
+    return copies
+
+
+def scale_frame(df: pd.DataFrame, column: str, copies: List[Dict[int, int]], geography: bool = False) -> pd.DataFrame:
+    """
+    Keeps the rows of the first copy's counties and stacks one relabelled copy of them per mapping.
+
+    Args:
+        df (pd.DataFrame): Frame with a county column.
+        column (str): The county column, integer FIPS codes or census geography ids.
+        copies (List[Dict[int, int]]): Code mappings from scaled_codes.
+        geography (bool): The column holds census geography ids rather than integer codes.
+
+    Returns:
+        pd.DataFrame: The scaled frame.
+    """
+    codes = df[column].str[-5:].astype(int) if geography else pd.to_numeric(df[column])
+    df = df[codes.isin(copies[0])]
+    codes = codes[codes.isin(copies[0])]
+
+    frames = []
+    for mapping in copies:
+        copy = df.copy()
+        new_codes = codes.map(mapping)
+        copy[column] = GEOGRAPHY_PREFIX + new_codes.map('{:05d}'.format) if geography else new_codes
+        frames.append(copy)
+    return pd.concat(frames, ignore_index=True)
+
+
+def synthetic_census(mappings_file: str, codes: List[int], rng: np.random.Generator) -> pd.DataFrame:
+    """
+    Generates a census extract in the exported layout from its column mappings: the raw codes as header,
+    the labels as the first row and one row of plausible estimates per county, all as text.
+    """
+    mappings = pd.read_csv(data_path(mappings_file))
+    columns = mappings['Column Name'].tolist()
+    rows = pd.DataFrame({'GEO_ID': [f"{GEOGRAPHY_PREFIX}{code:05d}" for code in codes],
+                         'NAME': [f"County {code:05d}" for code in codes]})
+
+    data = {}
+    for column, label in zip(columns[2:], mappings['Label'].iloc[2:]):
+        if 'Percent' in label:
+            values = np.round(rng.uniform(0, 100, len(codes)), 1).astype(str)
+        else:
+            values = rng.integers(0, 500000, len(codes)).astype(str)
+        values[rng.random(len(codes)) < ANNOTATED_SHARE] = '(X)'
+        data[column] = values
+    rows = pd.concat([rows, pd.DataFrame(data, index=rows.index)], axis=1)[columns]
+
+    label_row = pd.DataFrame([mappings['Label'].tolist()], columns=columns)
+    return pd.concat([label_row, rows], ignore_index=True)
+
+
+def synthetic_elections(fips_df: pd.DataFrame, codes: List[int], rng: np.random.Generator) -> pd.DataFrame:
+    """
+    Generates an election results feed in the layout of the live dataset for the given counties.
+    """
+    counties = fips_df.drop_duplicates('fips').set_index('fips').reindex(codes)
+    dem = np.round(rng.uniform(10, 80, len(codes)), 1)
+    oth = np.round(rng.uniform(0.5, 3, len(codes)), 1)
+    rep = np.round(100 - dem - oth, 1)
+    return pd.DataFrame({
+        'FIPS': codes,
+        'Code': np.where(dem > rep, 'DTT', 'RTT'),
+        'County': counties['county'].fillna('').to_numpy(),
+        'Population': rng.integers(1000, 1000000, len(codes)),
+        '2020W': np.where(dem > rep, 'Biden', 'Trump'),
+        '2020D': dem,
+        '2020R': rep,
+        '2020O': oth,
+        '2016W': np.where(dem - rng.uniform(-3, 3, len(codes)) > rep, 'Clinton', 'Trump'),
+    })
+
+
+def build_dataset(directory: str, scale: int = 1, sample: Optional[int] = None, seed: int = 0) -> Dict[str, str]:
+    """
+    Writes every input of the pipeline, scaled up by a whole factor, into a directory.
+
+    The bundled FIPS, education, income and occupation files are used as they are. The census extracts
+    only their mappings are bundled for and the election feed are generated for the same counties. Each
+    extra copy of the data carries its own unused county codes, consistently across all the files, so
+    the joins fan out exactly as at 1x.
+
+    Args:
+        directory (str): Directory to write the files to.
+        scale (int): Number of copies of the data.
+        sample (Optional[int]): Only keep this many counties, for a quick run.
+        seed (int): Seed of the generated values.
+
+    Returns:
+        Dict[str, str]: Absolute path of each file, keyed by table name plus 'elections'.
+    """
+    rng = np.random.default_rng(seed)
+    codes = county_codes(sample)
+    copies = scaled_codes(codes, scale)
+    paths = {}
+
+    def write(name: str, filename: str, df: pd.DataFrame) -> None:
+        paths[name] = os.path.abspath(os.path.join(directory, filename))
+        df.to_csv(paths[name], index=False)
+
+    fips_df = pd.read_csv(data_path('FIPS.csv'))
+    write('FIPS', 'FIPS.csv', scale_frame(fips_df, 'fips', copies))
+    write('edu_att_test', 'edu_att_test.csv', scale_frame(pd.read_csv(data_path('edu_att_test.csv')), 'fips', copies))
+    write('elections', ELECTION_FILE, scale_frame(synthetic_elections(fips_df, codes, rng), 'FIPS', copies))
+
+    census = {table: pd.read_csv(data_path(filename), dtype=str) for table, (filename, _) in CENSUS_FILES.items()}
+    census.update({table: synthetic_census(mappings_file, codes, rng)
+                   for table, (_, mappings_file) in SYNTHETIC_CENSUS_FILES.items()})
+    for table, df in census.items():
+        scaled = scale_frame(df.iloc[1:], 'GEO_ID', copies, geography=True)
+        write(table, f"{table}.csv", pd.concat([df.iloc[:1], scaled], ignore_index=True))
+
+    return paths
+
+
+def census_mappings_file(table: str) -> str:
+    """
+    Returns the bundled column mappings file of a census table.
+    """
+    return {**CENSUS_FILES, **SYNTHETIC_CENSUS_FILES}[table][1]
+
+
+class FeedServer:
+    """
+    Serves local files over HTTP with an ETag, standing in for the remote election feed.
+
+    Attributes:
+        files (Dict[str, str]): Path of each file to serve, keyed by URL path, e.g. '/dataset.csv'.
+    """
+
+    def __init__(self, files: Dict[str, str]):
+        self.files = files
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def do_GET(self):
+                path = server.files.get(self.path)
+                if path is None:
+                    self.send_error(404)
+                    return
+
+                etag = f'"{os.stat(path).st_mtime_ns}"'
+                if self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+
+                with open(path, 'rb') as file:
+                    body = file.read()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/csv')
+                self.send_header('Content-Length', str(len(body)))
+                self.send_header('ETag', etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+
+    def __enter__(self) -> 'FeedServer':
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def url(self, path: str) -> str:
+        return f"http://127.0.0.1:{self.server.server_port}{path}"
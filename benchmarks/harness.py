@@ -0,0 +1,185 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+########################################################################################################################
+# Created by Jack Hangen
+# Version 1
+# Stage timing, memory and result files for the benchmark suite
+########################################################################################################################
+
+# Dependencies
+import gc
+import json
+import logging
+import os
+import platform
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Union
+import numpy as np
+import pandas as pd
+import sqlalchemy
+from instrumentation.trace import format_table
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+
+
+class Stage:
+    """
+    One step of the pipeline to benchmark.
+
+    Attributes:
+        name (str): Name in the results, e.g. 'push_to_server[income]'.
+        run (Callable[[Any], Any]): The step, called with whatever setup returned.
+        setup (Optional[Callable[[], Any]]): Prepares the input of one run; not timed.
+        rows (Union[int, Callable[[Any], int], None]): Rows the step handles, or a function of its result.
+    """
+
+    def __init__(self, name: str, run: Callable[[Any], Any], setup: Optional[Callable[[], Any]] = None,
+                 rows: Union[int, Callable[[Any], int], None] = None):
+        self.name = name
+        self.run = run
+        self.setup = setup
+        self.rows = rows
+
+    def prepare(self) -> Any:
+        return self.setup() if self.setup is not None else None
+
+    def count_rows(self, result: Any) -> Optional[int]:
+        return self.rows(result) if callable(self.rows) else self.rows
+
+
+def measure(stage: Stage, repeat: int = 3, memory: bool = True) -> Dict[str, Any]:
+    """
+    Times a stage and measures its peak memory.
+
+    The time is the best of repeat runs. Peak memory comes from one more run under tracemalloc, kept apart
+    from the timed runs because tracing slows allocation-heavy code down several times over.
+
+    Args:
+        stage (Stage): The stage to measure.
+        repeat (int): Timed runs.
+        memory (bool): Also measure the peak memory.
+
+    Returns:
+        Dict[str, Any]: stage, seconds (best), mean_seconds, repeat, peak_mb (None without memory), rows and
+        rows_per_sec (None when the stage has no row count).
+    """
+    if repeat < 1:
+        raise ValueError(f"repeat must be at least 1, got {repeat}")
+
+    times = []
+    result = None
+    for _ in range(repeat):
+        state = stage.prepare()
+        gc.collect()
+        start = time.perf_counter()
+        result = stage.run(state)
+        times.append(time.perf_counter() - start)
+
+    peak_mb = None
+    if memory:
+        state = stage.prepare()
+        gc.collect()
+        tracemalloc.start()
+        try:
+            stage.run(state)
+            peak_mb = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        finally:
+            tracemalloc.stop()
+
+    seconds = min(times)
+    rows = stage.count_rows(result)
+    record = {
+        'stage': stage.name,
+        'seconds': seconds,
+        'mean_seconds': sum(times) / len(times),
+        'repeat': repeat,
+        'peak_mb': peak_mb,
+        'rows': rows,
+        'rows_per_sec': rows / seconds if rows is not None and seconds > 0 else None,
+    }
+    logging.info(f"{stage.name}: {seconds:.4f}s" + (f", {peak_mb:.1f} MB peak" if peak_mb is not None else "")
+                 + (f", {record['rows_per_sec']:,.0f} rows/s" if record['rows_per_sec'] else ""))
+    return record
+
+
+def git_commit() -> Optional[str]:
+    """
+    Returns the commit the tree is at, with '-dirty' appended when there are uncommitted changes.
+    """
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return f"{commit}-dirty" if dirty else commit
+
+
+def environment() -> Dict[str, Any]:
+    """
+    Describes what the results were measured on, so result files can be told apart.
+    """
+    return {
+        'commit': git_commit(),
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'sqlalchemy': sqlalchemy.__version__,
+    }
+
+
+def write_results(results: Dict[str, Any], path: Optional[str] = None) -> str:
+    """
+    Writes results as JSON, by default to benchmarks/results/<commit>-<timestamp>.json.
+
+    Returns:
+        str: The path written.
+    """
+    if path is None:
+        stamp = results['environment']['timestamp'].replace(':', '').replace('-', '')
+        path = os.path.join(DEFAULT_RESULTS_DIR, f"{results['environment']['commit'] or 'unknown'}-{stamp}.json")
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as file:
+        json.dump(results, file, indent=2)
+    return path
+
+
+def read_results(path: str) -> Dict[str, Any]:
+    with open(path) as file:
+        return json.load(file)
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Pairs up the stages two result files have in common.
+
+    Returns:
+        List[Dict[str, Any]]: stage, scale, the baseline and current seconds and peak_mb, and the time ratio
+        (current over baseline, below 1 is faster), in the order of the current results.
+    """
+    before = {(record['stage'], record['scale']): record for record in baseline['results']}
+    rows = []
+    for record in current['results']:
+        old = before.get((record['stage'], record['scale']))
+        if old is None:
+            continue
+        rows.append({
+            'stage': record['stage'],
+            'scale': record['scale'],
+            'baseline_seconds': old['seconds'],
+            'seconds': record['seconds'],
+            'ratio': record['seconds'] / old['seconds'] if old['seconds'] else None,
+            'baseline_peak_mb': old['peak_mb'],
+            'peak_mb': record['peak_mb'],
+        })
+    return rows
+
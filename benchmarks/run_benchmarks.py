@@ -0,0 +1,230 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+########################################################################################################################
+# Created by Jack Hangen
+# Version 1
+# Stage-level benchmark suite for the whole pipeline
+########################################################################################################################
+
+# Dependencies
+import argparse
+import logging
+import os
+import tempfile
+from typing import Any, Dict, List, Optional
+import pandas as pd
+from sqlalchemy import create_engine
+from benchmarks.fixtures import FeedServer, build_dataset, census_mappings_file, CENSUS_FILES, SYNTHETIC_CENSUS_FILES
+from benchmarks.harness import (Stage, compare_results, environment, format_table, measure, read_results,
+                                write_results)
+from Collect.bulk_load import LOADERS
+from Collect.Collect import CensusData, CollectElectionAPI, CreateFromCSV, data_path
+from Collect.http_fetch import HttpFetcher, build_session
+from Collect.label_formatter import label_formatter
+from Transform.join_data import TRANSFORMS, extract_frames, merge_frames
+from Transform.pushdown import push_down_join
+from Transform.output_writer import HAS_PYARROW, WRITERS, write_outputs
+
+RESULT_COLUMNS = ['stage', 'scale', 'seconds', 'peak_mb', 'rows', 'rows_per_sec']
+COMPARE_COLUMNS = ['stage', 'scale', 'baseline_seconds', 'seconds', 'ratio', 'baseline_peak_mb', 'peak_mb']
+
+
+def census_stages(engine: Any, table: str, path: str, **push_options) -> List[Stage]:
+    """
+    The steps CensusData.load and push_to_server take a census extract through, one stage each.
+    """
+    mappings_file = census_mappings_file(table)
+    processed = CensusData.load(path, mappings_file, engine)
+    raw = CensusData(path, engine).censusDF
+    rows = len(raw) - 1
+    labels = len(pd.read_csv(data_path(mappings_file)))
+
+    def census_data(step: int) -> CensusData:
+        # a fresh object taken through the steps before the measured one; the label cache starts cold
+        label_formatter.cache_clear()
+        census_data = CensusData(path, engine, census_df=raw.copy())
+        if step > 0:
+            census_data.get_column_mappings(mappings_file)
+        if step > 1:
+            census_data.apply_column_mappings()
+        return census_data
+
+    def processed_data() -> CensusData:
+        census_data = CensusData(path, engine, census_df=processed.censusDF.copy())
+        census_data._schema = processed._schema
+        return census_data
+
+    return [
+        Stage(f"read_in_df[{table}]", lambda _: CensusData(path, engine), rows=rows),
+        Stage(f"get_column_mappings[{table}]", lambda census_data: census_data.get_column_mappings(mappings_file),
+              setup=lambda: census_data(0), rows=labels),
+        Stage(f"apply_column_mappings[{table}]", lambda census_data: census_data.apply_column_mappings(),
+              setup=lambda: census_data(1), rows=rows),
+        Stage(f"convert_to_type_numeric[{table}]", lambda census_data: census_data.convert_to_type_numeric(),
+              setup=lambda: census_data(2), rows=rows),
+        Stage(f"push_to_server[{table}]", lambda census_data: census_data.push_to_server(table, **push_options),
+              setup=processed_data, rows=rows),
+    ]
+
+
+def csv_stages(engine: Any, table: str, path: str, **push_options) -> List[Stage]:
+    """
+    Reading and pushing a plain CSV through CreateFromCSV.
+    """
+    rows = len(CreateFromCSV(path, engine).df)
+    return [
+        Stage(f"read_in_df[{table}]", lambda _: CreateFromCSV(path, engine), rows=rows),
+        Stage(f"push_to_server[{table}]", lambda create_from_csv: create_from_csv.push_to_server(table, **push_options),
+              setup=lambda: CreateFromCSV(path, engine), rows=rows),
+    ]
+
+
+def election_stages(engine: Any, url: str, fetcher: HttpFetcher, rows: int, **push_options) -> List[Stage]:
+    """
+    Downloading, revalidating, parsing and pushing the election feed through CollectElectionAPI.
+    """
+    def extracted() -> CollectElectionAPI:
+        api = CollectElectionAPI(engine, url, fetcher)
+        api.extract()
+        return api
+
+    return [
+        Stage('extract[elections]', lambda api: api.extract(force=True),
+              setup=lambda: CollectElectionAPI(engine, url, fetcher), rows=rows),
+        Stage('extract_not_modified[elections]', lambda api: api.extract(), setup=extracted, rows=rows),
+        Stage('get_df[elections]', lambda api: api.get_df(), setup=extracted, rows=rows),
+        Stage('push_to_server[elections]', lambda api: api.push_to_server('elections', **push_options), setup=extracted,
+              rows=rows),
+    ]
+
+
+def join_stages(engine: Any, directory: str) -> List[Stage]:
+    """
+    Every transform query, the merges of join_data, the output files written from the result and the join
+    pushed down into the database.
+    """
+    stages = [Stage(f"transform[{name}]", lambda _, transform=transform: transform(engine), rows=len)
+              for name, transform in TRANSFORMS.items()]
+
+    extracted = extract_frames(engine)
+    stages.append(Stage('merge_frames', lambda _: merge_frames(extracted), rows=len))
+    if HAS_PYARROW:
+        merged = merge_frames(extracted)
+        stages += [Stage(f"write_outputs[{name}]",
+                         lambda _, name=name: write_outputs(merged, os.path.join(directory, 'output'), [name]),
+                         rows=lambda results: results[0]['rows'])
+                   for name in WRITERS]
+    stages.append(Stage('push_down_join', lambda _: push_down_join(engine, 'POL_FINAL'), rows=lambda rows: rows))
+    return stages
+
+
+def run_scale(scale: int, repeat: int = 3, memory: bool = True, sample: Optional[int] = None,
+              url: Optional[str] = None, seed: int = 0, bulk_backend: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Builds the stand-in inputs at one scale and measures every stage on them, in pipeline order.
+
+    Args:
+        scale (int): Number of copies of the bundled data.
+        repeat (int): Timed runs per stage.
+        memory (bool): Also measure peak memory.
+        sample (Optional[int]): Only keep this many counties.
+        url (Optional[str]): Database to load into; a fresh SQLite file if None.
+        seed (int): Seed of the generated data.
+        bulk_backend (Optional[str]): Bulk load backend of the pushes; chosen from the engine's dialect if None.
+
+    Returns:
+        List[Dict[str, Any]]: One record per stage, see measure, with the scale added.
+    """
+    records = []
+    with tempfile.TemporaryDirectory() as directory:
+        paths = build_dataset(directory, scale, sample, seed)
+        engine = create_engine(url or f"sqlite:///{os.path.join(directory, 'benchmark.db')}")
+        fetcher = HttpFetcher(build_session(retries=0), cache_dir=os.path.join(directory, 'http'))
+
+        def run(stages: List[Stage]) -> None:
+            for stage in stages:
+                records.append({**measure(stage, repeat, memory), 'scale': scale})
+
+        try:
+            with FeedServer({'/dataset.csv': paths['elections']}) as server:
+                election_rows = len(pd.read_csv(paths['elections'], usecols=['FIPS']))
+                run(election_stages(engine, server.url('/dataset.csv'), fetcher, election_rows,
+                                    bulk_backend=bulk_backend))
+            for table in ('FIPS', 'edu_att_test'):
+                run(csv_stages(engine, table, paths[table], bulk_backend=bulk_backend))
+            for table in list(CENSUS_FILES) + list(SYNTHETIC_CENSUS_FILES):
+                run(census_stages(engine, table, paths[table], bulk_backend=bulk_backend))
+            run(join_stages(engine, directory))
+        finally:
+            fetcher.session.close()
+            engine.dispose()
+
+    return records
+
+
+def run_suite(scales: List[int], repeat: int = 3, memory: bool = True, sample: Optional[int] = None,
+              url: Optional[str] = None, seed: int = 0, bulk_backend: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Measures every stage at every scale.
+
+    Returns:
+        Dict[str, Any]: 'environment' (commit, versions, database and options) and 'results' (one record per
+        stage and scale).
+    """
+    env = environment()
+    env.update({'database': (url or 'sqlite:///<temporary file>').split('://')[0], 'scales': scales,
+                'repeat': repeat, 'memory': memory, 'sample': sample, 'seed': seed, 'bulk_backend': bulk_backend})
+
+    results = []
+    for scale in scales:
+        logging.info(f"Benchmarking at {scale}x")
+        results.extend(run_scale(scale, repeat, memory, sample, url, seed, bulk_backend))
+    return {'environment': env, 'results': results}
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Time every stage of the pipeline on local stand-ins.")
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 4],
+                        help="copies of the bundled data to benchmark at (default: %(default)s)")
+    parser.add_argument('--repeat', type=int, default=3,
+                        help="timed runs per stage, the best is kept (default: %(default)s)")
+    parser.add_argument('--sample', type=int,
+                        help="only keep this many counties (default: all)")
+    parser.add_argument('--no-memory', action='store_true',
+                        help="skip the peak memory runs")
+    parser.add_argument('--url',
+                        help="SQLAlchemy URL of the database to load into, e.g. duckdb:///bench.duckdb "
+                             "(default: a temporary SQLite file)")
+    parser.add_argument('--bulk-backend', choices=sorted(LOADERS),
+                        help="bulk load backend of the pushes (default: chosen from the database dialect)")
+    parser.add_argument('--seed', type=int, default=0,
+                        help="seed of the generated data (default: %(default)s)")
+    parser.add_argument('--output',
+                        help="JSON file to write (default: benchmarks/results/<commit>-<timestamp>.json)")
+    parser.add_argument('--compare',
+                        help="earlier results file to compare against")
+    parser.add_argument('--verbose', action='store_true',
+                        help="log the pipeline's own messages")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format='%(asctime)s %(levelname)s %(message)s')
+
+    results = run_suite(args.scales, args.repeat, not args.no_memory, args.sample, args.url, args.seed,
+                        args.bulk_backend)
+    path = write_results(results, args.output)
+
+    print(format_table(results['results'], RESULT_COLUMNS))
+    print(f"\nResults written to {path}")
+
+    if args.compare:
+        print()
+        print(format_table(compare_results(read_results(args.compare), results), COMPARE_COLUMNS))
+
+
+if __name__ == "__main__":
+    main()
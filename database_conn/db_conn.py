@@ -14,7 +14,11 @@ from pymysql.cursors import Cursor
 from pymysql.connections import Connection
 from dotenv import load_dotenv
 import os
-from sqlalchemy import create_engine
+import time
+from threading import Lock
+from typing import Any, Dict, Tuple
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import Engine
 from os.path import join, dirname
 from contextlib import contextmanager
 
@@ -32,8 +36,33 @@ class DataBaseConnector:
         region (str): The region of the AWS RDS instance.
         password (str): The password associated with the database user.
         dbname (str): The name of the database to connect to.
+        pool_settings (dict): Connection pool settings used when building the shared engine.
+        backend (str): 'mysql' for the RDS instance, or 'sqlite' or 'duckdb' for an embedded database file.
+        db_path (str): Path of the embedded database file, None for MySQL.
+
+    The backend is chosen by the DB_BACKEND environment variable and defaults to MySQL. The embedded backends
+    only need DB_PATH, which defaults to a file in data/, so the whole pipeline can run without a server.
+
+    Engines are kept in a process-wide registry keyed on the database URL and pool settings, so every
+    DataBaseConnector instance in the process hands out the same engine and connection pool.
     """
 
+    _engines: Dict[Tuple, Engine] = {}
+    _engine_lock = Lock()
+
+    DEFAULT_POOL_SETTINGS = {
+        "pool_size": 5,
+        "max_overflow": 10,
+        "pool_timeout": 30,
+        "pool_recycle": 3600,
+        "pool_pre_ping": True,
+        "idle_timeout": 300,
+    }
+
+    BACKENDS = ("mysql", "sqlite", "duckdb")
+    EMBEDDED_BACKENDS = ("sqlite", "duckdb")
+    MYSQL_VARS = ["ENDPOINT", "PORT", "USER", "REGION", "PASSWORD", "DBNAME"]
+
     def __init__(self):
         """
         Initializes the DataBaseConnector class.
@@ -50,22 +79,30 @@ class DataBaseConnector:
         """
         self.conn = None
         self.cur = None
+        self.endpoint = self.port = self.user = self.region = self.password = self.dbname = None
+        self.db_path = None
 
         try:
             env_vars = self.load_env_vars()
-            self.endpoint = env_vars["ENDPOINT"]
-            self.port = int(env_vars["PORT"])
-            self.user = env_vars["USER"]
-            self.region = env_vars["REGION"]
-            self.password = env_vars["PASSWORD"]
-            self.dbname = env_vars["DBNAME"]
+            self.backend = env_vars["DB_BACKEND"]
+            if self.backend in self.EMBEDDED_BACKENDS:
+                self.db_path = env_vars["DB_PATH"]
+            else:
+                self.endpoint = env_vars["ENDPOINT"]
+                self.port = int(env_vars["PORT"])
+                self.user = env_vars["USER"]
+                self.region = env_vars["REGION"]
+                self.password = env_vars["PASSWORD"]
+                self.dbname = env_vars["DBNAME"]
         except EnvironmentError as e:
             logging.error(f"Error loading in env vars {e}")
             print(e)
             exit(1)
 
-    @staticmethod
-    def load_env_vars() -> dict:
+        self.pool_settings = self.load_pool_settings()
+
+    @classmethod
+    def load_env_vars(cls) -> dict:
         """
         Loads environment variables from a .env file and validates their presence.
 
@@ -75,19 +112,29 @@ class DataBaseConnector:
         logs an error and raises an EnvironmentError.
 
         Returns:
-            dict: A dictionary containing all the required environment variables.
+            dict: A dictionary containing DB_BACKEND and the environment variables that backend requires.
 
         Raises:
-            EnvironmentError: If any of the required environment variables is not set.
+            EnvironmentError: If DB_BACKEND is not a known backend or any of the required environment variables
+                is not set.
 
         Note:
-            The required environment variables are: ENDPOINT, PORT, USER, REGION, PASSWORD, DBNAME.
+            DB_BACKEND defaults to mysql, which requires ENDPOINT, PORT, USER, REGION, PASSWORD and DBNAME. The
+            embedded sqlite and duckdb backends require nothing; DB_PATH optionally points them at a database file.
         """
         dotenv_path = join(dirname(dirname(__file__)), '.env')
         load_dotenv(dotenv_path)
 
-        required_vars = ["ENDPOINT", "PORT", "USER", "REGION", "PASSWORD", "DBNAME"]
-        env_vars_test = {}
+        backend = os.environ.get("DB_BACKEND", "mysql").strip().lower()
+        if backend not in cls.BACKENDS:
+            logging.error(f"Environment variable 'DB_BACKEND' has an invalid value: {backend}")
+            raise EnvironmentError(f"Environment variable 'DB_BACKEND' must be one of {cls.BACKENDS}, got '{backend}'")
+
+        if backend in cls.EMBEDDED_BACKENDS:
+            return {"DB_BACKEND": backend, "DB_PATH": os.environ.get("DB_PATH") or cls.default_db_path(backend)}
+
+        required_vars = cls.MYSQL_VARS
+        env_vars_test = {"DB_BACKEND": backend}
 
         for var in required_vars:
             value = os.environ.get(var)
@@ -98,6 +145,67 @@ class DataBaseConnector:
 
         return env_vars_test
 
+    @staticmethod
+    def default_db_path(backend: str) -> str:
+        """
+        Returns the database file an embedded backend uses when DB_PATH is not set, e.g. data/election_pipeline.sqlite.
+        """
+        return join(dirname(dirname(__file__)), 'data', f'election_pipeline.{backend}')
+
+    @property
+    def embedded(self) -> bool:
+        """
+        Whether the database is an embedded file rather than the RDS instance.
+        """
+        return self.backend in self.EMBEDDED_BACKENDS
+
+    def database_url(self) -> str:
+        """
+        Returns the SQLAlchemy URL of the database.
+        """
+        if self.embedded:
+            return f"{self.backend}:///{self.db_path}"
+        return f"mysql+pymysql://{self.user}:{self.password}@{self.endpoint}:{self.port}/{self.dbname}"
+
+    @classmethod
+    def load_pool_settings(cls) -> dict:
+        """
+        Loads the connection pool settings, overriding the defaults with any POOL_* environment variables.
+
+        The optional variables are POOL_SIZE, POOL_MAX_OVERFLOW, POOL_TIMEOUT, POOL_RECYCLE, POOL_PRE_PING
+        and POOL_IDLE_TIMEOUT. Times are in seconds; a negative POOL_RECYCLE or POOL_IDLE_TIMEOUT disables it.
+
+        Returns:
+            dict: The pool settings to pass to get_engine.
+
+        Raises:
+            EnvironmentError: If one of the variables cannot be parsed.
+        """
+        env_names = {
+            "pool_size": "POOL_SIZE",
+            "max_overflow": "POOL_MAX_OVERFLOW",
+            "pool_timeout": "POOL_TIMEOUT",
+            "pool_recycle": "POOL_RECYCLE",
+            "pool_pre_ping": "POOL_PRE_PING",
+            "idle_timeout": "POOL_IDLE_TIMEOUT",
+        }
+        settings = dict(cls.DEFAULT_POOL_SETTINGS)
+
+        for setting, var in env_names.items():
+            value = os.environ.get(var)
+            if value is None:
+                continue
+            try:
+                if setting == "pool_pre_ping":
+                    settings[setting] = value.strip().lower() in ("1", "true", "yes", "on")
+                else:
+                    settings[setting] = int(value)
+            except ValueError:
+                logging.error(f"Environment variable '{var}' has an invalid value: {value}")
+                raise EnvironmentError(f"Environment variable '{var}' has an invalid value: {value}")
+
+        return settings
+
     def get_conn(self) -> Connection:
         """
          Establishes and returns a PyMySQL connection to the AWS RDS instance.
@@ -109,6 +217,10 @@ class DataBaseConnector:
          Returns:
              Connection: A PyMySQL connection object to the AWS RDS instance.
          """
+        if self.embedded:
+            logging.error(f"get_conn connects to MySQL only; use get_engine for the {self.backend} database")
+            return self.conn
+
         try:
             self.conn = pymysql.connect(
                 host=self.endpoint,
@@ -122,20 +234,123 @@ class DataBaseConnector:
         finally:
             return self.conn
 
-    def get_engine(self):
+    def get_engine(self, **pool_options) -> Engine:
         """
-        Creates and returns a SQLAlchemy engine using the database connection details.
+        Returns the shared SQLAlchemy engine for this database, creating it on first use.
+
+        Engines are cached in a process-wide registry keyed on the database URL and the pool settings,
+        so repeated calls from any DataBaseConnector instance reuse one connection pool instead of
+        paying a new connect and TLS/auth handshake for every engine.
 
-        This method uses the instance's connection details to create a SQLAlchemy engine,
-        which can be used to interact with the database using SQLAlchemy's ORM features.
+        Args:
+            **pool_options: Overrides for the pool settings (pool_size, max_overflow, pool_timeout,
+                pool_recycle, pool_pre_ping, idle_timeout).
 
         Returns:
             Engine: A SQLAlchemy engine connected to the database.
+
+        Raises:
+            ImportError: If the backend is duckdb and duckdb-engine is not installed.
+        """
+        database_url = self.database_url()
+        settings = {**self.pool_settings, **pool_options}
+        key = (database_url, tuple(sorted(settings.items())))
+
+        with self._engine_lock:
+            engine = self._engines.get(key)
+            if engine is None:
+                if self.embedded:
+                    os.makedirs(dirname(os.path.abspath(self.db_path)), exist_ok=True)
+                try:
+                    engine = self._create_engine(database_url, settings, connect_args=self.connect_args())
+                except exc.NoSuchModuleError as e:
+                    logging.error(f"No SQLAlchemy dialect for the {self.backend} backend: {e}")
+                    raise ImportError(f"The {self.backend} backend needs its SQLAlchemy dialect, "
+                                      f"e.g. pip install duckdb-engine: {e}")
+                if self.backend == "sqlite":
+                    self._begin_immediate(engine)
+                self._engines[key] = engine
+                logging.info(f"Created shared engine for {self.db_path if self.embedded else self.endpoint} "
+                             f"with pool settings {settings}")
+
+        return engine
+
+    def connect_args(self) -> dict:
+        """
+        Returns the extra DBAPI connect arguments of the backend.
+        """
+        if self.backend == "mysql":
+            # lets the bulk loader use LOAD DATA LOCAL INFILE when the server allows it
+            return {"local_infile": True}
+        if self.backend == "sqlite":
+            # seconds a transaction waits for the database's single write lock, see _begin_immediate
+            return {"timeout": 600}
+        return {}
+
+    @staticmethod
+    def _begin_immediate(engine: Engine) -> None:
+        """
+        Makes every SQLite transaction take the write lock when it begins.
+
+        Parallel loads otherwise start as readers and fail with 'database is locked' as soon as two of them
+        try to upgrade to writing, rather than waiting for the lock.
+        """
+        @event.listens_for(engine, "connect")
+        def _disable_driver_transactions(dbapi_connection: Any, connection_record: Any) -> None:
+            dbapi_connection.isolation_level = None
+
+        @event.listens_for(engine, "begin")
+        def _begin(conn: Any) -> None:
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+    @staticmethod
+    def _create_engine(database_url: str, settings: dict, connect_args: dict = None) -> Engine:
+        """
+        Creates a pooled SQLAlchemy engine and attaches idle connection eviction to its pool.
+
+        Args:
+            database_url (str): The SQLAlchemy database URL.
+            settings (dict): The pool settings.
+            connect_args (dict): Extra keyword arguments for the DBAPI connect call.
+
+        Returns:
+            Engine: The new SQLAlchemy engine.
+        """
+        engine = create_engine(
+            database_url,
+            pool_size=settings["pool_size"],
+            max_overflow=settings["max_overflow"],
+            pool_timeout=settings["pool_timeout"],
+            pool_recycle=settings["pool_recycle"],
+            pool_pre_ping=settings["pool_pre_ping"],
+            connect_args=connect_args or {},
+        )
+
+        idle_timeout = settings["idle_timeout"]
+        if isinstance(engine, Engine) and idle_timeout >= 0:
+            @event.listens_for(engine.pool, "checkin")
+            def _record_checkin(dbapi_connection: Any, connection_record: Any) -> None:
+                connection_record.info["checked_in_at"] = time.monotonic()
+
+            @event.listens_for(engine.pool, "checkout")
+            def _evict_idle(dbapi_connection: Any, connection_record: Any, connection_proxy: Any) -> None:
+                checked_in_at = connection_record.info.pop("checked_in_at", None)
+                if checked_in_at is not None and time.monotonic() - checked_in_at > idle_timeout:
+                    # The pool discards this connection and retries the checkout with a fresh one
+                    raise exc.DisconnectionError("Connection was idle for longer than the idle timeout")
+
+        return engine
+
+    @classmethod
+    def dispose_engines(cls) -> None:
+        """
+        Disposes of every engine in the shared registry and closes their pooled connections.
         """
-        # Construct the database URL
-        database_url = f"mysql+pymysql://{self.user}:{self.password}@{self.endpoint}:{self.port}/{self.dbname}"
-        # Create and return the SQLAlchemy engine
-        return create_engine(database_url)
+        with cls._engine_lock:
+            for engine in cls._engines.values():
+                engine.dispose()
+            cls._engines.clear()
+        logging.info("Shared engines disposed")
 
     def get_cur(self) -> Cursor:
         """
@@ -0,0 +1,301 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+########################################################################################################################
+# Created by Jack Hangen
+# Version 1
+# Per-stage timing, row count and memory instrumentation
+########################################################################################################################
+
+# Dependencies
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+DEFAULT_TRACE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                  'logging', 'pipeline_trace.jsonl')
+SUMMARY_COLUMNS = ['stage', 'calls', 'errors', 'seconds', 'rows_in', 'rows_out', 'bytes', 'peak_rss_delta_mb']
+
+
+def peak_rss_mb() -> Optional[float]:
+    """
+    Returns the peak resident set size of the process so far in MB, or None where it is not available.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kilobytes elsewhere
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10
+
+
+def count_rows(value: Any) -> Optional[int]:
+    """
+    Returns the rows a stage handled from what it returned: the length of a DataFrame, the 'rows' of a
+    statistics dict or a plain row count.
+    """
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return len(value)
+    if isinstance(value, dict):
+        return value.get('rows')
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    return None
+
+
+class StageRecord:
+    """
+    The measurements of one run of a stage, filled in while it runs.
+
+    Attributes:
+        stage (str): Name of the stage, e.g. 'CensusData.push_to_server'.
+        parent (Optional[str]): Stage this one ran inside of on the same thread.
+        rows_in (Optional[int]): Rows the stage was given.
+        rows_out (Optional[int]): Rows the stage produced or wrote.
+        bytes (Optional[int]): Bytes transferred over the network.
+        fields (Dict[str, Any]): Any other values to keep with the record, e.g. the table.
+    """
+
+    def __init__(self, stage: str, parent: Optional[str] = None, **fields):
+        self.stage = stage
+        self.parent = parent
+        self.rows_in = None
+        self.rows_out = None
+        self.bytes = None
+        self.fields = fields
+        self.status = 'ok'
+        self.error = None
+        self.started = time.time()
+        self.seconds = None
+        self.peak_rss_delta_mb = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'stage': self.stage,
+            'parent': self.parent,
+            'started': datetime.fromtimestamp(self.started, timezone.utc).isoformat(timespec='milliseconds'),
+            'seconds': self.seconds,
+            'rows_in': self.rows_in,
+            'rows_out': self.rows_out,
+            'bytes': self.bytes,
+            'peak_rss_delta_mb': self.peak_rss_delta_mb,
+            'status': self.status,
+            'error': self.error,
+            'thread': threading.current_thread().name,
+            **self.fields,
+        }
+
+
+class Tracer:
+    """
+    Collects stage records, appends each one to a JSON lines trace file and summarizes them.
+
+    Attributes:
+        path (Optional[str]): Trace file records are appended to; records are only kept in memory if None.
+        records (deque): The most recent records, up to max_records.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_records: int = 10000):
+        self.path = path
+        self.records = deque(maxlen=max_records)
+        self._lock = threading.Lock()
+        self._file = None
+        if path is not None:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._file = open(path, 'a')
+
+    def emit(self, record: Dict[str, Any]) -> None:
+        with self._lock:
+            self.records.append(record)
+            if self._file is not None:
+                self._file.write(json.dumps(record, default=str) + '\n')
+                self._file.flush()
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """
+        Totals the records per stage, in the order the stages first finished.
+
+        Returns:
+            List[Dict[str, Any]]: stage, calls, errors, total seconds, rows_in, rows_out and bytes, and the
+            largest peak RSS delta of a single call.
+        """
+        totals = {}
+        with self._lock:
+            records = list(self.records)
+
+        for record in records:
+            total = totals.setdefault(record['stage'], {'stage': record['stage'], 'calls': 0, 'errors': 0,
+                                                        'seconds': 0.0, 'rows_in': None, 'rows_out': None,
+                                                        'bytes': None, 'peak_rss_delta_mb': None})
+            total['calls'] += 1
+            total['errors'] += record['status'] != 'ok'
+            total['seconds'] += record['seconds'] or 0.0
+            for key in ('rows_in', 'rows_out', 'bytes'):
+                if record[key] is not None:
+                    total[key] = (total[key] or 0) + record[key]
+            if record['peak_rss_delta_mb'] is not None:
+                total['peak_rss_delta_mb'] = max(total['peak_rss_delta_mb'] or 0.0, record['peak_rss_delta_mb'])
+
+        return list(totals.values())
+
+    def format_summary(self) -> str:
+        return format_table(self.summary(), SUMMARY_COLUMNS)
+
+    def log_summary(self) -> str:
+        """
+        Logs the summary table, and the trace file if there is one, and returns the table.
+        """
+        summary = self.format_summary()
+        logging.info(f"Stage summary:\n{summary}")
+        if self.path is not None:
+            logging.info(f"Stage records appended to {self.path}")
+        return summary
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+_tracer = Tracer()
+_local = threading.local()
+
+
+def get_tracer() -> Tracer:
+    return _tracer
+
+
+def set_tracer(tracer: Tracer) -> Tracer:
+    """
+    Makes a tracer the one every stage reports to.
+
+    Returns:
+        Tracer: The tracer it replaces.
+    """
+    global _tracer
+    previous, _tracer = _tracer, tracer
+    return previous
+
+
+@contextmanager
+def stage(name: str, **fields) -> Iterator[StageRecord]:
+    """
+    Measures a block of code as a stage.
+
+    The block can fill in rows_in, rows_out and bytes on the record it is given. The record is emitted to
+    the current tracer when the block finishes, also when it raises.
+
+    The peak RSS delta is how far the block raised the peak resident set size of the whole process, so
+    it is 0 when the block stayed under an earlier peak, and includes other threads running at the time.
+
+    Args:
+        name (str): Name of the stage.
+        **fields: Other values to keep with the record.
+    """
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+
+    record = StageRecord(name, stack[-1] if stack else None, **fields)
+    rss_before = peak_rss_mb()
+    start = time.perf_counter()
+    stack.append(name)
+    try:
+        yield record
+    except BaseException as e:
+        record.status = 'error'
+        record.error = repr(e)
+        raise
+    finally:
+        stack.pop()
+        record.seconds = time.perf_counter() - start
+        if rss_before is not None:
+            record.peak_rss_delta_mb = peak_rss_mb() - rss_before
+        _tracer.emit(record.to_dict())
+
+
+def traced(name: Optional[str] = None, rows_in: Optional[Callable[..., Optional[int]]] = None,
+           rows_out: Optional[Callable[..., Optional[int]]] = None,
+           target: Optional[Callable[..., Any]] = None) -> Callable:
+    """
+    Decorator measuring every call of a function as a stage.
+
+    The rows out are counted from the return value, see count_rows, unless rows_out is given, and the
+    bytes are taken from the 'bytes' of a returned dict.
+
+    Args:
+        name (Optional[str]): Name of the stage; the function's qualified name if None.
+        rows_in (Optional[Callable[..., Optional[int]]]): Called with the function's arguments before the call
+            to count the rows it is given.
+        rows_out (Optional[Callable[..., Optional[int]]]): Called with the function's arguments after the call
+            to count the rows it produced, e.g. for methods that update the object instead of returning.
+        target (Optional[Callable[..., Any]]): Called with the function's arguments to name what the call works
+            on, e.g. the table, kept as the record's 'target'.
+    """
+    def decorator(function: Callable) -> Callable:
+        stage_name = name or function.__qualname__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            fields = {'target': target(*args, **kwargs)} if target is not None else {}
+            with stage(stage_name, **fields) as record:
+                if rows_in is not None:
+                    record.rows_in = rows_in(*args, **kwargs)
+                result = function(*args, **kwargs)
+                record.rows_out = rows_out(*args, **kwargs) if rows_out is not None else count_rows(result)
+                if isinstance(result, dict) and isinstance(result.get('bytes'), int):
+                    record.bytes = result['bytes']
+                return result
+
+        return wrapper
+
+    return decorator
+
+
+def attribute_rows(attribute: str) -> Callable[..., int]:
+    """
+    Returns a row counter for traced methods: the length of a frame attribute of the object called on.
+    """
+    return lambda obj, *args, **kwargs: len(getattr(obj, attribute))
+
+
+def argument(position: int, name: str, default: Any = None) -> Callable[..., Any]:
+    """
+    Returns a getter of one argument of a traced call, passed by position or by keyword, e.g. for target.
+    """
+    return lambda *args, **kwargs: args[position] if len(args) > position else kwargs.get(name, default)
+
+
+def format_table(records: List[Dict[str, Any]], columns: List[str]) -> str:
+    """
+    Lays records out as a plain text table.
+    """
+    def cell(value: Any) -> str:
+        if value is None:
+            return '-'
+        if isinstance(value, float):
+            return f"{value:,.4f}" if abs(value) < 10 else f"{value:,.1f}"
+        if isinstance(value, int):
+            return f"{value:,}"
+        return str(value)
+
+    cells = [[cell(record.get(column)) for column in columns] for record in records]
+    widths = [max([len(column)] + [len(row[i]) for row in cells]) for i, column in enumerate(columns)]
+    lines = ['  '.join(column.ljust(width) for column, width in zip(columns, widths))]
+    lines += ['  '.join(value.rjust(width) if i else value.ljust(width) for i, (value, width)
+                        in enumerate(zip(row, widths))) for row in cells]
+    return '\n'.join(lines)
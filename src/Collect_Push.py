@@ -8,13 +8,32 @@
 ########################################################################################################################
 
 # Dependencies
-from Collect.Collect import CensusData, CollectElectionAPI, CreateFromCSV
+from Collect.Collect import CensusData, CollectElectionAPI, CreateFromCSV, data_path
+from Collect.manifest import LoadManifest
+from Collect.frame_cache import FrameCache, DEFAULT_MAX_BYTES
+from Transform.columns import source_columns
 from database_conn.db_conn import DataBaseConnector
-from typing import Any
+from Collect.bulk_load import LOADERS
+from Collect.census_api import CensusAPICollector
+from Collect.census_api import CENSUS_API_URL
+from Collect.datasets import CENSUS_DATASETS, Dataset, census_pool, parse_census
+from instrumentation.trace import DEFAULT_TRACE_PATH, Tracer, argument, set_tracer, traced
+from src.dag import DAG, Task, format_results, raise_for_failures
+from concurrent.futures import Executor
+from contextlib import nullcontext
+from typing import Any, ContextManager, Dict, List, Optional
+import argparse
 import logging
+import os
 
+# local files loaded as they are
+CSV_TABLES = ['FIPS', 'edu_att_test']
+ELECTION_URL = 'https://datawrapper.dwcdn.net/UI9i0/2/dataset.csv'
 
-def import_csv_to_database(engine: Any, filename: str) -> None:
+
+@traced(target=argument(1, 'filename'))
+def import_csv_to_database(engine: Any, filename: str, manifest: Optional[LoadManifest] = None, force: bool = False,
+                           **push_options) -> Dict[str, Any]:
     """
     Imports data from a CSV file into a database table.
 
@@ -25,71 +44,255 @@ def import_csv_to_database(engine: Any, filename: str) -> None:
     Args:
         engine (Any): SQLAlchemy engine to be used for database operations.
         filename (str): Name of the CSV file (without the '.csv' extension) to be read.
+        manifest (Optional[LoadManifest]): Load manifest used to skip the file when it has not changed.
+        force (bool): Push the file even if the manifest says it has not changed.
+        **push_options: Options passed on to push_to_server, such as bulk_backend and batch_size.
+
+    Returns:
+        Dict[str, Any]: The load statistics, see push_to_server.
 
     Raises:
         Exception: If any error occurs during file reading or database operations.
     """
     try:
+        if is_unchanged(manifest, force, filename, data_path(f'{filename}.csv')):
+            return skipped_load(filename)
+
         create_from_csv = CreateFromCSV(f'{filename}.csv', engine)
-        create_from_csv.push_to_server(filename)
+        return create_from_csv.push_to_server(filename, manifest=manifest, force=force, **push_options)
     except Exception as e:
         logging.error(f"Error importing CSV to database: {e}")
         raise
 
 
-def main():
-    db_conn = DataBaseConnector()
-    engine = db_conn.get_engine()
+@traced(target=lambda engine, dataset, *args, **kwargs: dataset.table)
+def push_census_data(engine: Any, dataset: Dataset, manifest: Optional[LoadManifest] = None, force: bool = False,
+                     cache: Optional[FrameCache] = None, project: bool = False, chunksize: Optional[int] = None,
+                     pool: Optional[Executor] = None, **push_options) -> Dict[str, Any]:
+    """
+    Reads a census export, maps and converts its columns and pushes it to a database table.
+
+    Args:
+        engine (Any): SQLAlchemy engine to be used for database operations.
+        dataset (Dataset): The registered dataset to load.
+        manifest (Optional[LoadManifest]): Load manifest used to skip the dataset when it has not changed.
+        force (bool): Push the dataset even if the manifest says it has not changed.
+        cache (Optional[FrameCache]): Cache of processed census frames.
+        project (bool): Only read and push the columns the Transform selects use.
+        chunksize (Optional[int]): Stream the file in chunks of this many rows instead of loading it whole.
+        pool (Optional[Executor]): Process pool the file is parsed in, see census_pool; parsed in this thread
+            if None. Not used when streaming.
+        **push_options: Options passed on to push_to_server, such as bulk_backend and batch_size.
+
+    Returns:
+        Dict[str, Any]: The load statistics, see push_to_server.
+    """
+    db_name = dataset.table
+    columns = sorted(source_columns(db_name)) if project else None
+    transform_options = {'drop_duplicates': dataset.drop_duplicates, 'columns': columns}
+
+    if is_unchanged(manifest, force, db_name, data_path(dataset.source), data_path(dataset.column_mappings),
+                    transform_options):
+        return skipped_load(db_name)
+
+    if chunksize is not None:
+        return CensusData.stream(dataset.source, dataset.column_mappings, engine, db_name, chunksize=chunksize,
+                                 drop_duplicates=dataset.drop_duplicates, columns=columns, manifest=manifest,
+                                 force=force, transform_options=transform_options, **push_options)
+
+    if pool is not None:
+        census_data = pool.submit(parse_census, dataset, columns, cache).result()
+    else:
+        census_data = parse_census(dataset, columns, cache)
+    census_data.engine = engine
+
+    return census_data.push_to_server(db_name, manifest=manifest, force=force, transform_options=transform_options,
+                                      **push_options)
+
+
+@traced(target=argument(1, 'db_name'))
+def push_census_api(engine: Any, db_name: str, year: int = 2019, drop_duplicates: bool = True,
+                    manifest: Optional[LoadManifest] = None, force: bool = False, **push_options) -> Dict[str, Any]:
+    """
+    Pulls a census table from the Census Data API instead of an exported CSV and pushes it to a database table.
+
+    The API key is read from the CENSUS_API_KEY environment variable, if set.
+
+    Args:
+        engine (Any): SQLAlchemy engine to be used for database operations.
+        db_name (str): Name of the table to push to, a key of CENSUS_DATASETS.
+        year (int): ACS vintage.
+        drop_duplicates (bool): Drop repeated column labels before pushing.
+        manifest (Optional[LoadManifest]): Load manifest used to skip the upload when the data has not changed.
+        force (bool): Push the dataset even if the manifest says it has not changed.
+        **push_options: Options passed on to push_to_server, such as bulk_backend and batch_size.
+
+    Returns:
+        Dict[str, Any]: The load statistics, see push_to_server.
+    """
+    dataset = CENSUS_DATASETS[db_name]
+    collector = CensusAPICollector(year, dataset.api_dataset, api_key=os.environ.get('CENSUS_API_KEY'))
+
+    census_data = collector.census_data(dataset.api_group, engine, drop_duplicates=drop_duplicates)
+    return census_data.push_to_server(db_name, manifest=manifest, force=force,
+                                      transform_options={'drop_duplicates': drop_duplicates, 'year': year},
+                                      **push_options)
+
+
+@traced(target=argument(1, 'url', ELECTION_URL))
+def push_election_data(engine: Any, url: str = ELECTION_URL, **push_options) -> Dict[str, Any]:
+    """
+    Downloads the election results feed and pushes it to the elections table.
 
-    # push local files to server
-    import_csv_to_database(engine, "FIPS")
-    import_csv_to_database(engine, "edu_att_test")
+    Args:
+        engine (Any): SQLAlchemy engine to be used for database operations.
+        url (str): URL of the results feed.
+        **push_options: Options passed on to push_to_server, such as manifest and force.
 
-    # push election API info to server
-    election_api = CollectElectionAPI(engine)
+    Returns:
+        Dict[str, Any]: The load statistics, see push_to_server.
+    """
+    election_api = CollectElectionAPI(engine, url)
     election_api.extract()
-    election_api.push_to_server('elections')
+    return election_api.push_to_server('elections', **push_options)
+
+
+def skipped_load(db_name: str) -> Dict[str, Any]:
+    """
+    The load statistics of a dataset skipped before it was parsed.
+    """
+    return {'table': db_name, 'rows': 0, 'skipped': True}
+
+
+def is_unchanged(manifest: Optional[LoadManifest], force: bool, db_name: str, source_path: str,
+                 mapping_path: Optional[str] = None, transform_options: Optional[dict] = None) -> bool:
+    """
+    Checks the load manifest before a source is parsed, so unchanged datasets cost only a file hash.
+    """
+    if manifest is None or force:
+        return False
+
+    fingerprint = LoadManifest.fingerprint(source_path, mapping_path, transform_options)
+    if manifest.is_current(db_name, fingerprint):
+        logging.info(f"{db_name} is unchanged since its last load, skipping.")
+        return True
+
+    return False
 
-    # push census data to server
 
-    # age and sex data
-    census_data = CensusData('AgeSexData.csv', engine)
+def add_collect_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Adds the options of the collection stages to a parser.
+    """
+    parser.add_argument('--bulk-backend', choices=sorted(LOADERS),
+                        help="bulk load backend (default: chosen from the database dialect)")
+    parser.add_argument('--batch-size', type=int, default=1000,
+                        help="rows per INSERT statement for the batched backends (default: 1000)")
+    parser.add_argument('--force', action='store_true',
+                        help="push every dataset even if the load manifest says it has not changed")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="parse every census file instead of reusing cached processed frames")
+    parser.add_argument('--cache-size-mb', type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                        help="size the processed frame cache is trimmed to (default: %(default)s)")
+    parser.add_argument('--project', action='store_true',
+                        help="only read and push the census columns the Transform selects use")
+    parser.add_argument('--election-url', default=ELECTION_URL,
+                        help="results feed the elections table is loaded from (default: %(default)s)")
+    parser.add_argument('--census-api', action='store_true',
+                        help="pull the census tables from the Census Data API instead of the exported CSVs")
+    parser.add_argument('--census-year', type=int, default=2019,
+                        help="ACS vintage pulled with --census-api (default: %(default)s)")
+    parser.add_argument('--chunksize', type=int,
+                        help="stream the census files in chunks of this many rows (default: load them whole)")
+    parser.add_argument('--processes', type=int,
+                        help="worker processes the census files are parsed in; 0 parses them in the loading "
+                             "threads (default: one per core)")
 
-    census_data.get_column_mappings('AgeSexData_columnMappings.csv')
-    census_data.apply_column_mappings()
-    census_data.convert_to_type_numeric()
 
-    census_data.push_to_server('AgeSexData')
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Collect the source datasets and push them to the database.")
+    add_collect_arguments(parser)
+    parser.add_argument('--jobs', type=int, default=4,
+                        help="datasets loaded at the same time (default: %(default)s)")
+    parser.add_argument('--trace', default=DEFAULT_TRACE_PATH,
+                        help="JSON lines file the stage records are appended to (default: %(default)s)")
+    return parser.parse_args(argv)
 
-    # demographic and housing data
-    census_data = CensusData('demographic_and_housing.csv', engine)
 
-    census_data.get_column_mappings('demographic_and_housing_columnMappings.csv')
-    census_data.apply_column_mappings()
-    census_data.convert_to_type_numeric()
-    census_data.drop_duplicate_columns()
+def main(argv=None):
+    args = parse_args(argv)
+    tracer = Tracer(args.trace)
+    set_tracer(tracer)
 
-    census_data.push_to_server('demographic_and_housing')
+    try:
+        engine = DataBaseConnector().get_engine()
+        manifest = LoadManifest(engine)
+        manifest.ensure_table()
 
-    # occupation and class of worker
-    census_data = CensusData('occ.csv', engine)
+        with open_census_pool(args) as pool:
+            results = DAG(collect_tasks(engine, manifest, args, pool)).run(max_workers=args.jobs)
+        print(format_results(results))
+        raise_for_failures(results)
+    finally:
+        DataBaseConnector.dispose_engines()
+        print(tracer.log_summary())
+        tracer.close()
 
-    census_data.get_column_mappings('occ_columnMappings.csv')
-    census_data.apply_column_mappings()
-    census_data.convert_to_type_numeric()
-    census_data.drop_duplicate_columns()
 
-    census_data.push_to_server('occ')
+def collect_tasks(engine: Any, manifest: LoadManifest, args: argparse.Namespace,
+                  pool: Optional[Executor] = None) -> List[Task]:
+    """
+    Builds a task loading each source dataset into its table.
 
-    # Income
-    census_data = CensusData('income.csv', engine)
+    The loads do not depend on each other, so they can all run at once, with the CPU-bound census parsing
+    handed to the process pool if one is given. Each one checks the load manifest
+    itself and reports the load as skipped when its source has not changed.
 
-    census_data.get_column_mappings('income_columnMappings.csv')
-    census_data.apply_column_mappings()
-    census_data.convert_to_type_numeric()
-    census_data.drop_duplicate_columns()
+    Args:
+        engine (Any): SQLAlchemy engine to load into.
+        manifest (LoadManifest): Load manifest used to skip unchanged datasets.
+        args (argparse.Namespace): The options added by add_collect_arguments.
+        pool (Optional[Executor]): Process pool the census files are parsed in, see open_census_pool.
+
+    Returns:
+        List[Task]: One task per table.
+    """
+    push_options = {'bulk_backend': args.bulk_backend, 'batch_size': args.batch_size, 'manifest': manifest,
+                    'force': args.force}
 
-    census_data.push_to_server('income')
+    tasks = [Task(db_name, lambda db_name=db_name: import_csv_to_database(engine, db_name, **push_options),
+                  inputs=[data_path(f'{db_name}.csv')], outputs=[db_name])
+             for db_name in CSV_TABLES]
+    tasks.append(Task('elections', lambda: push_election_data(engine, args.election_url, **push_options),
+                      inputs=[args.election_url], outputs=['elections']))
+
+    if args.census_api:
+        for dataset in CENSUS_DATASETS.values():
+            tasks.append(Task(dataset.table, lambda dataset=dataset: push_census_api(
+                engine, dataset.table, year=args.census_year, drop_duplicates=dataset.drop_duplicates,
+                **push_options),
+                inputs=[f"{CENSUS_API_URL}/{args.census_year}/{dataset.api_dataset}/groups/{dataset.api_group}"],
+                outputs=[dataset.table]))
+        return tasks
+
+    cache = None if args.no_cache else FrameCache(max_bytes=args.cache_size_mb * 1024 * 1024)
+    census_options = {'cache': cache, 'project': args.project, 'chunksize': args.chunksize, 'pool': pool,
+                      **push_options}
+    for dataset in CENSUS_DATASETS.values():
+        tasks.append(Task(dataset.table, lambda dataset=dataset: push_census_data(engine, dataset, **census_options),
+                          inputs=[data_path(dataset.source), data_path(dataset.column_mappings)],
+                          outputs=[dataset.table]))
+    return tasks
+
+
+def open_census_pool(args: argparse.Namespace) -> ContextManager[Optional[Executor]]:
+    """
+    Opens the process pool the census files are parsed in, or a placeholder for None when they are not
+    parsed locally or --processes is 0.
+    """
+    if args.census_api or args.chunksize is not None or args.processes == 0:
+        return nullcontext()
+    return census_pool(args.processes)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,241 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+########################################################################################################################
+# Created by Jack Hangen
+# Version 1
+# Dependency-aware runner for the pipeline stages
+########################################################################################################################
+
+# Dependencies
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+from instrumentation.trace import format_table, stage
+
+RESULT_COLUMNS = ['task', 'status', 'seconds', 'rows', 'error']
+
+
+class Task:
+    """
+    One stage of the pipeline with the data it reads and writes.
+
+    Attributes:
+        name (str): Name the task is selected by, e.g. 'income'.
+        action (Callable[[], Any]): Runs the stage. A returned dict with 'skipped' set marks the task skipped.
+        inputs (List[str]): Tables, files or URLs the stage reads.
+        outputs (List[str]): Tables the stage writes.
+        is_current (Optional[Callable[[], bool]]): Checked before the action, after every upstream task
+            finished; the task is skipped when it returns True.
+    """
+
+    def __init__(self, name: str, action: Callable[[], Any], inputs: Iterable[str] = (), outputs: Iterable[str] = (),
+                 is_current: Optional[Callable[[], bool]] = None):
+        self.name = name
+        self.action = action
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.is_current = is_current
+
+    def __repr__(self) -> str:
+        return f"Task({self.name!r}, inputs={self.inputs!r}, outputs={self.outputs!r})"
+
+
+class DAG:
+    """
+    A graph of tasks, where a task depends on the tasks producing its inputs.
+
+    Attributes:
+        tasks (Dict[str, Task]): The tasks by name, in topological order.
+        dependencies (Dict[str, Set[str]]): Names of the tasks each task depends on.
+    """
+
+    def __init__(self, tasks: Iterable[Task]):
+        tasks = list(tasks)
+        by_name = {}
+        producers = {}
+        for task in tasks:
+            if task.name in by_name:
+                logging.error(f"Duplicate task name: {task.name}")
+                raise ValueError(f"Duplicate task name: {task.name}")
+            by_name[task.name] = task
+            for output in task.outputs:
+                if output in producers:
+                    logging.error(f"{output} is written by both {producers[output]} and {task.name}")
+                    raise ValueError(f"{output} is written by both {producers[output]} and {task.name}")
+                producers[output] = task.name
+
+        self.producers = producers
+        self.dependencies = {task.name: {producers[source] for source in task.inputs
+                                         if source in producers and producers[source] != task.name}
+                             for task in tasks}
+        self.tasks = {name: by_name[name] for name in self._topological_order([task.name for task in tasks])}
+
+    def _topological_order(self, names: List[str]) -> List[str]:
+        order = []
+        state = {}
+
+        def visit(name: str, path: List[str]) -> None:
+            if state.get(name) == 'done':
+                return
+            if state.get(name) == 'visiting':
+                cycle = ' -> '.join(path[path.index(name):] + [name])
+                logging.error(f"Dependency cycle: {cycle}")
+                raise ValueError(f"Dependency cycle: {cycle}")
+            state[name] = 'visiting'
+            for dependency in sorted(self.dependencies[name], key=names.index):
+                visit(dependency, path + [name])
+            state[name] = 'done'
+            order.append(name)
+
+        for name in names:
+            visit(name, [])
+        return order
+
+    def upstream(self, names: Iterable[str]) -> Set[str]:
+        """
+        Returns the tasks the given tasks depend on, directly or not, the given tasks included.
+        """
+        found = set()
+        pending = list(names)
+        while pending:
+            name = pending.pop()
+            if name not in found:
+                found.add(name)
+                pending.extend(self.dependencies[name])
+        return found
+
+    def downstream(self, names: Iterable[str]) -> Set[str]:
+        """
+        Returns the tasks depending on the given tasks, directly or not, the given tasks included.
+        """
+        found = set(names)
+        for name in self.tasks:
+            if self.dependencies[name] & found:
+                found.add(name)
+        return found
+
+    def select(self, targets: Optional[Iterable[str]] = None, with_upstream: bool = False) -> List[str]:
+        """
+        Resolves targets to the tasks to run, in topological order.
+
+        Args:
+            targets (Optional[Iterable[str]]): Task names or the tables they write; every task if None.
+            with_upstream (bool): Also run every task the targets depend on.
+
+        Returns:
+            List[str]: Names of the selected tasks.
+
+        Raises:
+            ValueError: If a target is neither a task nor a table written by one.
+        """
+        if targets is None:
+            return list(self.tasks)
+
+        selected = set()
+        for target in targets:
+            name = target if target in self.tasks else self.producers.get(target)
+            if name is None:
+                logging.error(f"Unknown target {target}, expected one of {list(self.tasks)}")
+                raise ValueError(f"Unknown target {target}, expected one of {list(self.tasks)}")
+            selected.add(name)
+
+        if with_upstream:
+            selected = self.upstream(selected)
+        return [name for name in self.tasks if name in selected]
+
+    def run(self, targets: Optional[Iterable[str]] = None, with_upstream: bool = False,
+            max_workers: int = 4) -> Dict[str, Dict[str, Any]]:
+        """
+        Runs the selected tasks, each as soon as the selected tasks it depends on have finished.
+
+        Tasks with no path between them run at the same time in a thread pool. Upstream tasks that are not
+        selected are taken as already done. A failed task does not stop the others, but the tasks depending
+        on it are not run.
+
+        Args:
+            targets (Optional[Iterable[str]]): Task names or the tables they write; every task if None.
+            with_upstream (bool): Also run every task the targets depend on.
+            max_workers (int): Tasks running at once.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: For every selected task in topological order, its status ('done',
+            'skipped', 'failed' or 'blocked'), the action's result, the error if any and the seconds taken.
+        """
+        if max_workers < 1:
+            logging.error(f"max_workers must be at least 1, got {max_workers}")
+            raise ValueError(f"max_workers must be at least 1, got {max_workers}")
+
+        selected = self.select(targets, with_upstream)
+        results = {name: {'status': 'pending', 'result': None, 'error': None, 'seconds': 0.0} for name in selected}
+        waiting = {name: self.dependencies[name] & set(selected) for name in selected}
+        running: Dict[Future, str] = {}
+        start = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='task') as executor:
+            while waiting or running:
+                for name in [name for name, dependencies in waiting.items() if not dependencies]:
+                    del waiting[name]
+                    running[executor.submit(self._run_task, self.tasks[name])] = name
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    results[name].update(future.result())
+                    if results[name]['status'] == 'failed':
+                        for blocked in self.downstream([name]) - {name}:
+                            if waiting.pop(blocked, None) is not None:
+                                results[blocked]['status'] = 'blocked'
+                                logging.warning(f"Not running {blocked}: {name} failed")
+                    for dependencies in waiting.values():
+                        dependencies.discard(name)
+
+        counts = {status: sum(result['status'] == status for result in results.values())
+                  for status in ('done', 'skipped', 'failed', 'blocked')}
+        logging.info(f"Ran {len(selected)} tasks in {time.perf_counter() - start:.1f}s: "
+                     + ', '.join(f"{count} {status}" for status, count in counts.items()))
+        return results
+
+    @staticmethod
+    def _run_task(task: Task) -> Dict[str, Any]:
+        start = time.perf_counter()
+        outcome = {'status': 'done', 'result': None, 'error': None}
+        try:
+            with stage('DAG.task', target=task.name):
+                if task.is_current is not None and task.is_current():
+                    outcome['status'] = 'skipped'
+                else:
+                    outcome['result'] = task.action()
+                    if isinstance(outcome['result'], dict) and outcome['result'].get('skipped'):
+                        outcome['status'] = 'skipped'
+        except Exception as e:
+            logging.error(f"Task {task.name} failed: {e}")
+            outcome.update(status='failed', error=repr(e))
+
+        outcome['seconds'] = time.perf_counter() - start
+        logging.info(f"Task {task.name} {outcome['status']} in {outcome['seconds']:.2f}s")
+        return outcome
+
+
+def format_results(results: Dict[str, Dict[str, Any]]) -> str:
+    """
+    Lays the results of DAG.run out as a table of one row per task.
+    """
+    rows = [{'task': name, 'status': result['status'], 'seconds': result['seconds'],
+             'rows': result['result'].get('rows') if isinstance(result['result'], dict) else result['result'],
+             'error': result['error']} for name, result in results.items()]
+    return format_table(rows, RESULT_COLUMNS)
+
+
+def raise_for_failures(results: Dict[str, Dict[str, Any]]) -> None:
+    """
+    Raises if any task of a DAG.run failed or was blocked by a failure.
+
+    Raises:
+        RuntimeError: Naming the tasks that did not run to the end.
+    """
+    failed = [name for name, result in results.items() if result['status'] in ('failed', 'blocked')]
+    if failed:
+        logging.error(f"Tasks did not finish: {', '.join(failed)}")
+        raise RuntimeError(f"Tasks did not finish: {', '.join(failed)}")
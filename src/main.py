@@ -9,26 +9,179 @@ import logging
 ########################################################################################################################
 
 # Dependencies
+import argparse
+import pandas as pd
 from Transform.join_data import join_data
+from Transform.pushdown import push_down_join
+from Transform.output_writer import DEFAULT_OUTPUT_DIR, WRITERS, write_outputs
+from Transform.columns import TRANSFORM_MODULES
+from Transform.query_builder import quote
+from Transform.query_cache import DEFAULT_QUERY_CACHE_BYTES, DEFAULT_QUERY_CACHE_DIR, QueryCache, use_query_cache
+from Collect.frame_cache import FrameCache
+from Collect.manifest import LoadManifest, options_hash
+from Collect.keys import create_keys, infer_keys, key_sql_types
 from database_conn.db_conn import DataBaseConnector
+from instrumentation.trace import DEFAULT_TRACE_PATH, Tracer, set_tracer, stage
+from src.dag import Task
 from os.path import join, dirname
+from typing import Any, Dict, Optional
 
+FINAL_TABLE = 'POL_FINAL'
+
+
+def add_join_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Adds the options of the final join to a parser.
+    """
+    parser.add_argument('--concurrent', action='store_true',
+                        help="run the transform reads concurrently instead of one after another")
+    parser.add_argument('--workers', type=int, default=4,
+                        help="number of transform reads in flight with --concurrent (default: 4)")
+    parser.add_argument('--pushdown', action='store_true',
+                        help="build POL_FINAL inside the database instead of joining in pandas")
+    parser.add_argument('--no-query-cache', action='store_true',
+                        help="read every transform from the database instead of reusing cached results")
+    parser.add_argument('--query-cache-size-mb', type=int, default=DEFAULT_QUERY_CACHE_BYTES // (1024 * 1024),
+                        help="size the transform result cache is trimmed to (default: %(default)s)")
+    parser.add_argument('--output-format', dest='output_formats', action='append', choices=sorted(WRITERS),
+                        default=[], help="also write POL_FINAL as files in this format, partitioned by state; "
+                                         "repeat for several formats")
+    parser.add_argument('--output-dir', default=DEFAULT_OUTPUT_DIR,
+                        help="directory the --output-format files are written under (default: %(default)s)")
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Join the transformed datasets into POL_FINAL.")
+    add_join_arguments(parser)
+    parser.add_argument('--trace', default=DEFAULT_TRACE_PATH,
+                        help="JSON lines file the stage records are appended to (default: %(default)s)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
 
-def main():
     logging.basicConfig(level=logging.DEBUG,
                         format='%(asctime)s %(levelname)s %(message)s',
                         filename=join(dirname(dirname(__file__)), 'logging/pol_pipeline.log'),
                         filemode='w')
 
-    db_conn = DataBaseConnector()
+    tracer = Tracer(args.trace)
+    set_tracer(tracer)
+
+    try:
+        build_pol_final(args)
+    finally:
+        DataBaseConnector.dispose_engines()
+        print(tracer.log_summary())
+        tracer.close()
 
-    df = join_data()
+
+def build_pol_final(args: argparse.Namespace, engine: Any = None) -> int:
+    """
+    Joins the transformed datasets into POL_FINAL, in pandas or inside the database.
+
+    Returns:
+        int: Rows written to POL_FINAL.
+    """
+    if engine is None:
+        engine = DataBaseConnector().get_engine()
+
+    output_formats = getattr(args, 'output_formats', [])
+    output_dir = getattr(args, 'output_dir', DEFAULT_OUTPUT_DIR)
+
+    if args.pushdown:
+        rows = push_down_join(engine, FINAL_TABLE)
+        if output_formats:
+            write_outputs(pd.read_sql(f"SELECT * FROM {quote(engine, FINAL_TABLE)}", engine), output_dir,
+                          output_formats)
+        return rows
+
+    with use_query_cache(open_query_cache(args, engine)):
+        df = join_data(engine, concurrent=args.concurrent, max_workers=args.workers)
 
     try:
-        df.to_sql("POL_FINAL", con=db_conn.get_engine(), if_exists='replace', index=False)
+        with stage('POL_FINAL.to_sql', target='POL_FINAL') as record:
+            record.rows_in = len(df)
+            keys = infer_keys(df.columns, 'FIPS', df['FIPS'])
+            df.to_sql("POL_FINAL", con=engine, if_exists='replace', index=False, dtype=key_sql_types(df, keys))
+            create_keys(engine, "POL_FINAL", keys)
+            record.rows_out = len(df)
     except Exception as e:
         raise Exception(f"An error occurred while creating the SQL table: {e}")
 
+    # written from the frame already in memory rather than read back from the table
+    write_outputs(df, output_dir, output_formats)
+
+    return len(df)
+
+
+def open_query_cache(args: argparse.Namespace, engine: Any) -> Optional[QueryCache]:
+    """
+    Returns the cache the transform reads of one join go through, or None with --no-query-cache.
+    """
+    if getattr(args, 'no_query_cache', True):
+        return None
+
+    cache = FrameCache(DEFAULT_QUERY_CACHE_DIR, max_bytes=args.query_cache_size_mb * 1024 * 1024)
+    return QueryCache(cache, LoadManifest(engine))
+
+
+def join_fingerprint(manifest: LoadManifest, args: argparse.Namespace) -> Optional[Dict[str, Optional[str]]]:
+    """
+    Fingerprints POL_FINAL by the manifest entries of the tables it is joined from.
+
+    Returns:
+        Optional[Dict[str, Optional[str]]]: Hashes in the form LoadManifest.fingerprint builds, or None when a
+        source table has no manifest entry, so its contents are unknown.
+    """
+    sources = {}
+    for module in TRANSFORM_MODULES:
+        entry = manifest.get(module.TABLE)
+        if entry is None:
+            return None
+        sources[module.TABLE] = [entry['source_hash'], entry['mapping_hash'], entry['options_hash']]
+
+    return {'source_hash': options_hash(sources), 'mapping_hash': None,
+            'options_hash': options_hash({'pushdown': args.pushdown,
+                                          'output_formats': sorted(getattr(args, 'output_formats', [])),
+                                          'output_dir': getattr(args, 'output_dir', DEFAULT_OUTPUT_DIR)})}
+
+
+def join_task(engine: Any, manifest: LoadManifest, args: argparse.Namespace) -> Task:
+    """
+    Builds the task joining the transformed tables into POL_FINAL.
+
+    The join is skipped when none of the tables it reads have been reloaded since POL_FINAL was last built,
+    unless args.force is set.
+
+    Args:
+        engine (Any): SQLAlchemy engine the tables live in.
+        manifest (LoadManifest): Load manifest POL_FINAL is recorded in.
+        args (argparse.Namespace): The options added by add_join_arguments, and force.
+
+    Returns:
+        Task: The POL_FINAL task, reading the table of every transform.
+    """
+    def is_current() -> bool:
+        if getattr(args, 'force', False):
+            return False
+        fingerprint = join_fingerprint(manifest, args)
+        if fingerprint is None or not manifest.is_current(FINAL_TABLE, fingerprint):
+            return False
+        logging.info(f"{FINAL_TABLE} is up to date with its source tables, skipping.")
+        return True
+
+    def build() -> Dict[str, Any]:
+        fingerprint = join_fingerprint(manifest, args)
+        rows = build_pol_final(args, engine)
+        if fingerprint is not None:
+            manifest.record(FINAL_TABLE, fingerprint, rows)
+        return {'table': FINAL_TABLE, 'rows': rows}
+
+    return Task(FINAL_TABLE, build, inputs=[module.TABLE for module in TRANSFORM_MODULES], outputs=[FINAL_TABLE],
+                is_current=is_current)
+
 
 if __name__ == "__main__":
     main()
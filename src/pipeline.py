@@ -0,0 +1,91 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+########################################################################################################################
+# Created by Jack Hangen
+# Version 1
+# Full pipeline, from collection through POL_FINAL
+########################################################################################################################
+
+# Dependencies
+import argparse
+import logging
+from concurrent.futures import Executor
+from typing import Any, List, Optional
+from Collect.manifest import LoadManifest
+from database_conn.db_conn import DataBaseConnector
+from instrumentation.trace import DEFAULT_TRACE_PATH, Tracer, set_tracer
+from src.Collect_Push import add_collect_arguments, collect_tasks, open_census_pool
+from src.dag import DAG, format_results, raise_for_failures
+from src.main import add_join_arguments, join_task
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Run the pipeline from collection through POL_FINAL, loading independent datasets in parallel.")
+    parser.add_argument('targets', nargs='*',
+                        help="tasks or tables to rebuild, e.g. 'income POL_FINAL' (default: all of them)")
+    parser.add_argument('--with-upstream', action='store_true',
+                        help="also run every task the targets depend on")
+    parser.add_argument('--list', action='store_true',
+                        help="print the tasks with their inputs and outputs and exit")
+    parser.add_argument('--jobs', type=int, default=4,
+                        help="tasks run at the same time (default: %(default)s)")
+    parser.add_argument('--trace', default=DEFAULT_TRACE_PATH,
+                        help="JSON lines file the stage records are appended to (default: %(default)s)")
+    add_collect_arguments(parser)
+    add_join_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def pipeline_tasks(engine: Any, manifest: LoadManifest, args: argparse.Namespace,
+                   pool: Optional[Executor] = None) -> DAG:
+    """
+    Builds the graph of every pipeline task: one load per source dataset, then the POL_FINAL join.
+    """
+    return DAG(collect_tasks(engine, manifest, args, pool) + [join_task(engine, manifest, args)])
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(threadName)s %(message)s')
+
+    tracer = Tracer(args.trace)
+    set_tracer(tracer)
+
+    try:
+        engine = DataBaseConnector().get_engine()
+        manifest = LoadManifest(engine)
+        if args.list:
+            print(describe(pipeline_tasks(engine, manifest, args)))
+            return
+
+        # created up front so the parallel loads do not race to create it
+        manifest.ensure_table()
+        with open_census_pool(args) as pool:
+            dag = pipeline_tasks(engine, manifest, args, pool)
+            results = dag.run(args.targets or None, with_upstream=args.with_upstream, max_workers=args.jobs)
+        print(format_results(results))
+        raise_for_failures(results)
+    finally:
+        DataBaseConnector.dispose_engines()
+        print(tracer.log_summary())
+        tracer.close()
+
+
+def describe(dag: DAG) -> str:
+    """
+    Lists the tasks in the order they can run, with what each one reads, writes and waits for.
+    """
+    lines: List[str] = []
+    for name, task in dag.tasks.items():
+        lines.append(name)
+        lines.append(f"  inputs:     {', '.join(task.inputs) or '-'}")
+        lines.append(f"  outputs:    {', '.join(task.outputs) or '-'}")
+        lines.append(f"  depends on: {', '.join(sorted(dag.dependencies[name])) or '-'}")
+    return '\n'.join(lines)
+
+
+if __name__ == "__main__":
+    main()
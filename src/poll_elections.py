@@ -0,0 +1,48 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+########################################################################################################################
+# Created by Jack Hangen
+# Version 1
+# Election night polling daemon
+########################################################################################################################
+
+# Dependencies
+import argparse
+import logging
+from Collect.election_poller import ElectionPoller
+from Collect.manifest import LoadManifest
+from database_conn.db_conn import DataBaseConnector
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Keep the elections table in step with the live results feed.")
+    parser.add_argument('--interval', type=float, default=30.0,
+                        help="seconds between polls (default: %(default)s)")
+    parser.add_argument('--max-polls', type=int,
+                        help="stop after this many polls (default: run until interrupted)")
+    parser.add_argument('--url', default='https://datawrapper.dwcdn.net/UI9i0/2/dataset.csv',
+                        help="results feed to poll (default: %(default)s)")
+    parser.add_argument('--table', default='elections',
+                        help="table to keep up to date (default: %(default)s)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+
+    engine = DataBaseConnector().get_engine()
+    poller = ElectionPoller(engine, url=args.url, table=args.table, interval=args.interval,
+                            manifest=LoadManifest(engine))
+
+    try:
+        poller.run(max_polls=args.max_polls)
+    except KeyboardInterrupt:
+        logging.info("Polling stopped.")
+    finally:
+        DataBaseConnector.dispose_engines()
+
+
+if __name__ == "__main__":
+    main()
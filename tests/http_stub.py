@@ -0,0 +1,83 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubServer:
+    """
+    A local HTTP server standing in for the remote data sources in the tests.
+
+    Each route is a dict with the body and optional etag, last_modified, status, a delay in seconds and
+    a number of failures (503s) to answer with before succeeding. Every request is logged with its
+    headers, and the most requests ever in flight at once is kept in max_active.
+    """
+
+    def __init__(self, routes=None):
+        self.routes = routes or {}
+        self.requests = []
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def do_GET(self):
+                with stub.lock:
+                    stub.requests.append((self.path, dict(self.headers)))
+                    stub.active += 1
+                    stub.max_active = max(stub.max_active, stub.active)
+                try:
+                    self.respond()
+                finally:
+                    with stub.lock:
+                        stub.active -= 1
+
+            def respond(self):
+                route = stub.routes.get(self.path)
+                if route is None:
+                    self.send_error(404)
+                    return
+
+                if route.get('failures', 0) > 0:
+                    route['failures'] -= 1
+                    self.send_response(503)
+                    self.send_header('Retry-After', '0')
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+
+                time.sleep(route.get('delay', 0))
+                etag = route.get('etag')
+                if etag is not None and self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+
+                body = route['body']
+                self.send_response(route.get('status', 200))
+                self.send_header('Content-Type', route.get('content_type', 'text/csv'))
+                self.send_header('Content-Length', str(len(body)))
+                if etag is not None:
+                    self.send_header('ETag', etag)
+                if route.get('last_modified'):
+                    self.send_header('Last-Modified', route['last_modified'])
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def url(self, path):
+        return f"http://127.0.0.1:{self.server.server_port}{path}"
@@ -0,0 +1,100 @@
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+import pandas as pd
+from sqlalchemy import create_engine
+from Collect.async_collector import AsyncCollector, RateLimiter, Source, census_handler, csv_handler
+from Collect.http_fetch import HttpFetcher, build_session
+from http_stub import StubServer
+
+CENSUS_CSV = (
+    'GEO_ID,NAME,S1901_C01_012E,S1901_C01_012M\n'
+    'Geography,Geographic Area Name,Estimate!!Households!!Median income (dollars),'
+    'Margin of Error!!Households!!Median income (dollars)\n'
+    '0500000US01001,"Autauga County, Alabama",58731,2283\n'
+    '0500000US01003,"Baldwin County, Alabama",58320,1442\n'
+)
+
+
+class TestAsyncCollector(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.fetcher = HttpFetcher(build_session(retries=0), cache_dir=self.tmp_dir.name)
+        # a file database, since the handlers write from worker threads
+        self.engine = create_engine(f"sqlite:///{os.path.join(self.tmp_dir.name, 'collect.db')}")
+
+    def tearDown(self):
+        self.fetcher.session.close()
+        self.engine.dispose()
+        self.tmp_dir.cleanup()
+
+    def test_sources_processed_through_existing_classes(self):
+        routes = {
+            '/fips.csv': {'body': b'fips,county\n1001,Autauga\n'},
+            '/income.csv': {'body': CENSUS_CSV.encode()},
+        }
+        with StubServer(routes) as server:
+            sources = [
+                Source('FIPS', server.url('/fips.csv'), csv_handler(self.engine, 'FIPS')),
+                Source('income', server.url('/income.csv'),
+                       census_handler(self.engine, 'income', 'income_columnMappings.csv')),
+            ]
+            results = AsyncCollector(self.fetcher).collect(sources)
+
+        self.assertEqual([result['status'] for result in results], ['ok', 'ok'])
+        self.assertEqual(pd.read_sql('SELECT * FROM FIPS', self.engine)['county'].tolist(), ['Autauga'])
+        income = pd.read_sql('SELECT * FROM income', self.engine)
+        self.assertEqual(income['EST_HH_Median_income_(dollars)'].tolist(), [58731, 58320])
+
+    def test_results_processed_as_they_arrive(self):
+        finished = []
+        routes = {'/slow.csv': {'body': b'a\n1\n', 'delay': 0.5}, '/fast.csv': {'body': b'a\n2\n'}}
+        with StubServer(routes) as server:
+            sources = [Source(name, server.url(f'/{name}.csv'), lambda path, name=name: finished.append(name))
+                       for name in ('slow', 'fast')]
+            AsyncCollector(self.fetcher).collect(sources)
+
+        self.assertEqual(finished, ['fast', 'slow'])
+
+    def test_per_host_limit(self):
+        routes = {f'/{i}.csv': {'body': b'a\n1\n', 'delay': 0.1} for i in range(6)}
+        with StubServer(routes) as server:
+            sources = [Source(str(i), server.url(f'/{i}.csv'), lambda path: None) for i in range(6)]
+            AsyncCollector(self.fetcher, per_host=2, max_workers=6).collect(sources)
+
+        self.assertEqual(server.max_active, 2)
+
+    def test_failure_does_not_stop_others(self):
+        with StubServer({'/ok.csv': {'body': b'a\n1\n'}}) as server:
+            sources = [Source('missing', server.url('/missing.csv'), lambda path: None),
+                       Source('ok', server.url('/ok.csv'), lambda path: {'rows': 1})]
+            collector = AsyncCollector(self.fetcher)
+            results = collector.collect(sources)
+
+        self.assertEqual([result['status'] for result in results], ['failed', 'ok'])
+        self.assertIn('HTTPError', results[0]['error'])
+        self.assertEqual(collector.progress.report()['failed'], 1)
+        self.assertEqual(collector.progress.report()['processed'], 1)
+
+    def test_rate_limit(self):
+        async def starts():
+            limiter = RateLimiter(20)
+            start = time.monotonic()
+            for _ in range(5):
+                await limiter.wait()
+            return time.monotonic() - start
+
+        self.assertGreaterEqual(asyncio.run(starts()), 0.19)
+
+    def test_invalid_limits(self):
+        with self.assertRaises(ValueError):
+            AsyncCollector(self.fetcher, per_host=0)
+        with self.assertRaises(ValueError):
+            RateLimiter(0)
+
+
+if __name__ == '__main__':
+    unittest.main()
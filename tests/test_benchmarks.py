@@ -0,0 +1,80 @@
+import os
+import tempfile
+import unittest
+import pandas as pd
+from benchmarks.fixtures import build_dataset, scaled_codes
+from benchmarks.harness import Stage, compare_results, measure, read_results, write_results
+from benchmarks.run_benchmarks import run_suite
+from Transform.join_data import TRANSFORMS
+
+
+class TestFixtures(unittest.TestCase):
+
+    def test_scaled_codes_distinct(self):
+        copies = scaled_codes([1001, 1003, 2], 3)
+
+        self.assertEqual(copies[0], {1001: 1001, 1003: 1003, 2: 2})
+        codes = [code for mapping in copies for code in mapping.values()]
+        self.assertEqual(len(set(codes)), 9)
+        self.assertTrue(all(0 < code < 100000 for code in codes))
+
+    def test_invalid_scale(self):
+        with self.assertRaises(ValueError):
+            scaled_codes([1001], 0)
+
+    def test_files_share_counties(self):
+        with tempfile.TemporaryDirectory() as directory:
+            paths = build_dataset(directory, scale=3, sample=5)
+
+            elections = pd.read_csv(paths['elections'])
+            self.assertEqual(len(elections), 15)
+            for table in ('income', 'AgeSexData', 'demographic_and_housing'):
+                census = pd.read_csv(paths[table], dtype=str)
+                self.assertEqual(set(census['GEO_ID'].iloc[1:].str[-5:].astype(int)), set(elections['FIPS']))
+            self.assertTrue(set(pd.read_csv(paths['FIPS'])['fips']) <= set(elections['FIPS']))
+
+
+class TestHarness(unittest.TestCase):
+
+    def test_measure(self):
+        record = measure(Stage('sum', lambda values: sum(values), setup=lambda: list(range(1000)), rows=1000),
+                         repeat=2)
+
+        self.assertEqual(record['stage'], 'sum')
+        self.assertEqual(record['repeat'], 2)
+        self.assertGreater(record['peak_mb'], 0)
+        self.assertAlmostEqual(record['rows_per_sec'], 1000 / record['seconds'])
+
+    def test_compare(self):
+        baseline = {'results': [{'stage': 'a', 'scale': 1, 'seconds': 2.0, 'peak_mb': 1.0}]}
+        current = {'results': [{'stage': 'a', 'scale': 1, 'seconds': 1.0, 'peak_mb': 1.0},
+                               {'stage': 'b', 'scale': 1, 'seconds': 1.0, 'peak_mb': 1.0}]}
+
+        rows = compare_results(baseline, current)
+
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['ratio'], 0.5)
+
+
+class TestSuite(unittest.TestCase):
+
+    def test_every_stage_recorded(self):
+        results = run_suite([1, 2], repeat=1, memory=False, sample=5, bulk_backend='generic')
+
+        stages = {record['stage'] for record in results['results']}
+        for stage in ('extract[elections]', 'read_in_df[income]', 'get_column_mappings[AgeSexData]',
+                      'convert_to_type_numeric[occ]', 'push_to_server[demographic_and_housing]', 'merge_frames',
+                      'push_down_join'):
+            self.assertIn(stage, stages)
+        self.assertTrue({f"transform[{name}]" for name in TRANSFORMS} <= stages)
+
+        merged = {record['scale']: record['rows'] for record in results['results'] if record['stage'] == 'merge_frames'}
+        self.assertEqual(merged[2], 2 * merged[1])
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = write_results(results, os.path.join(directory, 'results.json'))
+            self.assertEqual(read_results(path)['results'], results['results'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import os
+import unittest
+from unittest.mock import MagicMock
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine
+from Collect.bulk_load import (get_bulk_loader, LoadDataInfileLoader, MultiRowInsertLoader, PandasLoader)
+
+
+class TestBulkLoad(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = create_engine('sqlite://')
+        self.df = pd.DataFrame({
+            'FIPS': [1001, 1003, 1005],
+            'county': ['Autauga', 'Bald\\win', None],
+            'per_hs': [31.3, np.nan, 27.2],
+        })
+
+    def tearDown(self):
+        self.engine.dispose()
+
+    def test_backend_chosen_per_dialect(self):
+        mysql_engine = MagicMock()
+        mysql_engine.dialect.name = 'mysql'
+        other_engine = MagicMock()
+        other_engine.dialect.name = 'oracle'
+
+        self.assertIsInstance(get_bulk_loader(self.engine), MultiRowInsertLoader)
+        self.assertIsInstance(get_bulk_loader(mysql_engine), LoadDataInfileLoader)
+        self.assertIsInstance(get_bulk_loader(other_engine), PandasLoader)
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            get_bulk_loader(self.engine, 'copy')
+
+    def test_invalid_batch_size(self):
+        with self.assertRaises(ValueError):
+            get_bulk_loader(self.engine, batch_size=0)
+
+    def test_multi_row_load_reports_throughput(self):
+        stats = get_bulk_loader(self.engine, 'multi_row', batch_size=2).load(self.df, 'counties')
+
+        loaded = pd.read_sql('SELECT * FROM counties', self.engine)
+        pd.testing.assert_frame_equal(loaded, self.df, check_dtype=False)
+        self.assertEqual(stats['backend'], 'multi_row')
+        self.assertEqual(stats['rows'], 3)
+        self.assertGreater(stats['rows_per_sec'], 0)
+
+    def test_batch_size_capped_for_sqlite(self):
+        wide = pd.DataFrame(np.zeros((1, 1000)), columns=[f"c{i}" for i in range(1000)])
+        loader = MultiRowInsertLoader(self.engine, batch_size=10000)
+        self.assertEqual(loader.rows_per_statement(wide), MultiRowInsertLoader.SQLITE_MAX_VARIABLES // 1000)
+
+    def test_load_data_falls_back_to_inserts(self):
+        # SQLite has no LOAD DATA, so the loader has to fall back and still load every row
+        stats = LoadDataInfileLoader(self.engine).load(self.df, 'counties')
+
+        loaded = pd.read_sql('SELECT * FROM counties', self.engine)
+        self.assertEqual(len(loaded), 3)
+        self.assertEqual(stats['backend'], 'load_data')
+
+    def test_write_infile(self):
+        path = LoadDataInfileLoader.write_infile(self.df)
+        try:
+            with open(path, encoding='utf-8') as infile:
+                lines = infile.read().splitlines()
+        finally:
+            os.remove(path)
+
+        self.assertEqual(lines, ['1001,Autauga,31.3', '1003,Bald\\\\win,\\N', '1005,\\N,27.2'])
+
+
+if __name__ == '__main__':
+    unittest.main()
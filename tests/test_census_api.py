@@ -0,0 +1,67 @@
+import json
+import tempfile
+import unittest
+from unittest.mock import Mock
+import pandas as pd
+from Collect.Collect import CensusData, data_path
+from Collect.census_api import CensusAPICollector
+from Collect.http_fetch import HttpFetcher, build_session
+from http_stub import StubServer
+
+# responses recorded for S1901, three counties in each of two states, with batch_size=4
+with open(data_path('testing/census_api_S1901.json')) as fixture_file:
+    FIXTURE = json.load(fixture_file)
+
+
+class TestCensusAPICollector(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.routes = {f"/data{path}": {'body': json.dumps(body).encode(), 'content_type': 'application/json'}
+                       for recorded in (FIXTURE['groups'], FIXTURE['responses']) for path, body in recorded.items()}
+        self.server = StubServer(self.routes).__enter__()
+        fetcher = HttpFetcher(build_session(retries=0), cache_dir=self.tmp_dir.name)
+        self.collector = CensusAPICollector(2019, base_url=self.server.url('/data'), batch_size=4, fetcher=fetcher)
+
+    def tearDown(self):
+        self.server.__exit__()
+        self.collector.fetcher.session.close()
+        self.tmp_dir.cleanup()
+
+    def test_column_mappings_from_metadata(self):
+        mappings = self.collector.column_mappings('S1901')
+
+        self.assertEqual(mappings['Column Name'].tolist()[:3], ['GEO_ID', 'NAME', 'S1901_C01_001E'])
+        self.assertNotIn('S1901_C01_001EA', mappings['Column Name'].tolist())
+        exported = pd.read_csv(data_path('income_columnMappings.csv'))
+        pd.testing.assert_frame_equal(mappings, exported[exported['Column Name'].isin(mappings['Column Name'])]
+                                      .reset_index(drop=True))
+
+    def test_batches_within_limit(self):
+        batches = self.collector.batches(['GEO_ID', 'NAME'] + [f"V{i}" for i in range(7)])
+
+        self.assertEqual([len(batch) for batch in batches], [4, 4, 3])
+        self.assertTrue(all(batch[0] == 'GEO_ID' for batch in batches))
+
+    def test_table_matches_exported_csv(self):
+        api = self.collector.census_data('S1901', Mock(), states=['01', '02'])
+
+        exported = CensusData.load('income.csv', 'income_columnMappings.csv', Mock()).censusDF
+        expected = exported[exported['Geography'].isin(api.censusDF['Geography'])][api.censusDF.columns]
+        pd.testing.assert_frame_equal(api.censusDF.reset_index(drop=True).astype(str),
+                                      expected.reset_index(drop=True).astype(str))
+        self.assertEqual(len(api.censusDF), 6)
+        self.assertEqual(sum(api.sentinel_counts.values()), 12)
+
+    def test_requests_fan_out_per_state_and_batch(self):
+        self.collector.fetch_table('S1901', states=['01', '02'])
+        self.assertEqual(len(self.server.requests), 1 + 2 * 3)
+
+    def test_failed_request_raises(self):
+        del self.routes[next(path for path in self.routes if 'state%3A02' in path)]
+        with self.assertRaises(RuntimeError):
+            self.collector.fetch_table('S1901', states=['01', '02'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -11,7 +11,9 @@
 import unittest
 from unittest.mock import Mock, patch, mock_open
 import pandas as pd
-from Collect.Collect import CensusData
+from sqlalchemy import create_engine
+from Collect.Collect import CensusData, data_path
+from Transform.columns import source_columns
 
 
 class TestCensusData(unittest.TestCase):
@@ -67,6 +69,56 @@ class TestCensusData(unittest.TestCase):
         pass
 
 
+class TestCensusProjection(unittest.TestCase):
+
+    def test_projected_raw_columns(self):
+        raw_columns = CensusData.projected_raw_columns('income_columnMappings.csv', source_columns('income'))
+        self.assertEqual(raw_columns, ['GEO_ID', 'NAME', 'S1901_C01_012E', 'S1901_C01_012M',
+                                       'S1901_C01_013E', 'S1901_C01_013M'])
+
+    def test_projected_load_matches_full_load(self):
+        columns = source_columns('income')
+        full = CensusData.load('income.csv', 'income_columnMappings.csv', Mock())
+        projected = CensusData.load('income.csv', 'income_columnMappings.csv', Mock(), columns=columns)
+
+        expected_columns = [column for column in full.censusDF.columns
+                            if column in columns or column in ('Geography', 'Geographic_Area_Name')]
+        self.assertEqual(list(projected.censusDF.columns), expected_columns)
+        pd.testing.assert_frame_equal(projected.censusDF, full.censusDF[expected_columns])
+
+
+class TestCensusStreaming(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = create_engine('sqlite://')
+        self.columns = source_columns('income')
+
+    def test_streamed_table_matches_whole_load(self):
+        whole = CensusData.load('income.csv', 'income_columnMappings.csv', self.engine, columns=self.columns)
+        whole.push_to_server('income_whole')
+
+        stats = CensusData.stream('income.csv', 'income_columnMappings.csv', self.engine, 'income',
+                                  chunksize=1000, columns=self.columns)
+
+        self.assertEqual(stats['chunks'], 4)
+        self.assertEqual(stats['rows'], len(whole.censusDF))
+        self.assertEqual(stats['sentinel_counts'], whole.sentinel_counts)
+        pd.testing.assert_frame_equal(pd.read_sql('SELECT * FROM income', self.engine),
+                                      pd.read_sql('SELECT * FROM income_whole', self.engine), check_dtype=False)
+
+    def test_header_row_dropped_from_first_chunk_only(self):
+        CensusData.stream('income.csv', 'income_columnMappings.csv', self.engine, 'income', chunksize=500,
+                          columns=self.columns)
+
+        streamed = pd.read_sql('SELECT Geography FROM income', self.engine)['Geography']
+        raw = pd.read_csv(data_path('income.csv'), usecols=['GEO_ID'])['GEO_ID']
+        self.assertEqual(streamed.tolist(), raw.iloc[1:].tolist())
+
+    def test_invalid_chunksize(self):
+        with self.assertRaises(ValueError):
+            CensusData.stream('income.csv', 'income_columnMappings.csv', self.engine, 'income', chunksize=0)
+
+
 if __name__ == '__main__':
     unittest.main()
 
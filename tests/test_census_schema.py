@@ -0,0 +1,78 @@
+import unittest
+import pandas as pd
+from sqlalchemy import create_engine, inspect
+from Collect.Collect import CensusData, data_path
+from Collect.census_schema import build_schema, column_kind, convert_numeric, key_sql_dtypes
+
+
+class TestCensusSchema(unittest.TestCase):
+
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'Geography': ['0500000US01001', '0500000US01003', '0500000US01005'],
+            'EST_T': ['55200', '(X)', '24686'],
+            'EST_Median_age': ['38.2', '42.8', '-'],
+            'Percent_Male': ['48.6', '51', 'N'],
+            'MOE_T': ['**', '*****', '***'],
+            'EST_Aggregate': ['3000000000', '12', '7'],
+            'Ready': [1, 2, 3],
+        })
+        self.schema = {'Percent_Male': 'percent', 'MOE_T': 'margin'}
+
+    def test_column_kind(self):
+        self.assertEqual(column_kind('Geography'), 'key')
+        self.assertEqual(column_kind('Percent!!SEX AND AGE!!Total population'), 'percent')
+        self.assertEqual(column_kind('Margin of Error!!Households!!Total'), 'margin')
+        self.assertEqual(column_kind('Estimate!!Households!!Total'), 'estimate')
+
+    def test_build_schema_from_mappings(self):
+        mappings = pd.read_csv(data_path('demographic_and_housing_columnMappings.csv'))
+        schema = build_schema(mappings, CensusData.format_column_labels(mappings['Label']))
+
+        self.assertEqual(schema['Geography'], 'key')
+        self.assertEqual(set(schema.values()), {'key', 'name', 'percent', 'margin', 'estimate'})
+
+    def test_compact_dtypes(self):
+        df, _ = convert_numeric(self.df, self.schema, exclude=['Geography'])
+
+        self.assertEqual(str(df['EST_T'].dtype), 'Int32')
+        self.assertEqual(df['EST_Median_age'].dtype, 'float32')
+        self.assertEqual(df['Percent_Male'].dtype, 'float32')
+        self.assertEqual(str(df['EST_Aggregate'].dtype), 'int64')
+        self.assertEqual(df['Ready'].dtype, 'int64')
+        self.assertEqual(df['Geography'].tolist(), self.df['Geography'].tolist())
+        self.assertEqual(list(df.columns), list(self.df.columns))
+
+    def test_values_match_to_numeric(self):
+        df, _ = convert_numeric(self.df, self.schema, exclude=['Geography'])
+
+        for column in ['EST_T', 'EST_Median_age', 'Percent_Male', 'MOE_T', 'EST_Aggregate']:
+            expected = pd.to_numeric(self.df[column], errors='coerce').astype('float64')
+            pd.testing.assert_series_equal(df[column].astype('float64'), expected, check_exact=False, rtol=1e-6)
+
+    def test_sentinel_counts(self):
+        df = self.df.assign(Income=['250,000+', '1000', '(X)'])
+        _, counts = convert_numeric(df, self.schema, exclude=['Geography'])
+
+        self.assertEqual(counts, {'(X)': 2, '-': 1, 'N': 1, '*****': 1, '***': 1, '**': 1, 'other': 1})
+
+    def test_repeated_column_names_keep_their_position(self):
+        df = pd.DataFrame([['1', 'a', '2.5']], columns=['EST', 'Geography', 'EST'])
+        converted, _ = convert_numeric(df, exclude=['Geography'])
+
+        self.assertEqual(list(converted.columns), ['EST', 'Geography', 'EST'])
+        self.assertEqual(converted.iloc[0].tolist(), [1, 'a', 2.5])
+
+    def test_key_pushed_as_fixed_width_char(self):
+        engine = create_engine('sqlite://')
+        census_data = CensusData('income.csv', engine, census_df=convert_numeric(self.df, exclude=['Geography'])[0])
+
+        self.assertEqual(key_sql_dtypes(census_data.censusDF)['Geography'].length, 14)
+        census_data.push_to_server('income')
+
+        columns = {column['name']: column['type'] for column in inspect(engine).get_columns('income')}
+        self.assertEqual(str(columns['Geography']), 'CHAR(14)')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,7 +2,11 @@ import unittest
 from unittest.mock import patch, MagicMock, mock_open
 from io import StringIO
 import pandas as pd
+import tempfile
+import requests
 from Collect.Collect import CollectElectionAPI
+from Collect.http_fetch import HttpFetcher, build_session
+from http_stub import StubServer
 
 
 class TestCollectData(unittest.TestCase):
@@ -11,21 +15,31 @@ class TestCollectData(unittest.TestCase):
         self.url = 'https://datawrapper.dwcdn.net/UI9i0/2/dataset.csv'
         self.engine = MagicMock()  # Mocking the SQLAlchemy engine
         self.collect_data = CollectElectionAPI(self.engine, self.url)
+        self.tmp_dir = tempfile.TemporaryDirectory()
 
-    @patch('requests.get')
-    def test_extract_success(self, mock_get):
-        # Simulate a successful response from the URL
-        mock_get.return_value.ok = True
-        mock_get.return_value.text = 'col1,col2\nval1,val2'
-        self.collect_data.extract()
-        self.assertIsNotNone(self.collect_data.data)
+    def tearDown(self):
+        self.tmp_dir.cleanup()
 
-    @patch('requests.get')
-    def test_extract_failure(self, mock_get):
+    def stub_api(self, server, path):
+        fetcher = HttpFetcher(build_session(retries=1, backoff_factor=0), cache_dir=self.tmp_dir.name)
+        return CollectElectionAPI(self.engine, server.url(path), fetcher=fetcher)
+
+    def test_extract_success(self):
+        # Serve the dataset from a local stand-in for the remote host
+        with StubServer({'/dataset.csv': {'body': b'col1,col2\nval1,val2\n', 'etag': '"a"'}}) as server:
+            collect_data = self.stub_api(server, '/dataset.csv')
+            collect_data.extract()
+
+        self.assertIsNotNone(collect_data.data)
+        self.assertIsNotNone(collect_data.source_hash)
+        self.assertEqual(collect_data.get_df().to_dict('records'), [{'col1': 'val1', 'col2': 'val2'}])
+
+    def test_extract_failure(self):
         # Simulate a failed response from the URL
-        mock_get.side_effect = Exception("Failed to fetch data")
-        with self.assertRaises(Exception):
-            self.collect_data.extract()
+        with StubServer() as server:
+            collect_data = self.stub_api(server, '/dataset.csv')
+            with self.assertRaises(requests.exceptions.HTTPError):
+                collect_data.extract()
 
     @patch('pandas.read_csv')
     def test_get_df(self, mock_read_csv):
@@ -0,0 +1,131 @@
+import argparse
+import threading
+import unittest
+import pandas as pd
+from sqlalchemy import create_engine
+from Collect.manifest import LoadManifest
+from Transform.columns import TRANSFORM_MODULES
+from src.dag import DAG, Task, raise_for_failures
+from src.main import join_fingerprint, join_task
+
+
+class TestDAG(unittest.TestCase):
+
+    def setUp(self):
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def action(self, name, result=None):
+        def run():
+            with self.lock:
+                self.calls.append(name)
+            return result
+        return run
+
+    def test_dependencies_follow_inputs_and_outputs(self):
+        dag = DAG([
+            Task('final', self.action('final'), inputs=['a', 'b'], outputs=['final']),
+            Task('a', self.action('a'), inputs=['a.csv'], outputs=['a']),
+            Task('b', self.action('b'), inputs=['b.csv'], outputs=['b']),
+        ])
+
+        self.assertEqual(dag.dependencies['final'], {'a', 'b'})
+        self.assertEqual(list(dag.tasks)[-1], 'final')
+
+        results = dag.run()
+
+        self.assertEqual(self.calls[-1], 'final')
+        self.assertTrue(all(result['status'] == 'done' for result in results.values()))
+
+    def test_independent_tasks_run_concurrently(self):
+        barrier = threading.Barrier(3, timeout=5)
+        dag = DAG([Task(name, barrier.wait, outputs=[name]) for name in ('a', 'b', 'c')])
+
+        results = dag.run(max_workers=3)
+
+        self.assertEqual({result['status'] for result in results.values()}, {'done'})
+
+    def test_failure_blocks_downstream_only(self):
+        def fail():
+            raise ValueError('bad file')
+
+        dag = DAG([
+            Task('a', fail, outputs=['a']),
+            Task('b', self.action('b'), outputs=['b']),
+            Task('final', self.action('final'), inputs=['a', 'b'], outputs=['final']),
+        ])
+
+        results = dag.run()
+
+        self.assertEqual({name: result['status'] for name, result in results.items()},
+                         {'a': 'failed', 'b': 'done', 'final': 'blocked'})
+        self.assertIn('bad file', results['a']['error'])
+        self.assertEqual(self.calls, ['b'])
+        with self.assertRaises(RuntimeError):
+            raise_for_failures(results)
+
+    def test_select_targets_by_task_or_table(self):
+        dag = DAG([
+            Task('income', self.action('income'), outputs=['income']),
+            Task('occ', self.action('occ'), outputs=['occ']),
+            Task('join', self.action('join'), inputs=['income', 'occ'], outputs=['POL_FINAL']),
+        ])
+
+        self.assertEqual(dag.select(['POL_FINAL', 'income']), ['income', 'join'])
+        self.assertEqual(dag.select(['POL_FINAL'], with_upstream=True), ['income', 'occ', 'join'])
+
+        results = dag.run(['income', 'POL_FINAL'])
+
+        self.assertEqual(list(results), ['income', 'join'])
+        self.assertEqual(self.calls, ['income', 'join'])
+        with self.assertRaises(ValueError):
+            dag.select(['missing'])
+
+    def test_skipped_tasks(self):
+        dag = DAG([
+            Task('a', self.action('a', {'table': 'a', 'rows': 0, 'skipped': True}), outputs=['a']),
+            Task('b', self.action('b'), inputs=['a'], outputs=['b'], is_current=lambda: True),
+        ])
+
+        results = dag.run()
+
+        self.assertEqual([result['status'] for result in results.values()], ['skipped', 'skipped'])
+        self.assertEqual(self.calls, ['a'])
+
+    def test_invalid_graphs(self):
+        with self.assertRaises(ValueError):
+            DAG([Task('a', self.action('a'), inputs=['b'], outputs=['a']),
+                 Task('b', self.action('b'), inputs=['a'], outputs=['b'])])
+        with self.assertRaises(ValueError):
+            DAG([Task('a', self.action('a'), outputs=['t']), Task('b', self.action('b'), outputs=['t'])])
+
+
+class TestJoinTask(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = create_engine('sqlite://')
+        self.manifest = LoadManifest(self.engine)
+        self.args = argparse.Namespace(pushdown=False, concurrent=False, workers=1, force=False)
+        for module in TRANSFORM_MODULES:
+            self.manifest.record(module.TABLE, {'source_hash': module.TABLE, 'mapping_hash': None,
+                                                'options_hash': 'x'}, 1)
+
+    def tearDown(self):
+        self.engine.dispose()
+
+    def test_join_skipped_until_a_source_changes(self):
+        task = join_task(self.engine, self.manifest, self.args)
+        self.assertEqual(task.inputs, [module.TABLE for module in TRANSFORM_MODULES])
+        self.assertFalse(task.is_current())
+
+        fingerprint = join_fingerprint(self.manifest, self.args)
+        self.manifest.record('POL_FINAL', fingerprint, 1)
+        pd.DataFrame({'a': [1]}).to_sql('POL_FINAL', self.engine, index=False)
+        self.assertTrue(task.is_current())
+
+        self.manifest.record('income', {'source_hash': 'changed', 'mapping_hash': None, 'options_hash': 'x'}, 1)
+        self.assertFalse(task.is_current())
+
+
+if __name__ == '__main__':
+    unittest.main()
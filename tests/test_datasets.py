@@ -0,0 +1,51 @@
+import os
+import pickle
+import tempfile
+import unittest
+import pandas as pd
+from Collect.Collect import CensusData, data_path
+from Collect.datasets import CENSUS_DATASETS, Dataset, parse_all, parse_census
+from Collect.frame_cache import FrameCache
+
+
+class TestDatasets(unittest.TestCase):
+
+    def test_registry_entries(self):
+        self.assertEqual(set(CENSUS_DATASETS), {'AgeSexData', 'demographic_and_housing', 'occ', 'income'})
+        self.assertFalse(CENSUS_DATASETS['AgeSexData'].drop_duplicates)
+        for table, dataset in CENSUS_DATASETS.items():
+            self.assertEqual(dataset.table, table)
+            self.assertTrue(dataset.api_group and dataset.api_dataset)
+
+    def test_parse_census_matches_load(self):
+        dataset = CENSUS_DATASETS['income']
+
+        census_data = parse_census(dataset)
+
+        expected = CensusData.load(dataset.source, dataset.column_mappings, None)
+        self.assertIsNone(census_data.engine)
+        self.assertEqual(census_data.mapping_path, data_path(dataset.column_mappings))
+        pd.testing.assert_frame_equal(census_data.censusDF, expected.censusDF)
+
+    def test_parse_all_in_worker_processes(self):
+        datasets = [CENSUS_DATASETS['income'], Dataset('occ_copy', 'occ.csv', 'occ_columnMappings.csv')]
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = FrameCache(cache_dir)
+            parsed = parse_all(datasets, max_workers=2, cache=cache)
+
+            self.assertEqual(list(parsed), ['income', 'occ_copy'])
+            self.assertEqual(len(parsed['occ_copy'].censusDF), 3221)
+            pd.testing.assert_frame_equal(parsed['income'].censusDF, parse_census(datasets[0]).censusDF)
+            self.assertEqual(len(os.listdir(cache_dir)), 2)
+
+    def test_frame_cache_pickles(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = pickle.loads(pickle.dumps(FrameCache(cache_dir, max_bytes=1024)))
+
+            self.assertEqual((cache.directory, cache.max_bytes), (cache_dir, 1024))
+            cache.evict()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,8 @@
+import os
+import tempfile
 import unittest
 from unittest.mock import patch, MagicMock
+from sqlalchemy import event, text
 from database_conn.db_conn import DataBaseConnector
 
 
@@ -7,6 +10,7 @@ class TestDataBaseConnector(unittest.TestCase):
 
     def setUp(self):
         # Setup for each test
+        DataBaseConnector.dispose_engines()
         self.db_connector = DataBaseConnector()
 
     @patch('database_conn.db_conn.pymysql.connect')
@@ -41,9 +45,91 @@ class TestDataBaseConnector(unittest.TestCase):
             self.assertTrue(hasattr(connector, 'get_cur'))
         mock_connect.assert_called_once()
 
+    @patch('database_conn.db_conn.create_engine')
+    def test_get_engine_is_shared(self, mock_create_engine):
+        # Test that every connector instance reuses the same engine
+        mock_create_engine.return_value = MagicMock()
+        first = self.db_connector.get_engine()
+        second = DataBaseConnector().get_engine()
+        mock_create_engine.assert_called_once()
+        self.assertIs(first, second)
+
+    @patch('database_conn.db_conn.create_engine')
+    def test_get_engine_pool_options(self, mock_create_engine):
+        # Test that different pool settings get their own engine
+        mock_create_engine.side_effect = lambda *args, **kwargs: MagicMock()
+        default_engine = self.db_connector.get_engine()
+        small_engine = self.db_connector.get_engine(pool_size=1)
+        self.assertIsNot(default_engine, small_engine)
+        self.assertEqual(mock_create_engine.call_args.kwargs['pool_size'], 1)
+
+    @patch.dict(os.environ, {'POOL_SIZE': '2', 'POOL_PRE_PING': 'false', 'POOL_IDLE_TIMEOUT': '-1'})
+    def test_load_pool_settings(self):
+        # Test the POOL_* environment overrides
+        settings = DataBaseConnector.load_pool_settings()
+        self.assertEqual(settings['pool_size'], 2)
+        self.assertFalse(settings['pool_pre_ping'])
+        self.assertEqual(settings['idle_timeout'], -1)
+
+    @patch.dict(os.environ, {'POOL_SIZE': 'many'})
+    def test_load_pool_settings_invalid(self):
+        with self.assertRaises(EnvironmentError):
+            DataBaseConnector.load_pool_settings()
+
+    def test_idle_connections_evicted(self):
+        # Test that a pooled connection idle past the timeout is replaced on checkout
+        settings = {**DataBaseConnector.DEFAULT_POOL_SETTINGS, 'idle_timeout': 0, 'pool_pre_ping': False}
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            engine = DataBaseConnector._create_engine(f"sqlite:///{os.path.join(tmp_dir, 'pool.db')}", settings)
+            connects = []
+            event.listen(engine, 'connect', lambda *args: connects.append(1))
+
+            with engine.connect() as conn:
+                conn.execute(text('SELECT 1'))
+            with engine.connect() as conn:
+                conn.execute(text('SELECT 1'))
+
+            engine.dispose()
+        self.assertEqual(len(connects), 2)
+
+    @patch.dict(os.environ, {'DB_BACKEND': 'sqlite'})
+    def test_embedded_sqlite(self):
+        # Test that the embedded backend needs no server settings and loads in parallel
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for var in DataBaseConnector.MYSQL_VARS:
+                os.environ.pop(var, None)
+            os.environ['DB_PATH'] = os.path.join(tmp_dir, 'local', 'pipeline.sqlite')
+            connector = DataBaseConnector()
+            engine = connector.get_engine()
+
+            self.assertTrue(connector.embedded)
+            self.assertEqual(engine.dialect.name, 'sqlite')
+            self.assertIsNone(connector.get_conn())
+
+            with engine.begin() as conn:
+                conn.execute(text('CREATE TABLE t (x INTEGER)'))
+            with engine.connect() as reader, engine.begin() as writer:
+                reader.execute(text('SELECT * FROM t')).fetchall()
+                reader.commit()
+                writer.execute(text('INSERT INTO t VALUES (1)'))
+            with engine.connect() as conn:
+                self.assertEqual(conn.execute(text('SELECT COUNT(*) FROM t')).scalar(), 1)
+            DataBaseConnector.dispose_engines()
+
+    @patch.dict(os.environ, {'DB_BACKEND': 'duckdb'})
+    def test_embedded_default_path(self):
+        env_vars = DataBaseConnector.load_env_vars()
+        self.assertEqual(env_vars['DB_BACKEND'], 'duckdb')
+        self.assertTrue(env_vars['DB_PATH'].endswith(os.path.join('data', 'election_pipeline.duckdb')))
+
+    @patch.dict(os.environ, {'DB_BACKEND': 'oracle'})
+    def test_unknown_backend(self):
+        with self.assertRaises(EnvironmentError):
+            DataBaseConnector.load_env_vars()
+
     def tearDown(self):
         # Cleanup after each test
-        pass
+        DataBaseConnector.dispose_engines()
 
 
 if __name__ == '__main__':
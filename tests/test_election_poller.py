@@ -0,0 +1,104 @@
+import tempfile
+import unittest
+from threading import Event
+import pandas as pd
+from sqlalchemy import create_engine
+from Collect.election_poller import ElectionPoller, diff_frames
+from Collect.http_fetch import HttpFetcher, build_session
+from Collect.manifest import LoadManifest
+from http_stub import StubServer
+
+FEED = (
+    'FIPS,Code,Population,2020W,2020D\n'
+    '1001,AL,55869,REP,27.0\n'
+    '1003,AL,223234,REP,22.4\n'
+    '1005,AL,24686,REP,\n'
+)
+
+
+class TestDiffFrames(unittest.TestCase):
+
+    def test_changed_added_and_deleted_rows(self):
+        previous = pd.DataFrame({'FIPS': [1, 2, 3], 'votes': [10, None, 30]})
+        current = pd.DataFrame({'FIPS': [1, 2, 4], 'votes': [11, None, 40]})
+
+        upserts, deleted, added = diff_frames(previous, current, 'FIPS')
+
+        self.assertEqual(upserts['FIPS'].tolist(), [1, 4])
+        self.assertEqual(deleted, [3])
+        self.assertEqual(added, 1)
+
+    def test_repeated_key_rejected(self):
+        frame = pd.DataFrame({'FIPS': [1, 1], 'votes': [1, 2]})
+        with self.assertRaises(ValueError):
+            diff_frames(frame, frame, 'FIPS')
+
+
+class TestElectionPoller(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.routes = {'/dataset.csv': {'body': FEED.encode(), 'etag': '"1"'}}
+        self.server = StubServer(self.routes).__enter__()
+        self.engine = create_engine('sqlite://')
+        fetcher = HttpFetcher(build_session(retries=0), cache_dir=self.tmp_dir.name)
+        self.poller = ElectionPoller(self.engine, self.server.url('/dataset.csv'), interval=0.01, fetcher=fetcher)
+
+    def tearDown(self):
+        self.server.__exit__()
+        self.tmp_dir.cleanup()
+
+    def publish(self, feed, etag):
+        self.routes['/dataset.csv'].update(body=feed.encode(), etag=etag)
+
+    def table(self):
+        return pd.read_sql('SELECT * FROM elections ORDER BY FIPS', self.engine)
+
+    def test_first_poll_loads_whole_feed(self):
+        metrics = self.poller.poll()
+
+        self.assertEqual(metrics['mode'], 'full')
+        self.assertEqual(metrics['inserted'], 3)
+        self.assertEqual(len(self.table()), 3)
+
+    def test_unchanged_feed_writes_nothing(self):
+        self.poller.poll()
+        metrics = self.poller.poll()
+
+        self.assertEqual(metrics['mode'], 'not_modified')
+        self.assertEqual(metrics['rows'], 3)
+
+    def test_delta_upserts_changed_rows(self):
+        self.poller.poll()
+        self.publish(FEED.replace('1003,AL,223234,REP,22.4', '1003,AL,223234,REP,23.1')
+                     .replace('1005,AL,24686,REP,\n', '1007,AL,22394,REP,20.6\n'), '"2"')
+
+        metrics = self.poller.poll()
+
+        self.assertEqual((metrics['mode'], metrics['inserted'], metrics['updated'], metrics['deleted']),
+                         ('delta', 1, 1, 1))
+        table = self.table()
+        self.assertEqual(table['FIPS'].tolist(), [1001, 1003, 1007])
+        self.assertEqual(table['2020D'].tolist(), [27.0, 23.1, 20.6])
+
+    def test_manifest_recorded(self):
+        manifest = LoadManifest(self.engine)
+        self.poller.manifest = manifest
+        self.poller.poll()
+
+        self.assertTrue(manifest.is_current('elections', self.poller.api.fingerprint()))
+
+    def test_run_survives_failed_polls(self):
+        self.routes.clear()
+        self.poller.run(max_polls=2, stop=Event())
+
+        self.assertEqual(self.poller.polls, 2)
+        self.assertEqual(len(self.poller.metrics), 0)
+
+    def test_invalid_interval(self):
+        with self.assertRaises(ValueError):
+            ElectionPoller(self.engine, interval=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
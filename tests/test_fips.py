@@ -0,0 +1,52 @@
+import unittest
+from unittest.mock import patch
+import pandas as pd
+from sqlalchemy import create_engine, inspect
+from Collect.Collect import CreateFromCSV
+from Collect.fips import parse_fips, with_fips
+
+
+class TestFips(unittest.TestCase):
+
+    def test_parse_fips_forms(self):
+        values = pd.Series(['0500000US01001', '01003', ' 1005 ', '1007.0', '0100000US', 'Geography', None])
+
+        parsed = parse_fips(values)
+
+        self.assertEqual(str(parsed.dtype), 'Int64')
+        self.assertEqual(parsed.tolist()[:4], [1001, 1003, 1005, 1007])
+        self.assertTrue(parsed.iloc[4:].isna().all())
+
+    def test_derived_from_geography(self):
+        df = pd.DataFrame({'Geography': ['0500000US01001', '0500000US56045'], 'value': [1, 2]})
+
+        keyed, key = with_fips(df)
+
+        self.assertEqual(key, 'FIPS')
+        self.assertEqual(list(keyed.columns), ['FIPS', 'Geography', 'value'])
+        self.assertEqual(keyed['FIPS'].tolist(), [1001, 56045])
+        self.assertNotIn('FIPS', df.columns)
+
+    def test_existing_column_kept(self):
+        keyed, key = with_fips(pd.DataFrame({'fips': ['01001', '1003'], 'county': ['A', 'B']}))
+        self.assertEqual(key, 'fips')
+        self.assertEqual(keyed['fips'].tolist(), [1001, 1003])
+
+        self.assertEqual(with_fips(pd.DataFrame({'county': ['A']}))[1], None)
+
+    def test_load_indexes_fips(self):
+        engine = create_engine('sqlite://')
+        df = pd.DataFrame({'fips': ['01001', '01003'], 'county': ['A', 'B']})
+        with patch.object(CreateFromCSV, 'read_in_df', return_value=df):
+            create_from_csv = CreateFromCSV('FIPS.csv', engine)
+
+        create_from_csv.push_to_server('FIPS', bulk_backend='generic')
+
+        indexes = inspect(engine).get_indexes('FIPS')
+        self.assertEqual([index['column_names'] for index in indexes], [['fips']])
+        self.assertEqual(pd.read_sql('SELECT fips FROM FIPS', engine)['fips'].tolist(), [1001, 1003])
+        engine.dispose()
+
+
+if __name__ == '__main__':
+    unittest.main()
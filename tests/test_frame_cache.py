@@ -0,0 +1,97 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch, MagicMock
+import pandas as pd
+from Collect.Collect import CensusData
+from Collect.frame_cache import FrameCache, HAS_PYARROW
+
+CENSUS_CSV = (
+    'GEO_ID,NAME,S1901_C01_012E,S1901_C01_012M\n'
+    'Geography,Geographic Area Name,Estimate!!Households!!Median income (dollars),'
+    'Margin of Error!!Households!!Median income (dollars)\n'
+    '0500000US01001,"Autauga County, Alabama",58731,2283\n'
+    '0500000US01003,"Baldwin County, Alabama",58320,1442\n'
+)
+MAPPINGS_CSV = (
+    '"Column Name","Label"\n'
+    '"GEO_ID","Geography"\n'
+    '"NAME","Geographic Area Name"\n'
+    '"S1901_C01_012E","Estimate!!Households!!Median income (dollars)"\n'
+    '"S1901_C01_012M","Margin of Error!!Households!!Median income (dollars)"\n'
+)
+
+
+@unittest.skipUnless(HAS_PYARROW, "pyarrow is required for the frame cache")
+class TestFrameCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache = FrameCache(os.path.join(self.tmp_dir.name, 'frames'))
+        self.census_path = self.write('income.csv', CENSUS_CSV)
+        self.mappings_path = self.write('income_columnMappings.csv', MAPPINGS_CSV)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write(self, name, content):
+        path = os.path.join(self.tmp_dir.name, name)
+        with open(path, 'w') as file:
+            file.write(content)
+        return path
+
+    def test_round_trip_and_counters(self):
+        df = pd.DataFrame({'FIPS': [1001, 1003], 'county': ['Autauga', 'Baldwin']}, index=[1, 2])
+        key = FrameCache.key('income', 1)
+
+        self.assertIsNone(self.cache.get(key))
+        self.assertTrue(self.cache.put(key, df))
+        pd.testing.assert_frame_equal(self.cache.get(key), df, check_dtype=False)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_duplicate_columns_not_cached(self):
+        df = pd.DataFrame([[1, 2]], columns=['a', 'a'])
+        self.assertFalse(self.cache.put(FrameCache.key('dup'), df))
+
+    def test_least_recently_used_evicted(self):
+        df = pd.DataFrame({'value': range(1000)})
+        self.cache.put('first', df)
+        self.cache.put('second', df)
+        entry_size = os.path.getsize(self.cache.path('first'))
+
+        # read the first entry so the second becomes the least recently used
+        time.sleep(0.01)
+        self.cache.get('first')
+        self.cache.max_bytes = entry_size * 2
+        self.cache.put('third', df)
+
+        self.assertTrue(os.path.exists(self.cache.path('first')))
+        self.assertFalse(os.path.exists(self.cache.path('second')))
+        self.assertTrue(os.path.exists(self.cache.path('third')))
+
+    def test_census_load_hit_skips_parsing(self):
+        engine = MagicMock()
+        first = CensusData.load(self.census_path, self.mappings_path, engine, cache=self.cache)
+
+        with patch('pandas.read_csv') as mock_read_csv:
+            second = CensusData.load(self.census_path, self.mappings_path, engine, cache=self.cache)
+            mock_read_csv.assert_not_called()
+
+        pd.testing.assert_frame_equal(first.censusDF, second.censusDF, check_dtype=False)
+        self.assertIn('EST_HH_Median_income_(dollars)', second.censusDF.columns)
+        self.assertEqual(self.cache.hits, 1)
+
+    def test_census_load_misses_when_mappings_change(self):
+        engine = MagicMock()
+        CensusData.load(self.census_path, self.mappings_path, engine, cache=self.cache)
+        self.write('income_columnMappings.csv', MAPPINGS_CSV.replace('Median', 'Middle'))
+
+        reloaded = CensusData.load(self.census_path, self.mappings_path, engine, cache=self.cache)
+
+        self.assertIn('EST_HH_Middle_income_(dollars)', reloaded.censusDF.columns)
+        self.assertEqual(self.cache.hits, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
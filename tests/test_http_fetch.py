@@ -0,0 +1,87 @@
+import os
+import tempfile
+import unittest
+import requests
+from Collect.http_fetch import HttpFetcher, build_session, get_session, close_sessions
+from Collect.manifest import bytes_hash
+from http_stub import StubServer
+
+BODY = b'fips,county\n1001,Autauga\n1003,Baldwin\n'
+
+
+class TestHttpFetcher(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.routes = {'/dataset.csv': {'body': BODY, 'etag': '"v1"', 'last_modified': 'Tue, 03 Nov 2020 00:00:00 GMT'}}
+        self.server = StubServer(self.routes).__enter__()
+        self.fetcher = HttpFetcher(build_session(retries=2, backoff_factor=0), cache_dir=self.tmp_dir.name)
+
+    def tearDown(self):
+        self.server.__exit__()
+        self.fetcher.session.close()
+        self.tmp_dir.cleanup()
+
+    def test_download_streamed_to_cache(self):
+        result = self.fetcher.fetch(self.server.url('/dataset.csv'))
+
+        self.assertFalse(result['from_cache'])
+        self.assertEqual(result['sha256'], bytes_hash(BODY))
+        with open(result['path'], 'rb') as file:
+            self.assertEqual(file.read(), BODY)
+
+    def test_revalidation_reuses_cached_body(self):
+        url = self.server.url('/dataset.csv')
+        first = self.fetcher.fetch(url)
+        second = self.fetcher.fetch(url)
+
+        self.assertTrue(second['from_cache'])
+        self.assertEqual(second['status'], 304)
+        self.assertEqual(second['sha256'], first['sha256'])
+        headers = self.server.requests[-1][1]
+        self.assertEqual(headers['If-None-Match'], '"v1"')
+        self.assertEqual(headers['If-Modified-Since'], 'Tue, 03 Nov 2020 00:00:00 GMT')
+
+    def test_changed_resource_downloaded_again(self):
+        url = self.server.url('/dataset.csv')
+        self.fetcher.fetch(url)
+        self.routes['/dataset.csv'].update(body=BODY + b'1005,Barbour\n', etag='"v2"')
+
+        result = self.fetcher.fetch(url)
+
+        self.assertFalse(result['from_cache'])
+        self.assertEqual(result['etag'], '"v2"')
+        self.assertEqual(os.path.getsize(result['path']), len(BODY) + 13)
+
+    def test_force_skips_revalidation(self):
+        url = self.server.url('/dataset.csv')
+        self.fetcher.fetch(url)
+        result = self.fetcher.fetch(url, force=True)
+
+        self.assertFalse(result['from_cache'])
+        self.assertNotIn('If-None-Match', self.server.requests[-1][1])
+
+    def test_server_errors_retried(self):
+        self.routes['/dataset.csv']['failures'] = 2
+        result = self.fetcher.fetch(self.server.url('/dataset.csv'))
+
+        self.assertEqual(result['status'], 200)
+        self.assertEqual(len(self.server.requests), 3)
+
+    def test_retries_exhausted(self):
+        self.routes['/dataset.csv']['failures'] = 5
+        with self.assertRaises(requests.exceptions.HTTPError):
+            self.fetcher.fetch(self.server.url('/dataset.csv'))
+
+    def test_missing_resource(self):
+        with self.assertRaises(requests.exceptions.HTTPError):
+            self.fetcher.fetch(self.server.url('/missing.csv'))
+
+    def test_shared_session(self):
+        self.assertIs(get_session(retries=1), get_session(retries=1))
+        self.assertIsNot(get_session(retries=1), get_session(retries=2))
+        close_sessions()
+
+
+if __name__ == '__main__':
+    unittest.main()
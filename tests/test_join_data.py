@@ -0,0 +1,95 @@
+import threading
+import unittest
+from unittest.mock import patch, MagicMock
+import pandas as pd
+from Transform import join_data as join_module
+
+
+def make_frames():
+    return {
+        'election': pd.DataFrame({'FIPS': [1001, 1003], 'Code': ['A', 'B'], '2016_winner': ['REP', 'DEM']}),
+        'fips': pd.DataFrame({'fips': [1001, 1003], 'county': ['Autauga', 'Baldwin'], 'state_abbr': ['AL', 'AL']}),
+        'econ': pd.DataFrame({'fips': [1001, 1003], 'per_hs': [31.3, 27.2]}),
+        'dem_house': pd.DataFrame({'FIPS': [1001, 1003], 'EST_RACE_T_POP_One_race_White': [1, 2]}),
+        'age_sex': pd.DataFrame({'FIPS': [1001, 1003], 'EST_Percent_T_POP_AGE_85_YO': [1.5, 2.5]}),
+        'income': pd.DataFrame({'FIPS': [1003, 1001], 'EST_HH_Median_income_(dollars)': [56813, 58731]}),
+        'ooc': pd.DataFrame({'FIPS': [1001, 1003], 'EST_T_CE_POP_16_YO': [24719, 95581]}),
+    }
+
+
+def stub_transforms(barrier=None):
+    frames = make_frames()
+
+    def stub(name):
+        def transform(engine):
+            if barrier is not None:
+                barrier.wait(timeout=5)
+            return frames[name].copy()
+        return transform
+
+    return {name: stub(name) for name in frames}
+
+
+class TestJoinData(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = MagicMock()
+
+    def test_concurrent_matches_sequential(self):
+        with patch.dict(join_module.TRANSFORMS, stub_transforms()):
+            sequential = join_module.join_data(self.engine)
+            concurrent = join_module.join_data(self.engine, concurrent=True, max_workers=3)
+
+        pd.testing.assert_frame_equal(sequential, concurrent)
+        self.assertEqual(sequential.shape, (2, 12))
+
+    def test_concurrent_reads_overlap(self):
+        # Every read waits on the barrier, so this only finishes if all seven are in flight at once
+        barrier = threading.Barrier(len(join_module.TRANSFORMS))
+        with patch.dict(join_module.TRANSFORMS, stub_transforms(barrier)):
+            frames = join_module.extract_frames(self.engine, concurrent=True, max_workers=len(join_module.TRANSFORMS))
+
+        self.assertEqual(list(frames), list(join_module.TRANSFORMS))
+
+    def test_merge_matches_chained_merges(self):
+        frames = make_frames()
+
+        merged = join_module.merge_frames(frames)
+
+        expected = frames['election']
+        for name, key in join_module.JOIN_PLAN:
+            expected = expected.merge(frames[name], how='left', left_on='FIPS', right_on=key)
+        pd.testing.assert_frame_equal(merged, expected)
+
+    def test_repeated_rows_do_not_add_rows(self):
+        frames = make_frames()
+        frames['fips'] = pd.concat([frames['fips'], frames['fips'].iloc[[0]]], ignore_index=True)
+
+        merged = join_module.merge_frames(frames)
+
+        self.assertEqual(len(merged), len(frames['election']))
+        self.assertEqual(merged['county'].tolist(), ['Autauga', 'Baldwin'])
+
+    def test_missing_key_left_empty(self):
+        frames = make_frames()
+        frames['ooc'] = frames['ooc'].iloc[[1]]
+
+        merged = join_module.merge_frames(frames)
+
+        self.assertTrue(pd.isna(merged['EST_T_CE_POP_16_YO'].iloc[0]))
+        self.assertEqual(merged['EST_T_CE_POP_16_YO'].iloc[1], 95581)
+
+    def test_conflicting_rows_raise(self):
+        frames = make_frames()
+        frames['econ'] = pd.DataFrame({'fips': [1001, 1001, 1003], 'per_hs': [31.3, 30.0, 27.2]})
+
+        with self.assertRaises(ValueError):
+            join_module.merge_frames(frames)
+
+    def test_invalid_worker_count(self):
+        with self.assertRaises(ValueError):
+            join_module.extract_frames(self.engine, concurrent=True, max_workers=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+from unittest.mock import patch
+import pandas as pd
+from sqlalchemy import create_engine, inspect
+from Collect.Collect import CreateFromCSV
+from Collect.keys import KeySpec, create_keys, infer_keys
+
+
+def indexes(engine, table):
+    return {index['name']: (index['column_names'], bool(index['unique']))
+            for index in inspect(engine).get_indexes(table)}
+
+
+class TestKeys(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = create_engine('sqlite://')
+
+    def tearDown(self):
+        self.engine.dispose()
+
+    def load(self, df, table, **push_options):
+        with patch.object(CreateFromCSV, 'read_in_df', return_value=df):
+            create_from_csv = CreateFromCSV(f'{table}.csv', self.engine)
+        return create_from_csv.push_to_server(table, bulk_backend='generic', **push_options)
+
+    def test_infer_keys(self):
+        columns = ['FIPS', 'county', 'state_abbr']
+
+        self.assertEqual(infer_keys(columns, 'FIPS', pd.Series([1001, 1003])),
+                         KeySpec(['FIPS'], [['state_abbr']]))
+        self.assertEqual(infer_keys(columns, 'FIPS', pd.Series([11001, 11001])),
+                         KeySpec(None, [['FIPS'], ['state_abbr']]))
+        self.assertEqual(infer_keys(columns, 'FIPS'), KeySpec(None, [['FIPS'], ['state_abbr']]))
+        self.assertEqual(infer_keys(['county'], None), KeySpec())
+
+    def test_primary_key_and_secondary_index_after_load(self):
+        df = pd.DataFrame({'fips': [1001, 1003], 'county': ['A', 'B'], 'state_abbr': ['AL', 'AL']})
+
+        stats = self.load(df, 'FIPS')
+
+        self.assertEqual(stats['keys'], ['pk_FIPS_fips', 'ix_FIPS_state_abbr'])
+        self.assertEqual(indexes(self.engine, 'FIPS'), {'pk_FIPS_fips': (['fips'], True),
+                                                        'ix_FIPS_state_abbr': (['state_abbr'], False)})
+
+    def test_duplicate_fips_only_indexed(self):
+        self.load(pd.DataFrame({'fips': [11001, 11001], 'county': ['A', 'B']}), 'FIPS')
+
+        self.assertEqual(indexes(self.engine, 'FIPS'), {'ix_FIPS_fips': (['fips'], False)})
+
+    def test_explicit_keys(self):
+        df = pd.DataFrame({'fips': [1001, 1003], 'county': ['A', 'B']})
+
+        self.load(df, 'FIPS', keys=KeySpec(indexes=[['county', 'fips']]))
+
+        self.assertEqual(indexes(self.engine, 'FIPS'), {'ix_FIPS_county_fips': (['county', 'fips'], False)})
+
+    def test_chunked_load_checks_every_chunk(self):
+        create_from_csv = CreateFromCSV.__new__(CreateFromCSV)
+        create_from_csv.engine = self.engine
+        chunks = [pd.DataFrame({'FIPS': [1001, 1003]}), pd.DataFrame({'FIPS': [1001]})]
+
+        stats = create_from_csv.load_chunks(iter(chunks), 'elections', bulk_backend='generic')
+
+        self.assertEqual(stats['keys'], ['ix_elections_FIPS'])
+
+    def test_create_keys_without_columns(self):
+        self.assertEqual(create_keys(self.engine, 'missing', KeySpec()), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
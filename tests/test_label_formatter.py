@@ -0,0 +1,75 @@
+import glob
+import os
+import random
+import unittest
+import pandas as pd
+from Collect.Collect import CensusData
+from Collect.label_formatter import LabelFormatter, compile_replacements
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+
+
+def chained_replace(label, replacements):
+    # the original format_column_names semantics
+    for old, new in replacements:
+        label = label.replace(old, new)
+    return label
+
+
+class TestLabelFormatter(unittest.TestCase):
+
+    def setUp(self):
+        self.replacements = CensusData.COLUMN_NAME_REPLACEMENTS
+
+    def test_every_mapping_label_matches_chained_replace(self):
+        mapping_files = glob.glob(os.path.join(DATA_DIR, '*_columnMappings.csv'))
+        self.assertTrue(mapping_files)
+
+        for mapping_file in mapping_files:
+            labels = pd.read_csv(mapping_file)['Label']
+            expected = [chained_replace(label, self.replacements) for label in labels]
+
+            self.assertEqual(CensusData.format_column_labels(labels).tolist(), expected, mapping_file)
+            self.assertEqual([CensusData.format_column_names(label) for label in labels], expected, mapping_file)
+
+    def test_random_labels_match_chained_replace(self):
+        # labels stitched from pattern fragments hit the rule interactions the data files may not
+        rng = random.Random(2020)
+        fragments = [part for pair in self.replacements for part in pair] + ['!', '_', ' ', 'a', 'T']
+        labels = [''.join(rng.choice(fragments) for _ in range(rng.randint(1, 8))) for _ in range(2000)]
+
+        formatter = LabelFormatter(self.replacements)
+        expected = [chained_replace(label, self.replacements) for label in labels]
+
+        self.assertEqual(formatter.format_series(pd.Series(labels)).tolist(), expected)
+        self.assertEqual([formatter.format(label) for label in labels], expected)
+
+    def test_dead_rules_dropped(self):
+        # 'Estimate' is always gone by the time 'Estimate_Percent' would run
+        rules = compile_replacements(self.replacements)
+        self.assertNotIn(('Estimate_Percent', 'EPER'), rules)
+        self.assertIn(('Margin_of_Error', 'MOE'), rules)
+
+    def test_rule_kept_when_pattern_can_reappear(self):
+        # 'c' -> 'a' can write the 'a' back, so 'ab' stays live
+        replacements = [('a', 'x'), ('c', 'a'), ('ab', 'y')]
+        self.assertEqual(compile_replacements(replacements), replacements)
+        self.assertEqual(LabelFormatter(replacements).format('abcb'), 'xby')
+
+    def test_labels_containing_separator(self):
+        formatter = LabelFormatter(self.replacements)
+        labels = ['Total\x00Estimate', 'Households']
+        self.assertEqual(formatter.format_labels(labels), [chained_replace(label, self.replacements) for label in labels])
+
+    def test_memo_is_bounded(self):
+        formatter = LabelFormatter(self.replacements, maxsize=3)
+        formatter.format_series(pd.Series([f"Total {i}" for i in range(10)]))
+        self.assertEqual(len(formatter._memo), 3)
+
+    def test_empty_pattern_rejected(self):
+        with self.assertRaises(ValueError):
+            compile_replacements([('', 'x')])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+import pandas as pd
+from sqlalchemy import create_engine, text
+from Collect.Collect import CreateFromCSV
+from Collect.manifest import LoadManifest
+from src.Collect_Push import import_csv_to_database
+
+
+class TestLoadManifest(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = create_engine('sqlite://')
+        self.manifest = LoadManifest(self.engine)
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.csv_path = os.path.join(self.tmp_dir.name, 'FIPS.csv')
+        self.write_csv('fips,county\n1001,Autauga\n1003,Baldwin\n')
+
+    def tearDown(self):
+        self.engine.dispose()
+        self.tmp_dir.cleanup()
+
+    def write_csv(self, content):
+        with open(self.csv_path, 'w') as csv_file:
+            csv_file.write(content)
+
+    def test_fingerprint_tracks_content_and_options(self):
+        first = LoadManifest.fingerprint(self.csv_path)
+        self.assertEqual(first, LoadManifest.fingerprint(self.csv_path))
+        self.assertNotEqual(first['options_hash'],
+                            LoadManifest.fingerprint(self.csv_path, transform_options={'drop_duplicates': True})['options_hash'])
+
+        self.write_csv('fips,county\n1001,Autauga\n')
+        self.assertNotEqual(first['source_hash'], LoadManifest.fingerprint(self.csv_path)['source_hash'])
+
+    def test_fingerprint_requires_source(self):
+        with self.assertRaises(ValueError):
+            LoadManifest.fingerprint()
+
+    def test_push_skipped_when_unchanged(self):
+        first = CreateFromCSV(self.csv_path, self.engine).push_to_server('FIPS', manifest=self.manifest)
+        second = CreateFromCSV(self.csv_path, self.engine).push_to_server('FIPS', manifest=self.manifest)
+        forced = CreateFromCSV(self.csv_path, self.engine).push_to_server('FIPS', manifest=self.manifest, force=True)
+
+        self.assertFalse(first['skipped'])
+        self.assertTrue(second['skipped'])
+        self.assertFalse(forced['skipped'])
+        self.assertEqual(self.manifest.get('FIPS')['row_count'], 2)
+
+    def test_push_repeated_when_source_changes(self):
+        CreateFromCSV(self.csv_path, self.engine).push_to_server('FIPS', manifest=self.manifest)
+        self.write_csv('fips,county\n1001,Autauga\n')
+        stats = CreateFromCSV(self.csv_path, self.engine).push_to_server('FIPS', manifest=self.manifest)
+
+        self.assertFalse(stats['skipped'])
+        self.assertEqual(len(pd.read_sql('SELECT * FROM FIPS', self.engine)), 1)
+
+    def test_dropped_table_is_not_current(self):
+        CreateFromCSV(self.csv_path, self.engine).push_to_server('FIPS', manifest=self.manifest)
+        with self.engine.begin() as conn:
+            conn.execute(text('DROP TABLE FIPS'))
+
+        self.assertFalse(self.manifest.is_current('FIPS', LoadManifest.fingerprint(self.csv_path)))
+
+    @patch('src.Collect_Push.data_path')
+    def test_unchanged_csv_is_not_parsed(self, mock_data_path):
+        mock_data_path.return_value = self.csv_path
+        CreateFromCSV(self.csv_path, self.engine).push_to_server('FIPS', manifest=self.manifest)
+
+        with patch('src.Collect_Push.CreateFromCSV') as mock_create:
+            import_csv_to_database(self.engine, 'FIPS', manifest=self.manifest)
+            mock_create.assert_not_called()
+
+            import_csv_to_database(self.engine, 'FIPS', manifest=self.manifest, force=True)
+            mock_create.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
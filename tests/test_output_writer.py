@@ -0,0 +1,85 @@
+import gzip
+import os
+import tempfile
+import unittest
+import pandas as pd
+from Transform.output_writer import HAS_PYARROW, NULL_PARTITION, get_writer, write_outputs
+
+if HAS_PYARROW:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+
+FINAL = pd.DataFrame({
+    'FIPS': [1001, 2013, 1003, 11001],
+    'state_abbr': ['AL', 'AK', 'AL', None],
+    'county': ['Autauga', 'Aleutians East', 'Baldwin', 'District of Columbia'],
+    'per_hs': [31.3, 40.1, 27.2, 18.0],
+})
+
+
+def read_back(directory, file_format):
+    dataset = ds.dataset(directory, format=file_format, partitioning='hive')
+    return dataset.to_table().to_pandas().sort_values('FIPS').reset_index(drop=True)
+
+
+@unittest.skipUnless(HAS_PYARROW, "pyarrow is required to write the output files")
+class TestOutputWriter(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.directory = self.tmp_dir.name
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_every_format_partitioned_by_state(self):
+        results = write_outputs(FINAL, self.directory)
+
+        self.assertEqual([stats['format'] for stats in results], ['parquet', 'arrow', 'csv'])
+        for stats in results:
+            self.assertEqual((stats['files'], stats['rows']), (3, 4))
+            self.assertEqual(sorted(os.listdir(stats['directory'])),
+                             ['state_abbr=AK', 'state_abbr=AL', f"state_abbr={NULL_PARTITION}"])
+
+        with gzip.open(os.path.join(self.directory, 'csv', 'state_abbr=AL', 'part-0.csv.gz'), 'rt') as csv_file:
+            self.assertEqual(csv_file.readline().strip(), '"FIPS","county","per_hs"')
+
+    def test_round_trip(self):
+        write_outputs(FINAL, self.directory, ['parquet', 'arrow'])
+
+        for file_format, directory in (('parquet', 'parquet'), ('ipc', 'arrow')):
+            actual = read_back(os.path.join(self.directory, directory), file_format)
+            self.assertEqual(actual['FIPS'].tolist(), [1001, 1003, 2013, 11001])
+            self.assertEqual(actual['per_hs'].tolist(), FINAL.sort_values('FIPS')['per_hs'].tolist())
+            self.assertEqual(actual['state_abbr'].astype(str).tolist()[:3], ['AL', 'AL', 'AK'])
+
+    def test_parquet_column_statistics(self):
+        write_outputs(FINAL, self.directory, ['parquet'])
+
+        metadata = pq.ParquetFile(os.path.join(self.directory, 'parquet', 'state_abbr=AL', 'part-0.parquet')).metadata
+        statistics = metadata.row_group(0).column(0).statistics
+        self.assertEqual((statistics.min, statistics.max, statistics.null_count), (1001, 1003, 0))
+        self.assertEqual(metadata.row_group(0).column(0).compression, 'ZSTD')
+
+    def test_rewrite_replaces_old_partitions(self):
+        write_outputs(FINAL, self.directory, ['arrow'])
+        write_outputs(FINAL[FINAL['state_abbr'] == 'AL'], self.directory, ['arrow'])
+
+        self.assertEqual(os.listdir(os.path.join(self.directory, 'arrow')), ['state_abbr=AL'])
+
+    def test_unpartitioned(self):
+        write_outputs(FINAL, self.directory, ['arrow'], partition_by=None)
+
+        with pa.memory_map(os.path.join(self.directory, 'arrow', 'part-0.arrow')) as source:
+            table = pa.ipc.open_file(source).read_all()
+        self.assertEqual(table.column_names, list(FINAL.columns))
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            get_writer('xlsx')
+        self.assertEqual(write_outputs(FINAL, self.directory, []), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+import pandas as pd
+from sqlalchemy import create_engine, inspect
+from Collect.fips import with_fips
+from Transform import (election_transform, fip_transform, econ_transform, dem_housing_transform,
+                       AgeSexData_transform, income_transform, ooc)
+from Transform.join_data import join_data
+from Transform.pushdown import build_pol_final_select, merged_names, push_down_join
+
+COUNTIES = [1001, 1003, 1005]
+CENSUS_MODULES = [dem_housing_transform, AgeSexData_transform, income_transform, ooc]
+
+
+def load_stand_in_tables(engine):
+    # elections carries a county missing from the census tables to exercise the left joins
+    elections = pd.DataFrame({
+        'FIPS': COUNTIES + [2013], 'Code': ['RTT', 'RTT', 'DTT', 'RTT'], 'County': ['A', 'B', 'C', 'D'],
+        'Population': [58805, 231767, 25223, 3337], '2020W': ['Trump', 'Trump', 'Biden', 'Trump'],
+        '2020D': [27.0, 22.4, 49.5, 33.0], '2020R': [71.4, 76.2, 49.0, 65.0], '2020O': [1.5, 1.4, 1.5, 2.0],
+        '2016W': ['Trump', 'Trump', 'Clinton', 'Trump'],
+    })
+    fips = pd.DataFrame({'fips': COUNTIES + [2013], 'county': ['A', 'B', 'C', 'D'],
+                         'state_abbr': ['AL', 'AL', 'AL', 'AK'], 'state': ['Alabama'] * 3 + ['Alaska']})
+    edu = pd.DataFrame({'fips': COUNTIES, 'Pop_25_EDUATT': [37860, 155563, 18201], 'Pop_25_HS': [11880, 42272, 6891],
+                        'Pop_25_SC': [7663, 34475, 3556], 'Pop_25_AD': [3323, 14357, 1286],
+                        'Pop_25_COLL': [6320, 31444, 1249], 'Pop_25_GRAD': [4401, 18192, 753]})
+    elections.to_sql('elections', engine, index=False)
+    fips.to_sql('FIPS', engine, index=False)
+    edu.to_sql('edu_att_test', engine, index=False)
+
+    for offset, module in enumerate(CENSUS_MODULES):
+        census = pd.DataFrame({'Geography': [f"0500000US{code:05d}" for code in COUNTIES]})
+        for position, column in enumerate(module.COLUMNS[1:]):
+            census[column] = [float(offset + position + row) for row in range(len(COUNTIES))]
+        census, _ = with_fips(census)
+        census.to_sql(module.TABLE, engine, index=False)
+
+
+class TestPushDown(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = create_engine('sqlite://')
+        load_stand_in_tables(self.engine)
+
+    def tearDown(self):
+        self.engine.dispose()
+
+    def test_matches_join_data(self):
+        expected = join_data(self.engine)
+
+        rows = push_down_join(self.engine, 'POL_FINAL')
+        actual = pd.read_sql('SELECT * FROM POL_FINAL', self.engine)
+
+        self.assertEqual(rows, len(expected))
+        self.assertEqual(list(actual.columns), list(expected.columns))
+        pd.testing.assert_frame_equal(actual.sort_values('FIPS').reset_index(drop=True),
+                                      expected.sort_values('FIPS').reset_index(drop=True),
+                                      check_dtype=False)
+        self.assertEqual(actual.loc[actual['FIPS'] == 1005, '2016_winner'].item(), 'DEM')
+
+    def test_repeated_fips_row_does_not_add_rows(self):
+        pd.read_sql('SELECT * FROM FIPS WHERE fips = 1001', self.engine).to_sql('FIPS', self.engine, index=False,
+                                                                               if_exists='append')
+
+        rows = push_down_join(self.engine, 'POL_FINAL')
+
+        self.assertEqual(rows, len(COUNTIES) + 1)
+        self.assertEqual(rows, len(join_data(self.engine)))
+
+    def test_insert_mode_refills_table(self):
+        push_down_join(self.engine, 'POL_FINAL')
+        rows = push_down_join(self.engine, 'POL_FINAL', mode='insert')
+        self.assertEqual(rows, len(COUNTIES) + 1)
+
+    def test_created_table_keyed(self):
+        push_down_join(self.engine, 'POL_FINAL')
+
+        keys = {index['name']: index['column_names'] for index in inspect(self.engine).get_indexes('POL_FINAL')}
+        self.assertEqual(keys, {'pk_POL_FINAL_FIPS': ['FIPS'], 'ix_POL_FINAL_state_abbr': ['state_abbr']})
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            push_down_join(self.engine, 'POL_FINAL', mode='merge')
+
+    def test_merged_names(self):
+        left, right = merged_names(['FIPS', 'fips'], ['fips', 'per_hs'], 'FIPS', 'fips')
+        self.assertEqual(left, ['FIPS', 'fips_x'])
+        self.assertEqual(right, ['fips_y', 'per_hs'])
+
+    def test_select_uses_transform_columns(self):
+        select = build_pol_final_select(self.engine)
+        for column in income_transform.COLUMNS + ooc.COLUMNS + fip_transform.COLUMNS:
+            self.assertIn(f'"{column}"', select)
+        self.assertIn('"per_coll"', select)
+        self.assertIn(election_transform.TABLE, select)
+        self.assertIn(econ_transform.TABLE, select)
+
+
+if __name__ == '__main__':
+    unittest.main()
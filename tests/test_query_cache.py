@@ -0,0 +1,121 @@
+import argparse
+import tempfile
+import unittest
+from unittest.mock import patch
+import pandas as pd
+from sqlalchemy import create_engine, text
+from Collect.frame_cache import FrameCache, HAS_PYARROW
+from Collect.manifest import LoadManifest
+from Transform.columns import TRANSFORM_MODULES
+from Transform.income_transform import income_data_transform
+from Transform.query_cache import QueryCache, normalize_query, read_query, use_query_cache
+from src.main import build_pol_final
+from tests.test_pushdown import load_stand_in_tables
+
+FINGERPRINT = {'source_hash': 'a', 'mapping_hash': None, 'options_hash': 'b'}
+
+
+class TestNormalizeQuery(unittest.TestCase):
+
+    def test_whitespace_outside_quotes(self):
+        self.assertEqual(normalize_query('SELECT  "a  b",\n  x\tFROM t WHERE y = \'1  2\' ;'),
+                         'SELECT "a  b", x FROM t WHERE y = \'1  2\'')
+
+
+@unittest.skipUnless(HAS_PYARROW, "pyarrow is required for the frame cache")
+class TestQueryCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.engine = create_engine('sqlite://')
+        self.manifest = LoadManifest(self.engine)
+        pd.DataFrame({'FIPS': [1001, 1003], 'value': [1.5, 2.5]}).to_sql('income', self.engine, index=False)
+        self.manifest.record('income', FINGERPRINT, 2)
+
+    def tearDown(self):
+        self.engine.dispose()
+        self.tmp_dir.cleanup()
+
+    def query_cache(self):
+        return QueryCache(FrameCache(self.tmp_dir.name), self.manifest)
+
+    def test_repeat_read_skips_database(self):
+        expected = self.query_cache().read_sql('SELECT * FROM income', self.engine, ['income'])
+
+        query_cache = self.query_cache()
+        query_cache.versions()
+        with patch('Transform.query_cache.pd.read_sql', side_effect=AssertionError("read the database")):
+            actual = query_cache.read_sql('SELECT *\n  FROM income;', self.engine, ['income'])
+
+        pd.testing.assert_frame_equal(actual, expected)
+        self.assertEqual((query_cache.hits, query_cache.misses), (1, 0))
+
+    def test_reload_invalidates(self):
+        self.query_cache().read_sql('SELECT * FROM income', self.engine, ['income'])
+        with self.engine.begin() as conn:
+            conn.execute(text('DELETE FROM income WHERE FIPS = 1003'))
+        self.manifest.record('income', {**FINGERPRINT, 'source_hash': 'c'}, 1)
+
+        query_cache = self.query_cache()
+        df = query_cache.read_sql('SELECT * FROM income', self.engine, ['income'])
+
+        self.assertEqual(df['FIPS'].tolist(), [1001])
+        self.assertEqual((query_cache.hits, query_cache.misses), (0, 1))
+
+    def test_unrecorded_table_bypassed(self):
+        pd.DataFrame({'FIPS': [1001]}).to_sql('occ', self.engine, index=False)
+        query_cache = self.query_cache()
+
+        query_cache.read_sql('SELECT * FROM occ', self.engine, ['occ'])
+        query_cache.read_sql('SELECT * FROM occ', self.engine, ['occ'])
+
+        self.assertEqual((query_cache.hits, query_cache.misses, query_cache.bypassed), (0, 0, 2))
+
+    def test_transforms_read_through_cache_in_use(self):
+        pd.DataFrame({'Geography': ['0500000US01001'], 'FIPS': [1001]}).to_sql('income', self.engine,
+                                                                              index=False, if_exists='replace')
+        query_cache = self.query_cache()
+
+        with patch('Transform.income_transform.COLUMNS', ['FIPS']):
+            with use_query_cache(query_cache):
+                income_data_transform(self.engine)
+                income_data_transform(self.engine)
+            income_data_transform(self.engine)
+
+        self.assertEqual((query_cache.hits, query_cache.misses), (1, 1))
+
+    def test_without_cache(self):
+        self.assertEqual(len(read_query('SELECT * FROM income', self.engine, ['income'])), 2)
+
+
+@unittest.skipUnless(HAS_PYARROW, "pyarrow is required for the frame cache")
+class TestRepeatJoin(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.engine = create_engine('sqlite://')
+        load_stand_in_tables(self.engine)
+        manifest = LoadManifest(self.engine)
+        for module in TRANSFORM_MODULES:
+            manifest.record(module.TABLE, FINGERPRINT, 1)
+        self.args = argparse.Namespace(pushdown=False, concurrent=False, workers=1, no_query_cache=False,
+                                       query_cache_size_mb=64)
+
+    def tearDown(self):
+        self.engine.dispose()
+        self.tmp_dir.cleanup()
+
+    def test_repeat_join_reads_no_transform(self):
+        with patch('src.main.DEFAULT_QUERY_CACHE_DIR', self.tmp_dir.name):
+            build_pol_final(self.args, self.engine)
+            expected = pd.read_sql('SELECT * FROM POL_FINAL', self.engine)
+
+            with patch('Transform.query_cache.pd.read_sql', side_effect=AssertionError("read the database")):
+                rows = build_pol_final(self.args, self.engine)
+
+        self.assertEqual(rows, len(expected))
+        pd.testing.assert_frame_equal(pd.read_sql('SELECT * FROM POL_FINAL', self.engine), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
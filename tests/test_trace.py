@@ -0,0 +1,84 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock
+import pandas as pd
+from Collect.Collect import CensusData
+from instrumentation.trace import Tracer, argument, set_tracer, stage, traced
+
+
+@traced(rows_in=lambda frame, *args, **kwargs: len(frame), target=argument(1, 'table'))
+def head(frame, table, rows=2):
+    return frame.head(rows)
+
+
+class TestTrace(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, 'trace.jsonl')
+        self.tracer = Tracer(self.path)
+        self.previous = set_tracer(self.tracer)
+
+    def tearDown(self):
+        set_tracer(self.previous)
+        self.tracer.close()
+        self.tmp_dir.cleanup()
+
+    def test_traced_records_rows_and_target(self):
+        head(pd.DataFrame({'a': range(5)}), 'income')
+
+        record = self.tracer.records[-1]
+        self.assertEqual(record['stage'], 'head')
+        self.assertEqual((record['rows_in'], record['rows_out'], record['target']), (5, 2, 'income'))
+        self.assertEqual(record['status'], 'ok')
+        self.assertGreaterEqual(record['seconds'], 0)
+
+    def test_nested_stages_and_errors(self):
+        with self.assertRaises(ValueError):
+            with stage('outer'):
+                with stage('inner') as record:
+                    record.bytes = 10
+                raise ValueError('boom')
+
+        inner, outer = self.tracer.records
+        self.assertEqual((inner['stage'], inner['parent'], inner['bytes']), ('inner', 'outer', 10))
+        self.assertEqual(outer['status'], 'error')
+        self.assertIn('boom', outer['error'])
+
+    def test_records_written_as_json_lines(self):
+        with stage('first'):
+            pass
+        with stage('second', table='FIPS'):
+            pass
+
+        with open(self.path) as file:
+            records = [json.loads(line) for line in file]
+        self.assertEqual([record['stage'] for record in records], ['first', 'second'])
+        self.assertEqual(records[1]['table'], 'FIPS')
+
+    def test_summary_totals_per_stage(self):
+        frame = pd.DataFrame({'a': range(5)})
+        head(frame, 'a')
+        head(frame, 'b', rows=3)
+
+        summary = self.tracer.summary()
+
+        self.assertEqual(len(summary), 1)
+        self.assertEqual((summary[0]['calls'], summary[0]['rows_in'], summary[0]['rows_out']), (2, 10, 5))
+        self.assertIn('head', self.tracer.format_summary())
+
+    def test_census_stages_traced(self):
+        CensusData.load('income.csv', 'income_columnMappings.csv', Mock())
+
+        records = {record['stage']: record for record in self.tracer.records}
+        reads = [record['target'] for record in self.tracer.records if record['stage'] == 'CensusData.read_in_df']
+        self.assertEqual(reads, ['income.csv', 'income_columnMappings.csv'])
+        self.assertEqual(records['CensusData.apply_column_mappings']['rows_in'], 3222)
+        self.assertEqual(records['CensusData.convert_to_type_numeric']['rows_out'], 3221)
+        self.assertEqual(records['CensusData.convert_to_type_numeric']['parent'], 'CensusData.load')
+
+
+if __name__ == '__main__':
+    unittest.main()